@@ -6,11 +6,20 @@ CoffeeCafe-POS Application Package
 This is the main package for the Coffee Shop Point of Sale system.
 """
 
+from typing import TYPE_CHECKING
+from ._lazy import lazy_exports
 from .version import __version__
 
-# Import key components to make them available at package level
-from .main import CoffeeCafePOS
-from .config import Config
+# Key components are available at package level but only imported on first use,
+# so `import app.models` does not pull in tkinter, supabase or matplotlib
+__getattr__, __dir__ = lazy_exports(globals(), {
+    'CoffeeCafePOS': '.main',
+    'Config': '.config'
+})
+
+if TYPE_CHECKING:
+    from .main import CoffeeCafePOS
+    from .config import Config
 
 __all__ = [
     'CoffeeCafePOS',
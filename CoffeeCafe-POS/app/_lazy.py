@@ -0,0 +1,22 @@
+# Lazy Package Exports (app/_lazy.py)
+
+import importlib
+from typing import Any, Callable, Dict, List, Tuple
+
+def lazy_exports(namespace: Dict[str, Any], exports: Dict[str, str]) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    # Module-level __getattr__/__dir__ (PEP 562) for a package's re-exports: `exports` maps a
+    # public name to the relative module defining it, which is imported on first access.
+    package = namespace['__name__']
+
+    def __getattr__(name: str) -> Any:
+        module = exports.get(name)
+        if module is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module, package), name)
+        namespace[name] = value  # later lookups skip __getattr__
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(namespace) | set(exports))
+
+    return __getattr__, __dir__
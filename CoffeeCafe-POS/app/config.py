@@ -10,8 +10,42 @@ class Config:
     SUPABASE_KEY = os.getenv("SUPABASE_KEY")
     SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret-key")
     DEBUG = os.getenv("DEBUG", "False").lower() == "true"
-    PRINTER_VENDOR_ID = int(os.getenv("PRINTER_VENDOR_ID", "0x04b8"))
-    PRINTER_PRODUCT_ID = int(os.getenv("PRINTER_PRODUCT_ID", "0x0e15"))
+    PRINTER_VENDOR_ID = int(os.getenv("PRINTER_VENDOR_ID", "0x04b8"), 16)
+    PRINTER_PRODUCT_ID = int(os.getenv("PRINTER_PRODUCT_ID", "0x0e15"), 16)
+    CATALOG_CACHE_SIZE = int(os.getenv("CATALOG_CACHE_SIZE", "5000"))
+    CATALOG_REFRESH_SECONDS = int(os.getenv("CATALOG_REFRESH_SECONDS", "300"))
+    JOURNAL_PATH = os.getenv("JOURNAL_PATH", str(Path.home() / ".coffeecafe" / "journal.db"))
+    SYNC_INTERVAL_SECONDS = float(os.getenv("SYNC_INTERVAL_SECONDS", "2"))
+    SYNC_BATCH_SIZE = int(os.getenv("SYNC_BATCH_SIZE", "50"))
+    SYNC_MAX_BACKOFF_SECONDS = float(os.getenv("SYNC_MAX_BACKOFF_SECONDS", "300"))
+    SYNC_MAX_REJECTIONS = int(os.getenv("SYNC_MAX_REJECTIONS", "5"))
+    SERVICE_WORKERS = int(os.getenv("SERVICE_WORKERS", "4"))
+    PRINT_SPOOL_PATH = os.getenv("PRINT_SPOOL_PATH", str(Path.home() / ".coffeecafe" / "print_spool.db"))
+    PRINT_QUEUE_SIZE = int(os.getenv("PRINT_QUEUE_SIZE", "20"))
+    PRINT_MAX_ATTEMPTS = int(os.getenv("PRINT_MAX_ATTEMPTS", "10"))
+    PRINT_RETRY_SECONDS = float(os.getenv("PRINT_RETRY_SECONDS", "2"))
+    STORE_TIMEZONE = os.getenv("STORE_TIMEZONE", "UTC")
+    REPORT_PAGE_SIZE = int(os.getenv("REPORT_PAGE_SIZE", "1000"))
+    REPORT_CACHE_SIZE = int(os.getenv("REPORT_CACHE_SIZE", "32"))
+    REPORT_CACHE_TTL_SECONDS = float(os.getenv("REPORT_CACHE_TTL_SECONDS", "60"))
+    PREFETCH_TABS = os.getenv("PREFETCH_TABS", "True").lower() == "true"
+    PREFETCH_DELAY_MS = int(os.getenv("PREFETCH_DELAY_MS", "3000"))
+    PHONE_COUNTRY_CODE = os.getenv("PHONE_COUNTRY_CODE", "1")  # for numbers typed without one
+    CUSTOMER_CACHE_SIZE = int(os.getenv("CUSTOMER_CACHE_SIZE", "500"))
+    CUSTOMER_CACHE_SECONDS = float(os.getenv("CUSTOMER_CACHE_SECONDS", "60"))  # bounds how stale points can look
+    PIN_SESSION_SECONDS = float(os.getenv("PIN_SESSION_SECONDS", "14400"))  # PIN switching after a password login
+    PIN_MAX_ATTEMPTS = int(os.getenv("PIN_MAX_ATTEMPTS", "5"))
+    PIN_ATTEMPT_WINDOW_SECONDS = float(os.getenv("PIN_ATTEMPT_WINDOW_SECONDS", "300"))
+    TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "256"))
+    HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10"))  # covers SERVICE_WORKERS plus the sync and prefetch threads
+    HTTP_KEEPALIVE_SECONDS = float(os.getenv("HTTP_KEEPALIVE_SECONDS", "120"))
+    HTTP2 = os.getenv("HTTP2", "True").lower() == "true"  # only when the h2 package is installed
+    HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+    HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "15"))
+    HTTP_WRITE_TIMEOUT = float(os.getenv("HTTP_WRITE_TIMEOUT", "10"))
+    HTTP_POOL_TIMEOUT = float(os.getenv("HTTP_POOL_TIMEOUT", "5"))  # waiting for a free connection
+    HTTP_PREWARM = os.getenv("HTTP_PREWARM", "True").lower() == "true"
+    METRICS_PATH = os.getenv("METRICS_PATH", str(Path.home() / ".coffeecafe" / "metrics.jsonl"))
     
     @classmethod
     def validate(cls):
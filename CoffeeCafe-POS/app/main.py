@@ -1,10 +1,16 @@
 # Main Application (app/main.py)
 
+from app import startup_profile
+startup_profile.start()  # before the imports below, so they show up in the profile
+
 import tkinter as tk
 from app.config import Config
 from app.services.auth import AuthService
+from app.services.background import ServiceExecutor
 from app.services.database import DatabaseService
-from app.ui.main_window import MainWindow
+from app.services.journal import OrderJournal, JournalSyncWorker
+from app.utils.metrics import SessionMetrics
+from app.utils.print_spooler import PrintSpooler
 from app.ui.components.login_frame import LoginFrame
 import logging
 
@@ -12,13 +18,39 @@ class CoffeeCafePOS:
     def __init__(self):
         Config.validate()
         self.db = DatabaseService()
-        self.auth = AuthService(self.db.client)
+        self.auth = AuthService()
+        
+        # Orders are committed locally first and drained to Supabase in the background
+        self.journal = OrderJournal()
+        self.sync_worker = JournalSyncWorker(self.journal, self.db)
+        self.sync_worker.start()
+        self.spooler = PrintSpooler()
+        self.spooler.start()
         
         self.root = tk.Tk()
         self.root.title("CoffeeCafe POS")
         self.root.geometry("1200x800")
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+        # Service calls run on worker threads and report back through the Tk loop
+        self.executor = ServiceExecutor()
+        self.executor.attach(self.root)
+        if Config.HTTP_PREWARM:
+            self.db.nonblocking.warm_up(key="http_prewarm")
         
+        self.main_window = None
+        self.lock_screen = None  # login overlay while the cashier is being switched
         self._show_login()
+        self.root.after_idle(self._on_login_screen)
+    
+    def _on_close(self):
+        self.executor.shutdown()
+        self.sync_worker.stop(timeout=5)
+        self.spooler.stop(timeout=5)
+        stats = self.journal.stats()
+        if stats['queue_depth']:
+            logging.warning(f"{stats['queue_depth']} orders still pending sync; they will be sent on next start")
+        self.journal.close()
+        self.root.destroy()
     
     def _show_login(self):
         LoginFrame(
@@ -27,15 +59,43 @@ class CoffeeCafePOS:
             self._on_login_success
         ).pack(expand=True, fill="both")
     
+    def _on_login_screen(self):
+        metrics = SessionMetrics()
+        metrics.mark('process_start', at=startup_profile.PROCESS_START)
+        if metrics.mark('login_screen'):
+            seconds = metrics.record('startup_to_login_screen', 'process_start', 'login_screen')
+            startup_profile.finish(seconds)
+    
     def _on_login_success(self, auth_result):
+        # The POS screen (and pandas behind the reports tab) is only imported once it is needed
+        from app.ui.main_window import MainWindow
+        
+        SessionMetrics().start_session('login')
         for widget in self.root.winfo_children():
             widget.destroy()
         
-        MainWindow(
+        self.main_window = MainWindow(
             self.root,
             self.db,
-            auth_result['employee']
-        ).pack(expand=True, fill="both")
+            auth_result['employee'],
+            self.sync_worker,
+            self.spooler,
+            on_switch_cashier=self._switch_cashier
+        )
+        self.main_window.pack(expand=True, fill="both")
+    
+    def _switch_cashier(self):
+        # Lock the register under a login overlay. The POS screen stays up underneath, so the
+        # order in progress and the loaded catalog carry over to whoever signs in next.
+        self.lock_screen = LoginFrame(self.root, self.auth, self._on_unlock)
+        self.lock_screen.place(x=0, y=0, relwidth=1, relheight=1)
+        self.lock_screen.lift()
+        self.lock_screen.focus_set()
+    
+    def _on_unlock(self, auth_result):
+        self.lock_screen.destroy()
+        self.lock_screen = None
+        self.main_window.set_employee(auth_result['employee'])
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
@@ -1,7 +1,7 @@
 # app/models/order.py
 
 from dataclasses import dataclass, field
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 
 @dataclass
@@ -9,6 +9,11 @@ class OrderItem:
     product_id: str
     quantity: int
     unit_price: float
+    
+    @property
+    def key(self) -> Tuple[str, float]:
+        # Repeat scans of the same product at the same price share one line
+        return (self.product_id, self.unit_price)
 
 @dataclass
 class Order:
@@ -19,14 +24,41 @@ class Order:
     payment_method: str = "cash"
     status: str = "pending"
     customer_id: Optional[str] = None
+    customer: Optional[Dict[str, Any]] = field(default=None, compare=False)  # resolved at lookup, reused on the receipt
+    _lines: Dict[Tuple[str, float], OrderItem] = field(default_factory=dict, repr=False, compare=False)
+    
+    def __post_init__(self):
+        for item in self.items:
+            self._lines.setdefault(item.key, item)
+    
+    def set_customer(self, customer: Optional[Dict[str, Any]]):
+        self.customer = customer
+        self.customer_id = customer['id'] if customer else None
     
-    def add_item(self, product_id: str, quantity: int, unit_price: float):
-        self.items.append(OrderItem(
-            product_id=product_id,
-            quantity=quantity,
-            unit_price=unit_price
-        ))
+    def add_item(self, product_id: str, quantity: int, unit_price: float) -> OrderItem:
+        item = self._lines.get((product_id, unit_price))
+        if item is None:
+            item = OrderItem(
+                product_id=product_id,
+                quantity=quantity,
+                unit_price=unit_price
+            )
+            self.items.append(item)
+            self._lines[item.key] = item
+        else:
+            item.quantity += quantity
         self.total += unit_price * quantity
+        return item
+    
+    def get_item(self, key: Tuple[str, float]) -> Optional[OrderItem]:
+        return self._lines.get(key)
+    
+    def remove_item(self, key: Tuple[str, float]) -> Optional[OrderItem]:
+        item = self._lines.pop(key, None)
+        if item is not None:
+            self.items.remove(item)
+            self.total -= item.unit_price * item.quantity
+        return item
     
     def to_dict(self) -> Dict[str, Any]:
         return {
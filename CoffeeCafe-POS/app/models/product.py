@@ -12,6 +12,8 @@ class Product:
     cost: float
     description: Optional[str] = None
     is_active: bool = True
+    plu: Optional[str] = None
+    barcode: Optional[str] = None
     
     @classmethod
     def from_dict(cls, data: dict):
@@ -22,5 +24,7 @@ class Product:
             price=data.get('price'),
             cost=data.get('cost'),
             description=data.get('description'),
-            is_active=data.get('is_active', True)
+            is_active=data.get('is_active', True),
+            plu=data.get('plu'),
+            barcode=data.get('barcode')
         )
\ No newline at end of file
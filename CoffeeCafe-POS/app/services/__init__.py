@@ -6,11 +6,24 @@ Services Package
 Contains all business logic and data access services.
 """
 
-from .database import DatabaseService
-from .auth import AuthService
-from .inventory import InventoryService
-from .reporting import ReportingService
-from .loyalty import LoyaltyService
+from typing import TYPE_CHECKING
+from app._lazy import lazy_exports
+
+# Services are imported on first access; most pull in supabase or pandas
+__getattr__, __dir__ = lazy_exports(globals(), {
+    'DatabaseService': '.database',
+    'AuthService': '.auth',
+    'InventoryService': '.inventory',
+    'ReportingService': '.reporting',
+    'LoyaltyService': '.loyalty'
+})
+
+if TYPE_CHECKING:
+    from .database import DatabaseService
+    from .auth import AuthService
+    from .inventory import InventoryService
+    from .reporting import ReportingService
+    from .loyalty import LoyaltyService
 
 __all__ = [
     'DatabaseService',
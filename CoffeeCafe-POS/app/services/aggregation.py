@@ -0,0 +1,159 @@
+# Sales Aggregation Engine (app/services/aggregation.py)
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import numpy as np
+import pandas as pd
+from app.config import Config
+
+# Only the columns the rollups read, instead of `*, order_items(*, products(*))`
+SALES_COLUMNS = 'id, created_at, total_amount, order_items(product_id, quantity, unit_price, products(name, category))'
+
+def store_time(moment: datetime, tz: str = Config.STORE_TIMEZONE) -> pd.Timestamp:
+    # Wall-clock time at the store, without tzinfo; naive times are stored as UTC
+    stamp = pd.Timestamp(moment)
+    if stamp.tzinfo is None:
+        stamp = stamp.tz_localize('UTC')
+    return stamp.tz_convert(tz).tz_localize(None)
+
+@dataclass
+class SalesSummary:
+    daily: pd.DataFrame        # index: day (midnight, store time); columns: orders, revenue
+    hourly: pd.DataFrame       # index: hour 0-23; columns: orders, revenue
+    by_category: pd.DataFrame  # index: category; columns: quantity, revenue
+    by_product: pd.DataFrame   # index: product_id; columns: name, category, quantity, revenue
+
+    @property
+    def total_orders(self) -> int:
+        return int(self.daily['orders'].sum())
+
+    @property
+    def total_revenue(self) -> float:
+        return float(self.daily['revenue'].sum())
+
+    def top_products(self, limit: int = 5) -> List[Dict[str, Any]]:
+        top = self.by_product.nlargest(limit, 'quantity')
+        return [{
+            'product_id': product_id,
+            'name': row['name'],
+            'total_quantity': int(row['quantity']),
+            'total_revenue': float(row['revenue'])
+        } for product_id, row in top.iterrows()]
+
+class SalesAggregator:
+    # Orders are reduced to per-group partial sums every `fold_size` orders, so memory depends
+    # on the number of days/hours/products plus one buffer of plain columns, not on order count.
+    # Folding in batches rather than per page keeps pandas' fixed per-call cost off small pages.
+    def __init__(self, timezone: str = Config.STORE_TIMEZONE, fold_size: int = 5000):
+        self.timezone = timezone
+        self.fold_size = fold_size
+        self._daily = pd.DataFrame({'orders': pd.Series(dtype=float), 'revenue': pd.Series(dtype=float)})
+        self._hourly = self._daily.copy()
+        self._by_product = pd.DataFrame({
+            'quantity': pd.Series(dtype=float),
+            'revenue': pd.Series(dtype=float)
+        })
+        self._product_info = pd.DataFrame({'name': pd.Series(dtype=object), 'category': pd.Series(dtype=object)})
+        self._created_at: List[str] = []
+        self._totals: List[float] = []
+        self._items: List[tuple] = []
+
+    def add_orders(self, orders: List[Dict[str, Any]]):
+        if not orders:
+            return
+        self._created_at.extend(order['created_at'] for order in orders)
+        self._totals.extend(order.get('total_amount') or 0.0 for order in orders)
+        self._items.extend(
+            (item['product_id'], item['quantity'], item['unit_price'],
+             (item.get('products') or {}).get('name'), (item.get('products') or {}).get('category'))
+            for order in orders for item in order.get('order_items') or ()
+        )
+        if len(self._created_at) >= self.fold_size:
+            self._fold()
+
+    def _fold(self):
+        if self._created_at:
+            self._add_order_columns(self._created_at, np.asarray(self._totals, dtype=float))
+        if self._items:
+            self._add_item_columns(pd.DataFrame.from_records(
+                self._items, columns=['product_id', 'quantity', 'unit_price', 'name', 'category']
+            ))
+        self._created_at, self._totals, self._items = [], [], []
+
+    def add_rollups(self, hours: List[Dict[str, Any]], products: List[Dict[str, Any]],
+                    product_info: Optional[Dict[str, Dict[str, Any]]] = None):
+        # Pre-aggregated sales_hourly / product_sales_daily rows instead of raw orders
+        if hours:
+            local = pd.to_datetime(pd.Series([row['bucket'] for row in hours]), utc=True, format='ISO8601').dt.tz_convert(self.timezone)
+            frame = pd.DataFrame({
+                'day': local.dt.tz_localize(None).dt.normalize(),
+                'hour': local.dt.hour,
+                'orders': np.fromiter((row['order_count'] for row in hours), dtype=float, count=len(hours)),
+                'revenue': np.fromiter((row['revenue'] for row in hours), dtype=float, count=len(hours))
+            })
+            self._daily = self._merge(self._daily, frame.groupby('day')[['orders', 'revenue']].sum())
+            self._hourly = self._merge(self._hourly, frame.groupby('hour')[['orders', 'revenue']].sum())
+
+        if products:
+            frame = pd.DataFrame.from_records(products, columns=['product_id', 'quantity', 'revenue'])
+            self._by_product = self._merge(self._by_product, frame.groupby('product_id')[['quantity', 'revenue']].sum().astype(float))
+        if product_info:
+            info = pd.DataFrame.from_records(
+                [(product_id, product.get('name'), product.get('category')) for product_id, product in product_info.items()],
+                columns=['product_id', 'name', 'category']
+            ).set_index('product_id')
+            self._product_info = info.combine_first(self._product_info)
+
+    def _add_order_columns(self, created_at: List[str], totals: np.ndarray):
+        # Checkout stamps UTC; days and hours are bucketed in store time
+        local = pd.to_datetime(pd.Series(created_at), utc=True, format='ISO8601').dt.tz_convert(self.timezone)
+        frame = pd.DataFrame({
+            'day': local.dt.tz_localize(None).dt.normalize(),
+            'hour': local.dt.hour,
+            'revenue': totals
+        })
+        self._daily = self._merge(self._daily, self._count_and_sum(frame, 'day'))
+        self._hourly = self._merge(self._hourly, self._count_and_sum(frame, 'hour'))
+
+    @staticmethod
+    def _count_and_sum(frame: pd.DataFrame, key: str) -> pd.DataFrame:
+        # Plain agg lists skip the named-aggregation bookkeeping, which dominates on small pages
+        return frame.groupby(key)['revenue'].agg(['size', 'sum']).set_axis(['orders', 'revenue'], axis=1)
+
+    def _add_item_columns(self, items: pd.DataFrame):
+        items['revenue'] = items['quantity'].to_numpy(dtype=float) * items['unit_price'].to_numpy(dtype=float)
+        self._by_product = self._merge(self._by_product, items.groupby('product_id')[['quantity', 'revenue']].sum())
+        info = items.drop_duplicates('product_id', keep='last').set_index('product_id')[['name', 'category']]
+        if not info.index.isin(self._product_info.index).all():
+            self._product_info = info.combine_first(self._product_info)
+
+    @staticmethod
+    def _merge(total: pd.DataFrame, partial: pd.DataFrame) -> pd.DataFrame:
+        if total.empty:
+            return partial.astype(float)
+        return total.add(partial, fill_value=0)
+
+    def summary(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> SalesSummary:
+        self._fold()
+        daily = self._daily.sort_index()
+        if start is not None and end is not None:
+            # Days without sales still get a (zero) bar
+            days = pd.date_range(store_time(start, self.timezone).normalize(),
+                                 store_time(end, self.timezone).normalize(), freq='D')
+            daily = daily.reindex(days.union(daily.index), fill_value=0)
+        daily.index.name = 'day'
+        hourly = self._hourly.reindex(range(24), fill_value=0)
+        hourly.index.name = 'hour'
+
+        by_product = self._by_product.join(self._product_info, how='left')
+        by_product['category'] = by_product['category'].fillna('Uncategorized')
+        by_product = by_product[['name', 'category', 'quantity', 'revenue']].sort_values('revenue', ascending=False)
+        by_category = by_product.groupby('category')[['quantity', 'revenue']].sum().sort_values('revenue', ascending=False)
+
+        return SalesSummary(
+            daily=daily.astype({'orders': int}),
+            hourly=hourly.astype({'orders': int}),
+            by_category=by_category,
+            by_product=by_product
+        )
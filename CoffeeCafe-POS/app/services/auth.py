@@ -3,43 +3,224 @@
 
 import jwt
 import datetime
+import hashlib
+import hmac
+import logging
+import secrets
+import threading
+import time
 from passlib.hash import pbkdf2_sha256
 from app.config import Config
+from app.services.background import NonBlockingMixin
 from app.services.database import DatabaseService
-from typing import Optional, Dict
+from app.utils.cache import LRUCache
+from typing import Optional, Dict, Any, List
 
-class AuthService:
+logger = logging.getLogger(__name__)
+
+class PinSessionCache:
+    # Employees who signed in with their password on this register can switch back in with
+    # their PIN until the session expires. Only an HMAC of the PIN under a per-process key is
+    # kept, which is cheap to check; repeated misses lock the PIN and require the password again.
+    def __init__(self, ttl: float = Config.PIN_SESSION_SECONDS,
+                 max_attempts: int = Config.PIN_MAX_ATTEMPTS,
+                 attempt_window: float = Config.PIN_ATTEMPT_WINDOW_SECONDS):
+        self.ttl = ttl
+        self.max_attempts = max_attempts
+        self.attempt_window = attempt_window
+        self._key = secrets.token_bytes(32)
+        self._sessions: Dict[str, Dict[str, Any]] = {}  # employee id -> employee, verifier, expires_at
+        self._failures: Dict[str, List[float]] = {}  # employee id -> recent miss times
+        self._lock = threading.Lock()
+    
+    def _verifier(self, employee_id: str, pin: str) -> bytes:
+        return hmac.new(self._key, f"{employee_id}:{pin}".encode(), hashlib.sha256).digest()
+    
+    def remember(self, employee: Dict[str, Any]):
+        pin = employee.get('pin_code')
+        if not pin:
+            return
+        with self._lock:
+            self._sessions[employee['id']] = {
+                'employee': {k: v for k, v in employee.items() if k not in ('password_hash', 'pin_code')},
+                'verifier': self._verifier(employee['id'], str(pin)),
+                'expires_at': time.monotonic() + self.ttl
+            }
+            self._failures.pop(employee['id'], None)
+    
+    def employees(self) -> List[Dict[str, Any]]:
+        # Who can switch in by PIN right now
+        now = time.monotonic()
+        with self._lock:
+            for employee_id in [i for i, s in self._sessions.items() if s['expires_at'] <= now]:
+                del self._sessions[employee_id]
+            return [session['employee'] for session in self._sessions.values()]
+    
+    def verify(self, employee_id: str, pin: str) -> Optional[Dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            session = self._sessions.get(employee_id)
+            if session is None or session['expires_at'] <= now:
+                self._sessions.pop(employee_id, None)
+                return None
+            if hmac.compare_digest(session['verifier'], self._verifier(employee_id, pin)):
+                self._failures.pop(employee_id, None)
+                return session['employee']
+            
+            failures = [t for t in self._failures.get(employee_id, []) if now - t < self.attempt_window]
+            failures.append(now)
+            self._failures[employee_id] = failures
+            if len(failures) >= self.max_attempts:
+                # Locked out: the PIN session is dropped and only the password gets back in
+                del self._sessions[employee_id]
+                self._failures.pop(employee_id, None)
+                logger.warning(f"PIN locked for employee {employee_id} after {len(failures)} failed attempts")
+            return None
+    
+    def forget(self, employee_id: str):
+        with self._lock:
+            self._sessions.pop(employee_id, None)
+    
+    def clear(self):
+        with self._lock:
+            self._sessions.clear()
+            self._failures.clear()
+
+class TokenCache:
+    # Decoded JWT payloads keyed by a SHA-256 of the token, each kept only until its `exp`, so
+    # repeated permission checks skip the signature check. Revoked tokens go on a local
+    # denylist that is consulted first and pruned as the tokens expire.
+    def __init__(self, max_size: int = Config.TOKEN_CACHE_SIZE):
+        self._payloads = LRUCache(max_size)
+        self._denylist: Dict[bytes, float] = {}  # token hash -> exp (epoch seconds)
+        self._lock = threading.Lock()
+        self.decodes = 0
+        self.decode_seconds = 0.0
+        self.denied = 0
+    
+    @staticmethod
+    def key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+    
+    # Callers get their own copy, so one that edits its payload cannot change it for the rest
+    def get(self, key: bytes) -> Optional[Dict[str, Any]]:
+        payload = self._payloads.get(key)
+        return dict(payload) if payload is not None else None
+    
+    def put(self, key: bytes, payload: Dict[str, Any]):
+        exp = payload.get('exp')
+        ttl = exp - time.time() if exp is not None else None
+        if ttl is None or ttl > 0:
+            self._payloads.set(key, dict(payload), ttl=ttl)
+    
+    def is_revoked(self, key: bytes) -> bool:
+        with self._lock:
+            if key not in self._denylist:
+                return False
+            self.denied += 1
+            return True
+    
+    def revoke(self, key: bytes, exp: float):
+        now = time.time()
+        with self._lock:
+            self._denylist = {k: e for k, e in self._denylist.items() if e > now}
+            self._denylist[key] = exp
+        self._payloads.pop(key)
+    
+    def record_decode(self, seconds: float):
+        with self._lock:
+            self.decodes += 1
+            self.decode_seconds += seconds
+    
+    def clear(self):
+        self._payloads.clear()
+        with self._lock:
+            self._denylist.clear()
+            self.decodes = 0
+            self.decode_seconds = 0.0
+            self.denied = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        stats = self._payloads.stats()
+        with self._lock:
+            average = self.decode_seconds / self.decodes if self.decodes else 0.0
+            stats.update({
+                'decodes': self.decodes,
+                'decode_seconds': self.decode_seconds,
+                'saved_seconds': stats['hits'] * average,  # hits that would each have paid a decode
+                'denied': self.denied,
+                'revoked': len(self._denylist)
+            })
+        return stats
+
+class AuthService(NonBlockingMixin):
+    sessions = PinSessionCache()  # shared by every AuthService on this register
+    tokens = TokenCache()
+    
     def __init__(self):
         self.db = DatabaseService()
     
     def authenticate_employee(self, email: str, password: str) -> Optional[Dict[str, Any]]:
+        # pbkdf2 is deliberately slow; the login screen calls this through `nonblocking`
         try:
             employee = self.db.client.table('employees').select('*').eq('email', email).execute().data
             if not employee or not pbkdf2_sha256.verify(password, employee[0]['password_hash']):
                 return None
             
-            token = jwt.encode({
-                'sub': employee[0]['id'],
-                'name': employee[0]['name'],
-                'role': employee[0]['role'],
-                'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=8)
-            }, Config.SECRET_KEY, algorithm='HS256')
-            
+            self.sessions.remember(employee[0])
             return {
-                'token': token,
+                'token': self._issue_token(employee[0]),
                 'employee': employee[0]
             }
         except Exception as e:
-            print(f"Authentication error: {e}")
+            logger.error(f"Authentication error: {e}")
+            return None
+    
+    def switch_employee(self, employee_id: str, pin: str) -> Optional[Dict[str, Any]]:
+        # Local check against a session opened by a password login; no network, no pbkdf2
+        employee = self.sessions.verify(employee_id, pin)
+        if employee is None:
             return None
+        return {
+            'token': self._issue_token(employee),
+            'employee': employee
+        }
+    
+    def _issue_token(self, employee: Dict[str, Any]) -> str:
+        return jwt.encode({
+            'sub': employee['id'],
+            'name': employee['name'],
+            'role': employee['role'],
+            'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=8)
+        }, Config.SECRET_KEY, algorithm='HS256')
     
     def verify_token(self, token: str) -> Optional[Dict[str, Any]]:
+        key = TokenCache.key(token)
+        if self.tokens.is_revoked(key):
+            return None
+        payload = self.tokens.get(key)
+        if payload is not None:
+            return payload
+        
+        start = time.perf_counter()
         try:
             payload = jwt.decode(token, Config.SECRET_KEY, algorithms=['HS256'])
-            return payload
         except jwt.ExpiredSignatureError:
-            print("Token expired")
+            logger.info("Token expired")
             return None
         except jwt.InvalidTokenError:
-            print("Invalid token")
-            return None
\ No newline at end of file
+            logger.warning("Invalid token")
+            return None
+        finally:
+            self.tokens.record_decode(time.perf_counter() - start)
+        self.tokens.put(key, payload)
+        return payload
+    
+    def revoke_token(self, token: str) -> bool:
+        # Signature still checked, so only tokens we issued land on the denylist
+        try:
+            payload = jwt.decode(token, Config.SECRET_KEY, algorithms=['HS256'], options={'verify_exp': False})
+        except jwt.InvalidTokenError:
+            return False
+        self.tokens.revoke(TokenCache.key(token), payload.get('exp', time.time() + 8 * 3600))
+        return True
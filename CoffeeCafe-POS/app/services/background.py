@@ -0,0 +1,116 @@
+# Background Service Execution (app/services/background.py)
+
+import logging
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+class ServiceExecutor:
+    _instance: Optional['ServiceExecutor'] = None
+    _instance_lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    instance = super().__new__(cls)
+                    instance._initialize()
+                    cls._instance = instance
+        return cls._instance
+
+    def _initialize(self):
+        self.executor = ThreadPoolExecutor(max_workers=Config.SERVICE_WORKERS, thread_name_prefix="service")
+        self._latest: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._completed: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._root = None
+        self._poll_ms = 20
+
+    def attach(self, root, poll_ms: int = 20):
+        # Results are handed back on the Tk thread by polling from root.after()
+        self._root = root
+        self._poll_ms = poll_ms
+        self._poll()
+
+    def submit(self, fn: Callable[..., Any], *args,
+               on_done: Optional[Callable[[Any], None]] = None,
+               on_error: Optional[Callable[[BaseException], None]] = None,
+               key: Optional[str] = None, **kwargs) -> Future:
+        future = self.executor.submit(fn, *args, **kwargs)
+        if key is not None:
+            # A newer request under the same key makes the previous one stale
+            with self._lock:
+                previous = self._latest.get(key)
+                self._latest[key] = future
+            if previous is not None:
+                previous.cancel()
+        if on_done is not None or on_error is not None:
+            future.add_done_callback(lambda f: self._completed.put((f, on_done, on_error, key)))
+        return future
+
+    def cancel(self, key: str):
+        with self._lock:
+            future = self._latest.pop(key, None)
+        if future is not None:
+            future.cancel()
+
+    def _poll(self):
+        self.drain()
+        if self._root is not None:
+            try:
+                self._root.after(self._poll_ms, self._poll)
+            except Exception:
+                self._root = None  # the window is gone
+
+    def drain(self):
+        while True:
+            try:
+                future, on_done, on_error, key = self._completed.get_nowait()
+            except queue.Empty:
+                return
+            if future.cancelled():
+                continue
+            if key is not None:
+                with self._lock:
+                    if self._latest.get(key) is not future:
+                        continue
+                    del self._latest[key]
+            try:
+                error = future.exception()
+                if error is None:
+                    if on_done is not None:
+                        on_done(future.result())
+                elif on_error is not None:
+                    on_error(error)
+                else:
+                    logger.error(f"Background service call failed: {error}")
+            except Exception as e:
+                logger.error(f"Error delivering background result: {e}")
+
+    def shutdown(self, wait: bool = False):
+        self._root = None
+        self.executor.shutdown(wait=wait, cancel_futures=True)
+
+class NonBlockingService:
+    # service.nonblocking.method(*args, on_done=..., on_error=..., key=...) -> Future
+    def __init__(self, service: Any, executor: ServiceExecutor):
+        self._service = service
+        self._executor = executor
+
+    def __getattr__(self, name: str) -> Callable[..., Future]:
+        method = getattr(self._service, name)
+        if not callable(method):
+            raise AttributeError(f"{type(self._service).__name__}.{name} is not callable")
+
+        def submit(*args, on_done=None, on_error=None, key=None, **kwargs) -> Future:
+            return self._executor.submit(method, *args, on_done=on_done, on_error=on_error, key=key, **kwargs)
+        return submit
+
+class NonBlockingMixin:
+    @property
+    def nonblocking(self) -> NonBlockingService:
+        return NonBlockingService(self, ServiceExecutor())
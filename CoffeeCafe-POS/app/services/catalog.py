@@ -0,0 +1,117 @@
+# Product Catalog Cache (app/services/catalog.py)
+
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from app.services.search import ProductIndex
+from app.utils.cache import LRUCache
+
+def group_by_category(products: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    grouped: Dict[str, List[Dict[str, Any]]] = {}
+    for product in sorted(products, key=lambda p: p.get('name') or ''):
+        grouped.setdefault(product.get('category') or 'Uncategorized', []).append(product)
+    return dict(sorted(grouped.items()))
+
+class ProductCatalog:
+    def __init__(self, max_size: int = 5000, refresh_seconds: float = 300):
+        self._products = LRUCache(max_size)
+        self._lock = threading.RLock()
+        self.refresh_seconds = refresh_seconds
+        self.version: Optional[str] = None  # newest `updated_at` seen
+        self.loaded_at: Optional[float] = None
+        self.complete = False  # True while every product fits in the cache
+        self.index = ProductIndex()  # name search and PLU/barcode lookup, kept in step with _store
+
+    def load(self, products: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._products.clear()
+            self.index.clear()
+            self.version = None
+            self.complete = len(products) <= self._products.max_size
+            self._store(products)
+            self.loaded_at = time.monotonic()
+
+    def merge(self, products: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._store(products)
+            self.loaded_at = time.monotonic()
+
+    def put(self, product: Dict[str, Any]) -> None:
+        with self._lock:
+            self._store([product])
+
+    def _store(self, products: List[Dict[str, Any]]) -> None:
+        for product in products:
+            if product['id'] not in self._products and len(self._products) >= self._products.max_size:
+                # Evicting means category listings can no longer be answered from memory
+                self.complete = False
+            self._products.set(product['id'], product)
+            self.index.add(product)
+            updated_at = product.get('updated_at')
+            if updated_at and (self.version is None or updated_at > self.version):
+                self.version = updated_at
+
+    def get(self, product_id: str) -> Optional[Dict[str, Any]]:
+        return self._products.get(product_id)
+
+    def get_many(self, product_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        found = {}
+        for product_id in product_ids:
+            product = self._products.get(product_id)
+            if product is not None:
+                found[product_id] = product
+        return found
+
+    def search(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        with self._lock:
+            product_ids = self.index.search(query, limit)
+        found = self.get_many(product_ids)  # evicted rows drop out
+        return [found[product_id] for product_id in product_ids if product_id in found]
+
+    def lookup_code(self, code: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            product_id = self.index.lookup_code(code)
+        return None if product_id is None else self.get(product_id)
+
+    def by_category(self, category: str) -> Optional[List[Dict[str, Any]]]:
+        # None means "not answerable from memory", an empty list means "no products"
+        with self._lock:
+            if not self.complete:
+                return None
+            products = [
+                p for p in self._products.values()
+                if p.get('category') == category and p.get('is_active', True)
+            ]
+        return sorted(products, key=lambda p: p.get('name') or '')
+
+    def listing(self) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+        # Active products grouped by category, each group sorted by name
+        with self._lock:
+            if not self.complete:
+                return None
+            products = [p for p in self._products.values() if p.get('is_active', True)]
+        return group_by_category(products)
+
+    def all(self) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            if not self.complete:
+                return None
+            return sorted(self._products.values(), key=lambda p: p.get('name') or '')
+
+    def is_stale(self) -> bool:
+        return self.loaded_at is not None and time.monotonic() - self.loaded_at > self.refresh_seconds
+
+    def clear(self) -> None:
+        with self._lock:
+            self._products.clear()
+            self.index.clear()
+            self.version = None
+            self.loaded_at = None
+            self.complete = False
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self._products.stats()
+        stats['version'] = self.version
+        stats['complete'] = self.complete
+        stats['indexed'] = len(self.index)
+        return stats
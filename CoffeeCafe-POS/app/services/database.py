@@ -1,43 +1,276 @@
 # app/services/database.py
 
+import httpx
+from postgrest.utils import SyncClient
 from supabase import create_client, Client
+from supabase.lib.client_options import ClientOptions
 from app.config import Config
+from app.services.background import NonBlockingMixin
+from app.services.catalog import ProductCatalog, group_by_category
+from app.utils.cache import LRUCache
+from app.utils.helpers import normalize_phone
+from concurrent.futures import Future, ThreadPoolExecutor
+import importlib.util
 import logging
-from typing import Optional, Dict, List, Any
+import threading
+import time
+import uuid
+from typing import Optional, Dict, Iterable, Iterator, List, Any, Callable, Tuple
 
 logger = logging.getLogger(__name__)
 
-class DatabaseService:
+def http_timeout() -> httpx.Timeout:
+    return httpx.Timeout(
+        connect=Config.HTTP_CONNECT_TIMEOUT,
+        read=Config.HTTP_READ_TIMEOUT,
+        write=Config.HTTP_WRITE_TIMEOUT,
+        pool=Config.HTTP_POOL_TIMEOUT
+    )
+
+def tune_postgrest_session(postgrest) -> bool:
+    # supabase builds PostgREST's httpx client with default limits and HTTP/1.1 only; swap in one
+    # sized for our worker threads that keeps connections alive between sales. The Client is
+    # thread-safe, so every service shares this one pool.
+    session = getattr(postgrest, 'session', None)
+    if not isinstance(session, httpx.Client):
+        return False
+    http2 = Config.HTTP2 and importlib.util.find_spec('h2') is not None
+    postgrest.session = SyncClient(
+        base_url=session.base_url,
+        headers=session.headers,
+        timeout=http_timeout(),
+        limits=httpx.Limits(
+            max_connections=Config.HTTP_POOL_SIZE,
+            max_keepalive_connections=Config.HTTP_POOL_SIZE,
+            keepalive_expiry=Config.HTTP_KEEPALIVE_SECONDS
+        ),
+        http2=http2
+    )
+    session.close()
+    logger.info(f"HTTP pool: {Config.HTTP_POOL_SIZE} connections, HTTP/{'2' if http2 else '1.1'}")
+    return True
+
+# Coalesces product lookups issued during one event-loop tick into a single `in` query
+class ProductLoader:
+    max_batch_size = 200  # keeps the `id=in.(...)` query string well under URL limits
+    
+    def __init__(self, db: 'DatabaseService'):
+        self.db = db
+        self._pending: Dict[str, List[Future]] = {}
+        self._lock = threading.Lock()
+        self._scheduler: Optional[Callable[[Callable[[], None]], Any]] = None
+        self._scheduled = False
+        self.batches = 0
+        self.requested = 0
+    
+    def set_scheduler(self, scheduler: Optional[Callable[[Callable[[], None]], Any]]):
+        # e.g. a Tk widget's `after_idle`, so queued loads dispatch at the end of the tick
+        self._scheduler = scheduler
+    
+    def load(self, product_id: str) -> Future:
+        future: Future = Future()
+        product = self.db.catalog.get(product_id)
+        if product is not None:
+            future.set_result(product)
+            return future
+        
+        # Only the Tk thread may schedule; worker threads dispatch when they need the result
+        on_tk_thread = threading.current_thread() is threading.main_thread()
+        with self._lock:
+            self._pending.setdefault(product_id, []).append(future)
+            schedule = self._scheduler is not None and on_tk_thread and not self._scheduled
+            self._scheduled = self._scheduled or schedule
+        if schedule:
+            self._scheduler(self.dispatch)
+        return future
+    
+    def load_many(self, product_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        futures = {product_id: self.load(product_id) for product_id in product_ids}
+        if not all(f.done() for f in futures.values()):
+            self.dispatch()
+        return {product_id: f.result() for product_id, f in futures.items()}
+    
+    def dispatch(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._scheduled = False
+        if not pending:
+            return
+        
+        ids = list(pending)
+        products: Dict[str, Dict[str, Any]] = {}
+        for start in range(0, len(ids), self.max_batch_size):
+            products.update(self.db._fetch_products(ids[start:start + self.max_batch_size]))
+        self.batches += 1
+        self.requested += len(ids)
+        
+        for product_id, futures in pending.items():
+            for future in futures:
+                future.set_result(products.get(product_id))
+
+class DatabaseService(NonBlockingMixin):
     _instance: Optional['DatabaseService'] = None
+    _instance_lock = threading.Lock()
     
     def __new__(cls):
+        # Double-checked so worker threads racing the first call share one instance
         if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._instance._initialize()
+            with cls._instance_lock:
+                if cls._instance is None:
+                    instance = super().__new__(cls)
+                    instance._initialize()
+                    cls._instance = instance
         return cls._instance
     
     def _initialize(self):
         Config.validate()
-        self.client: Client = create_client(Config.SUPABASE_URL, Config.SUPABASE_KEY)
+        self.client: Client = create_client(Config.SUPABASE_URL, Config.SUPABASE_KEY,
+                                            options=ClientOptions(postgrest_client_timeout=http_timeout()))
+        # Built lazily by supabase; create (and tune) it before threads share the client. The app
+        # never signs in through supabase auth, which is what would make supabase rebuild it.
+        tune_postgrest_session(self.client.postgrest)
+        self.catalog = ProductCatalog(Config.CATALOG_CACHE_SIZE, Config.CATALOG_REFRESH_SECONDS)
+        self.product_loader = ProductLoader(self)
+        # Recently seen customers, under both ('phone', e164) and ('id', id)
+        self.customers = LRUCache(Config.CUSTOMER_CACHE_SIZE, ttl=Config.CUSTOMER_CACHE_SECONDS)
         logger.info("Database service initialized")
     
+    def warm_up(self) -> bool:
+        # Opens a pooled connection (DNS, TCP, TLS) while the login screen is up, so the
+        # login query and the first sale reuse it instead of paying for the handshake
+        start = time.perf_counter()
+        try:
+            self.client.table('products').select('id').limit(1).execute()
+            logger.info(f"Database connection warmed in {time.perf_counter() - start:.3f}s")
+            return True
+        except Exception as e:
+            logger.warning(f"Could not warm database connection: {e}")
+            return False
+    
+    def ping(self) -> bool:
+        # One cheap round trip: tells an unreachable server apart from one rejecting a request
+        try:
+            self.client.table('products').select('id').limit(1).execute()
+            return True
+        except Exception:
+            return False
+    
+    # Catalog Operations
+    def load_catalog(self) -> bool:
+        try:
+            response = self.client.table('products').select('*').execute()
+            self.catalog.load(response.data)
+            logger.info(f"Loaded {len(response.data)} products into catalog")
+            return True
+        except Exception as e:
+            logger.error(f"Error loading product catalog: {e}")
+            return False
+    
+    def refresh_catalog(self) -> bool:
+        if self.catalog.version is None:
+            return self.load_catalog()
+        try:
+            response = self.client.table('products').select('*').gt('updated_at', self.catalog.version).execute()
+            self.catalog.merge(response.data)
+            return True
+        except Exception as e:
+            logger.error(f"Error refreshing product catalog: {e}")
+            return False
+    
     # Product Operations
     def get_product(self, product_id: str) -> Optional[Dict[str, Any]]:
+        # Misses join whatever else was queued this tick and go out as one query
+        future = self.product_loader.load(product_id)
+        if not future.done():
+            self.product_loader.dispatch()
+        return future.result()
+    
+    def get_products_by_ids(self, product_ids: List[str], raise_errors: bool = False) -> Dict[str, Optional[Dict[str, Any]]]:
+        if not raise_errors:
+            return self.product_loader.load_many(product_ids)
+        # For callers that cache the result: a failed query raises instead of coming back as missing products
+        products = {product_id: self.catalog.get(product_id) for product_id in product_ids}
+        missing = [product_id for product_id, product in products.items() if product is None]
+        for start in range(0, len(missing), ProductLoader.max_batch_size):
+            products.update(self._select_products(missing[start:start + ProductLoader.max_batch_size]))
+        return products
+    
+    def _fetch_products(self, product_ids: List[str]) -> Dict[str, Dict[str, Any]]:
         try:
-            response = self.client.table('products').select('*').eq('id', product_id).execute()
-            return response.data[0] if response.data else None
+            return self._select_products(product_ids)
         except Exception as e:
-            logger.error(f"Error fetching product: {e}")
-            return None
+            logger.error(f"Error fetching products: {e}")
+            return {}
+    
+    def _select_products(self, product_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        response = self.client.table('products').select('*').in_('id', product_ids).execute()
+        for product in response.data:
+            self.catalog.put(product)
+        return {product['id']: product for product in response.data}
+    
+    def get_products(self) -> List[Dict[str, Any]]:
+        products = self.catalog.all()
+        if products is not None:
+            return products
+        try:
+            response = self.client.table('products').select('*').execute()
+            return response.data
+        except Exception as e:
+            logger.error(f"Error fetching products: {e}")
+            return []
     
     def get_products_by_category(self, category: str) -> List[Dict[str, Any]]:
+        if self.catalog.is_stale():
+            self.refresh_catalog()
+        products = self.catalog.by_category(category)
+        if products is not None:
+            return products
         try:
             response = self.client.table('products').select('*').eq('category', category).eq('is_active', True).execute()
+            for product in response.data:
+                self.catalog.put(product)
             return response.data
         except Exception as e:
             logger.error(f"Error fetching products: {e}")
             return []
     
+    def search_products(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        # Answered from the catalog's index; cheap enough to run on every keystroke
+        return self.catalog.search(query, limit)
+    
+    def find_product_by_code(self, code: str) -> Optional[Dict[str, Any]]:
+        # Scanner input: a barcode or PLU
+        product = self.catalog.lookup_code(code)
+        if product is not None or self.catalog.complete:
+            return product
+        try:
+            for column in ('barcode', 'plu'):
+                response = self.client.table('products').select('*').eq(column, code.strip()).eq('is_active', True).limit(1).execute()
+                if response.data:
+                    self.catalog.put(response.data[0])
+                    return response.data[0]
+            return None
+        except Exception as e:
+            logger.error(f"Error looking up product code: {e}")
+            return None
+    
+    def get_category_listing(self, refresh: bool = False) -> Dict[str, List[Dict[str, Any]]]:
+        # Every category's active products in one pass, so the grid can switch categories
+        # without going back to the database; refresh pulls in rows changed since the last sync
+        if self.catalog.loaded_at is None:
+            self.load_catalog()
+        elif refresh or self.catalog.is_stale():
+            self.refresh_catalog()
+        listing = self.catalog.listing()
+        if listing is not None:
+            return listing
+        try:
+            response = self.client.table('products').select('*').eq('is_active', True).execute()
+            return group_by_category(response.data)
+        except Exception as e:
+            logger.error(f"Error fetching products: {e}")
+            return {}
+    
     # Order Operations
     def create_order(self, order_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         try:
@@ -47,6 +280,52 @@ class DatabaseService:
             logger.error(f"Error creating order: {e}")
             return None
     
+    def iter_orders(self, start: str, end: str, columns: str = '*',
+                    page_size: int = Config.REPORT_PAGE_SIZE, prefetch: bool = True) -> Iterator[List[Dict[str, Any]]]:
+        # Yields orders with start <= created_at <= end one page at a time, keyset-paginated on
+        # (created_at, id) so pages stay cheap deep into the range and never hit the PostgREST
+        # row cap. With prefetch the next page is in flight while the caller works on this one.
+        # Errors propagate; a partial stream must not pass for a complete one.
+        cursor: Optional[Tuple[str, str, Optional[str]]] = ('from', start, None)
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="order-pages") as pages:
+            pending = pages.submit(self._fetch_order_page, end, columns, cursor, page_size) if prefetch else None
+            while cursor is not None:
+                if pending is not None:
+                    rows, cursor = pending.result()
+                    pending = pages.submit(self._fetch_order_page, end, columns, cursor, page_size) if cursor else None
+                else:
+                    rows, cursor = self._fetch_order_page(end, columns, cursor, page_size)
+                if rows:
+                    yield rows
+    
+    def _fetch_order_page(self, end: str, columns: str, cursor: Tuple[str, str, Optional[str]],
+                          page_size: int) -> Tuple[List[Dict[str, Any]], Optional[Tuple[str, str, Optional[str]]]]:
+        # cursor modes: 'from' (created_at >= ts, skipping ids <= last id at ts itself),
+        # 'ties' (more orders share ts than fit in a page; walk them by id), 'after' (created_at > ts)
+        mode, created_at, last_id = cursor
+        query = self.client.table('orders').select(columns)
+        if mode == 'ties':
+            query = query.eq('created_at', created_at).gt('id', last_id)
+        elif mode == 'after':
+            query = query.gt('created_at', created_at).lte('created_at', end)
+        else:
+            query = query.gte('created_at', created_at).lte('created_at', end)
+        rows = query.order('created_at,id').limit(page_size).execute().data
+        full = len(rows) == page_size
+        
+        if mode == 'from' and last_id is not None:
+            fresh = [row for row in rows if row['created_at'] != created_at or row['id'] > last_id]
+            if full and not fresh:
+                return self._fetch_order_page(end, columns, ('ties', created_at, last_id), page_size)
+            rows = fresh
+        if mode == 'ties' and not full:
+            return rows, ('after', created_at, None)
+        if not full or not rows:
+            return rows, None
+        if mode == 'ties':
+            return rows, ('ties', created_at, rows[-1]['id'])
+        return rows, ('from', rows[-1]['created_at'], rows[-1]['id'])
+    
     def add_order_items(self, order_id: str, items: List[Dict[str, Any]]) -> bool:
         try:
             self.client.table('order_items').insert(items).execute()
@@ -55,11 +334,86 @@ class DatabaseService:
             logger.error(f"Error adding order items: {e}")
             return False
     
+    def commit_order(self, order: Dict[str, Any], items: List[Dict[str, Any]],
+                     loyalty_points: int = 0, idempotency_key: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        # Order, items and loyalty accrual are written by one server-side transaction
+        results = self.commit_orders([{
+            'idempotency_key': idempotency_key or order.get('id') or str(uuid.uuid4()),
+            'order': order,
+            'items': items,
+            'loyalty_points': loyalty_points
+        }])
+        return results[0] if results else None
+    
+    def commit_orders(self, commits: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+        # A key the server has already seen returns the original order instead of a duplicate
+        try:
+            response = self.client.rpc('commit_orders', {'commits': commits}).execute()
+            return response.data
+        except Exception as e:
+            logger.error(f"Error committing orders: {e}")
+            return None
+    
     # Customer Operations
     def get_customer_by_phone(self, phone: str) -> Optional[Dict[str, Any]]:
+        # Exact match on the stored E.164 form, so the lookup can use the phone index
+        e164 = normalize_phone(phone)
+        if e164 is None:
+            return None
+        customer = self.customers.get(('phone', e164))
+        if customer is not None:
+            return customer
         try:
-            response = self.client.table('customers').select('*').eq('phone', phone).execute()
-            return response.data[0] if response.data else None
+            response = self.client.table('customers').select('*').eq('phone', e164).execute()
+            if not response.data:
+                return None
+            self._remember_customer(response.data[0])
+            return response.data[0]
+        except Exception as e:
+            logger.error(f"Error fetching customer: {e}")
+            return None
+    
+    def get_customer(self, customer_id: str) -> Optional[Dict[str, Any]]:
+        customer = self.customers.get(('id', customer_id))
+        if customer is not None:
+            return customer
+        try:
+            response = self.client.table('customers').select('*').eq('id', customer_id).execute()
+            if not response.data:
+                return None
+            self._remember_customer(response.data[0])
+            return response.data[0]
         except Exception as e:
             logger.error(f"Error fetching customer: {e}")
-            return None
\ No newline at end of file
+            return None
+    
+    def create_customer(self, name: str, phone: str) -> Optional[Dict[str, Any]]:
+        e164 = normalize_phone(phone)
+        if e164 is None:
+            logger.error(f"Error creating customer: invalid phone number {phone!r}")
+            return None
+        try:
+            response = self.client.table('customers').insert({
+                'name': name,
+                'phone': e164
+            }).execute()
+            if not response.data:
+                return None
+            self._remember_customer(response.data[0])
+            return response.data[0]
+        except Exception as e:
+            logger.error(f"Error creating customer: {e}")
+            return None
+    
+    def _remember_customer(self, customer: Dict[str, Any]):
+        self.customers.set(('id', customer['id']), customer)
+        if customer.get('phone'):
+            self.customers.set(('phone', customer['phone']), customer)
+    
+    def forget_customers(self, customer_ids: Iterable[str]):
+        # Their points changed on the server; the next lookup fetches the row again. Changes
+        # made by other registers are only bounded by the cache TTL.
+        for customer_id in customer_ids:
+            customer = self.customers.pop(('id', customer_id))
+            if customer is not None and customer.get('phone'):
+                self.customers.pop(('phone', customer['phone']))
\ No newline at end of file
@@ -1,14 +1,51 @@
 # Inventory Management (app/services/inventory.py)
 
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Any
+from app.services.background import NonBlockingMixin
 from app.services.database import DatabaseService
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
-class InventoryService:
+class StockIndex:
+    # product_id -> {product_id, name, category, quantity}; filtering and sorting run in memory
+    def __init__(self):
+        self._rows: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+    
+    def load(self, rows: List[Dict[str, Any]]):
+        with self._lock:
+            self._rows = {row['product_id']: row for row in rows}
+    
+    def get(self, product_id: str) -> Optional[Dict[str, Any]]:
+        return self._rows.get(product_id)
+    
+    def set_quantity(self, product_id: str, quantity: int):
+        with self._lock:
+            if product_id in self._rows:
+                self._rows[product_id] = dict(self._rows[product_id], quantity=quantity)
+    
+    def categories(self) -> List[str]:
+        return sorted({row['category'] for row in self._rows.values() if row['category']})
+    
+    def query(self, category: Optional[str] = None, low_stock_threshold: Optional[int] = None,
+              sort_by: str = 'name', descending: bool = False) -> List[Dict[str, Any]]:
+        rows = list(self._rows.values())
+        if category:
+            rows = [row for row in rows if row['category'] == category]
+        if low_stock_threshold is not None:
+            rows = [row for row in rows if row['quantity'] < low_stock_threshold]
+        rows.sort(key=lambda row: (row[sort_by] is None, row[sort_by]), reverse=descending)
+        return rows
+    
+    def __len__(self) -> int:
+        return len(self._rows)
+
+class InventoryService(NonBlockingMixin):
     def __init__(self):
         self.db = DatabaseService()
+        self.stock_index = StockIndex()
     
     def get_stock_level(self, product_id: str) -> int:
         try:
@@ -18,6 +55,28 @@ class InventoryService:
             logger.error(f"Error checking stock: {e}")
             return 0
     
+    def get_all_stock(self) -> List[Dict[str, Any]]:
+        # Products and their inventory rows in one embedded query instead of one per product
+        try:
+            response = self.db.client.table('products').select('id, name, category, inventory(quantity)').execute()
+        except Exception as e:
+            logger.error(f"Error fetching stock levels: {e}")
+            return []
+        
+        rows = []
+        for product in response.data:
+            inventory = product.get('inventory') or []
+            if isinstance(inventory, dict):
+                inventory = [inventory]
+            rows.append({
+                'product_id': product['id'],
+                'name': product.get('name') or '',
+                'category': product.get('category') or '',
+                'quantity': inventory[0]['quantity'] if inventory else 0
+            })
+        self.stock_index.load(rows)
+        return rows
+    
     def update_stock(self, product_id: str, quantity_change: int) -> bool:
         try:
             current = self.get_stock_level(product_id)
@@ -28,11 +87,41 @@ class InventoryService:
                 'product_id': product_id,
                 'quantity': current + quantity_change
             }).execute()
+            self.stock_index.set_quantity(product_id, current + quantity_change)
             return True
         except Exception as e:
             logger.error(f"Error updating inventory: {e}")
             return False
     
+    def apply_order(self, items: List[Dict[str, Any]], order_id: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+        results = self.apply_orders([{'order_id': order_id, 'items': items}])
+        return results[0]['items'] if results else None
+    
+    def apply_orders(self, orders: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+        # One server-side transaction decrements every line with `quantity >= n` as the guard,
+        # so concurrent registers never lose updates. Orders already applied (by order_id) are skipped.
+        payload = [{
+            'order_id': order.get('order_id'),
+            'items': [{'product_id': item['product_id'], 'quantity': item['quantity']} for item in order['items']]
+        } for order in orders]
+        try:
+            response = self.db.client.rpc('apply_stock_orders', {'orders': payload}).execute()
+            results = response.data
+            if not isinstance(results, list):
+                raise ValueError(f"expected a list of orders, got {type(results).__name__}")
+            for order in results:
+                for item in order['items']:
+                    if item.get('quantity') is not None:
+                        self.stock_index.set_quantity(item['product_id'], item['quantity'])
+                rejected = [item['product_id'] for item in order['items'] if not item.get('applied')]
+                if rejected:
+                    logger.warning(f"Insufficient stock for order {order.get('order_id')}: {', '.join(rejected)}")
+        except Exception as e:
+            # None makes the sync worker back off and replay; the RPC skips orders it already applied
+            logger.error(f"Error applying stock changes: {e}")
+            return None
+        return results
+    
     def get_low_stock_items(self, threshold: int = 5) -> List[Dict[str, Any]]:
         try:
             response = self.db.client.table('inventory').select('*, products(*)').lt('quantity', threshold).execute()
@@ -0,0 +1,275 @@
+# Offline Order Journal (app/services/journal.py)
+
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from app.config import Config
+from app.services.database import DatabaseService
+from app.services.inventory import InventoryService
+from app.services.loyalty import LoyaltyService
+
+logger = logging.getLogger(__name__)
+
+class OrderJournal:
+    def __init__(self, path: str = Config.JOURNAL_PATH, max_rejections: int = Config.SYNC_MAX_REJECTIONS):
+        self.path = path
+        self.max_rejections = max_rejections
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS order_journal (
+                id TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL DEFAULT 0,
+                last_error TEXT,
+                synced_at REAL
+            )
+        """)
+        # rejections: failures of this order on its own against a reachable server.
+        # quarantined_at: set once it has been rejected max_rejections times; it stops being retried.
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(order_journal)")}
+        if 'rejections' not in columns:
+            self._conn.execute("ALTER TABLE order_journal ADD COLUMN rejections INTEGER NOT NULL DEFAULT 0")
+        if 'quarantined_at' not in columns:
+            self._conn.execute("ALTER TABLE order_journal ADD COLUMN quarantined_at REAL")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_order_journal_pending "
+            "ON order_journal (synced_at, next_attempt_at)"
+        )
+
+    def append(self, order: Dict[str, Any], items: List[Dict[str, Any]],
+               loyalty: Optional[Dict[str, Any]] = None) -> str:
+        # The order id is generated here so items can reference it before the server sees it
+        order = dict(order, id=order.get('id') or str(uuid.uuid4()),
+                     created_at=order.get('created_at') or datetime.now(timezone.utc).isoformat())
+        items = [dict(item, id=item.get('id') or str(uuid.uuid4()), order_id=order['id']) for item in items]
+        payload = json.dumps({'order': order, 'items': items, 'loyalty': loyalty}, default=str)
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO order_journal (id, payload, created_at) VALUES (?, ?, ?)",
+                (order['id'], payload, time.time())
+            )
+        return order['id']
+
+    def due(self, limit: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, payload, attempts, rejections FROM order_journal "
+                "WHERE synced_at IS NULL AND quarantined_at IS NULL AND next_attempt_at <= ? "
+                "ORDER BY created_at LIMIT ?",
+                (time.time(), limit)
+            ).fetchall()
+        return [dict(json.loads(payload), journal_id=entry_id, attempts=attempts, rejections=rejections)
+                for entry_id, payload, attempts, rejections in rows]
+
+    def mark_synced(self, entry_ids: List[str]):
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE order_journal SET synced_at = ?, last_error = NULL WHERE id = ?",
+                [(time.time(), entry_id) for entry_id in entry_ids]
+            )
+
+    def mark_failed(self, entry_ids: List[str], error: str, retry_in: float, rejected: bool = False):
+        # Only rejections count towards quarantine, so an outage never parks good orders
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE order_journal SET attempts = attempts + 1, rejections = rejections + ?, "
+                "last_error = ?, next_attempt_at = ?, "
+                "quarantined_at = CASE WHEN rejections + ? >= ? THEN ? ELSE quarantined_at END WHERE id = ?",
+                [(int(rejected), error, now + retry_in, int(rejected), self.max_rejections, now, entry_id)
+                 for entry_id in entry_ids]
+            )
+
+    def requeue_quarantined(self) -> int:
+        # Once whatever the server objected to is fixed, put quarantined orders back in line
+        with self._lock:
+            return self._conn.execute(
+                "UPDATE order_journal SET quarantined_at = NULL, rejections = 0, next_attempt_at = 0 "
+                "WHERE synced_at IS NULL AND quarantined_at IS NOT NULL"
+            ).rowcount
+
+    def pending_loyalty(self, customer_id: str) -> List[float]:
+        # Amounts spent in checkouts that have not reached the server, for balance lookups
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT json_extract(payload, '$.loyalty.amount_spent') FROM order_journal "
+                "WHERE synced_at IS NULL AND quarantined_at IS NULL "
+                "AND json_extract(payload, '$.loyalty.customer_id') = ?",
+                (customer_id,)
+            ).fetchall()
+        return [amount for (amount,) in rows if amount is not None]
+
+    def queue_depth(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM order_journal WHERE synced_at IS NULL AND quarantined_at IS NULL"
+            ).fetchone()[0]
+
+    def sync_lag(self) -> float:
+        # Age in seconds of the oldest order that has not reached the server yet
+        with self._lock:
+            oldest = self._conn.execute(
+                "SELECT MIN(created_at) FROM order_journal WHERE synced_at IS NULL AND quarantined_at IS NULL"
+            ).fetchone()[0]
+        return time.time() - oldest if oldest is not None else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            failing, quarantined = self._conn.execute(
+                "SELECT COALESCE(SUM(quarantined_at IS NULL AND attempts > 0), 0), "
+                "COALESCE(SUM(quarantined_at IS NOT NULL), 0) "
+                "FROM order_journal WHERE synced_at IS NULL"
+            ).fetchone()
+        return {
+            'queue_depth': self.queue_depth(),
+            'sync_lag_seconds': self.sync_lag(),
+            'failing': failing,
+            'quarantined': quarantined
+        }
+
+    def purge_synced(self, older_than: float = 7 * 24 * 3600):
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM order_journal WHERE synced_at IS NOT NULL AND synced_at < ?",
+                (time.time() - older_than,)
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+class JournalSyncWorker(threading.Thread):
+    def __init__(self, journal: OrderJournal, db: Optional[DatabaseService] = None,
+                 interval: float = Config.SYNC_INTERVAL_SECONDS,
+                 batch_size: int = Config.SYNC_BATCH_SIZE,
+                 max_backoff: float = Config.SYNC_MAX_BACKOFF_SECONDS):
+        super().__init__(name="journal-sync", daemon=True)
+        self.journal = journal
+        self.db = db or DatabaseService()
+        self.loyalty = LoyaltyService(journal=journal)
+        self.inventory = InventoryService()
+        self._rollups = None
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_backoff = max_backoff
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+
+    @property
+    def rollups(self):
+        # Rollups and the report cache pull in pandas, so they are imported on the first
+        # synced batch, on this thread, instead of with app.main before the login screen
+        if self._rollups is None:
+            from app.services.rollups import RollupService
+            self._rollups = RollupService()
+        return self._rollups
+
+    def notify(self):
+        # Called after a checkout so the new order is pushed without waiting a full interval
+        self._wake_event.set()
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop_event.set()
+        self._wake_event.set()
+        self.join(timeout)
+
+    def run(self):
+        logger.info("Order journal sync worker started")
+        while not self._stop_event.is_set():
+            self._wake_event.clear()
+            try:
+                synced = self.sync_once()
+            except Exception as e:
+                logger.error(f"Order journal sync failed: {e}")
+                synced = 0
+            if synced < self.batch_size:
+                self._wake_event.wait(self.interval)
+
+    def sync_once(self) -> int:
+        entries = self.journal.due(self.batch_size)
+        if not entries:
+            return 0
+        if self._push(entries):
+            self._mark_synced(entries)
+            return len(entries)
+
+        # One order the server rejects must not fail the rest of its batch. With the server
+        # reachable, bisect down to the rejected orders; otherwise back off the whole batch.
+        if not self.db.ping():
+            retry_in = self._backoff(min(entry['attempts'] for entry in entries))
+            self.journal.mark_failed([entry['journal_id'] for entry in entries], "batch commit failed", retry_in)
+            logger.warning(f"Order sync failed for {len(entries)} orders, retrying in {retry_in:.0f}s")
+            return 0
+
+        synced, rejected = self._bisect(entries)
+        if synced:
+            self._mark_synced(synced)
+        for entry in rejected:
+            self.journal.mark_failed([entry['journal_id']], "rejected by server", self._backoff(entry['attempts']), rejected=True)
+            if entry['rejections'] + 1 >= self.journal.max_rejections:
+                logger.error(f"Order {entry['journal_id']} rejected {entry['rejections'] + 1} times, quarantined")
+            else:
+                logger.warning(f"Order {entry['journal_id']} rejected by server ({entry['rejections'] + 1}/{self.journal.max_rejections})")
+        return len(synced)
+
+    def _push(self, entries: List[Dict[str, Any]]) -> bool:
+        commits = [{
+            'idempotency_key': entry['journal_id'],
+            'order': entry['order'],
+            'items': entry['items'],
+            'loyalty_points': self._loyalty_points(entry)
+        } for entry in entries]
+        stock_orders = [{'order_id': entry['journal_id'], 'items': entry['items']} for entry in entries]
+        rollup_orders = [dict(entry['order'], order_items=entry['items']) for entry in entries]
+
+        # All three calls are idempotent per order, so a failed batch is simply replayed
+        return (self.db.commit_orders(commits) is not None
+                and self.inventory.apply_orders(stock_orders) is not None
+                and self.rollups.record_orders(rollup_orders))
+
+    def _bisect(self, entries: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        # entries failed together; returns (synced, rejected)
+        if len(entries) == 1:
+            return [], entries
+        middle = len(entries) // 2
+        synced, rejected = [], []
+        for half in (entries[:middle], entries[middle:]):
+            if self._push(half):
+                synced += half
+            else:
+                half_synced, half_rejected = self._bisect(half)
+                synced += half_synced
+                rejected += half_rejected
+        return synced, rejected
+
+    def _mark_synced(self, entries: List[Dict[str, Any]]):
+        from app.services.reporting import ReportingService
+        self.journal.mark_synced([entry['journal_id'] for entry in entries])
+        ReportingService.cache.invalidate_orders(
+            entry['order']['created_at'] for entry in entries if entry['order'].get('created_at'))
+        self.db.forget_customers(entry['order']['customer_id'] for entry in entries if entry['order'].get('customer_id'))
+        logger.info(f"Synced {len(entries)} orders, {self.journal.queue_depth()} pending")
+
+    def _loyalty_points(self, entry: Dict[str, Any]) -> int:
+        loyalty = entry.get('loyalty')
+        if not loyalty or not entry['order'].get('customer_id'):
+            return 0
+        return self.loyalty.points_for(loyalty['amount_spent'])
+
+    def _backoff(self, attempts: int) -> float:
+        delay = min(self.max_backoff, self.interval * (2 ** attempts))
+        return delay * random.uniform(0.5, 1.0)
@@ -1,27 +1,44 @@
 # Loyalty Program (app/services/loyalty.py)
 
+from app.services.background import NonBlockingMixin
 from app.services.database import DatabaseService
-from typing import Optional, Dict
+from typing import TYPE_CHECKING, Optional
 import logging
 
+if TYPE_CHECKING:
+    from app.services.journal import OrderJournal
+
 logger = logging.getLogger(__name__)
 
-class LoyaltyService:
-    def __init__(self):
+class LoyaltyService(NonBlockingMixin):
+    def __init__(self, journal: Optional['OrderJournal'] = None):
         self.db = DatabaseService()
+        self.journal = journal  # checkouts still waiting to sync carry their own accruals
         self.points_per_dollar = 1  # 1 point per $1 spent
         self.point_value = 0.05    # $0.05 value per point
     
     def get_customer_points(self, customer_id: str) -> int:
+        # Server balance plus accruals the server has not seen yet
         try:
             response = self.db.client.table('customers').select('points').eq('id', customer_id).execute()
-            return response.data[0]['points'] if response.data else 0
+            points = response.data[0]['points'] if response.data else 0
         except Exception as e:
             logger.error(f"Error getting customer points: {e}")
+            points = 0
+        return points + self.pending_points(customer_id)
+    
+    def pending_points(self, customer_id: str) -> int:
+        # Checkouts still in the order journal; commit_orders credits them when they sync
+        if self.journal is None:
             return 0
+        return sum(self.points_for(amount) for amount in self.journal.pending_loyalty(customer_id))
+    
+    def points_for(self, amount_spent: float) -> int:
+        return int(amount_spent * self.points_per_dollar)
     
     def add_points(self, customer_id: str, amount_spent: float) -> bool:
-        points_to_add = int(amount_spent * self.points_per_dollar)
+        # For accruals outside checkout; checkouts are credited by commit_orders
+        points_to_add = self.points_for(amount_spent)
         try:
             self.db.client.rpc('increment_points', {
                 'customer_id': customer_id,
@@ -31,19 +48,22 @@ class LoyaltyService:
         except Exception as e:
             logger.error(f"Error adding loyalty points: {e}")
             return False
+        finally:
+            self.db.forget_customers([customer_id])
     
     def redeem_points(self, customer_id: str, points: int) -> Optional[float]:
-        current_points = self.get_customer_points(customer_id)
-        if current_points < points:
-            return None
-        
-        discount = points * self.point_value
+        # The balance check and the decrement are one statement on the server, so two
+        # registers cannot both spend the same points.
         try:
-            self.db.client.rpc('decrement_points', {
+            response = self.db.client.rpc('redeem_points', {
                 'customer_id': customer_id,
                 'points': points
             }).execute()
-            return discount
         except Exception as e:
             logger.error(f"Error redeeming points: {e}")
-            return None
\ No newline at end of file
+            return None
+        finally:
+            self.db.forget_customers([customer_id])  # the cached balance is out of date either way
+        if response.data is None:
+            return None  # not enough points
+        return points * self.point_value
@@ -1,33 +1,184 @@
 # Reporting System (app/services/reporting.py)
 
-from datetime import datetime, timedelta
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from app.config import Config
+from app.services.aggregation import SALES_COLUMNS, SalesAggregator, SalesSummary
+from app.services.background import NonBlockingMixin, ServiceExecutor
 from app.services.database import DatabaseService
-from typing import List, Dict
+from app.services.rollups import RollupService
+from app.utils.cache import LRUCache
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Union
 import logging
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
-class ReportingService:
+def _as_utc(moment: Union[str, datetime]) -> datetime:
+    if isinstance(moment, str):
+        moment = datetime.fromisoformat(moment)
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)  # naive times are stored as UTC
+
+@dataclass
+class CachedReport:
+    value: Any
+    start: Optional[datetime]  # None: unbounded
+    end: Optional[datetime]    # None: up to now, so every new order lands in it
+    loaded_at: float
+    stale: bool = False
+    
+    def covers(self, moment: datetime) -> bool:
+        return (self.start is None or self.start <= moment) and (self.end is None or moment <= self.end)
+
+class ReportCache:
+    # Report results keyed by report type and window. Entries past the TTL, or whose window
+    # gained an order, are served stale once more while a background refresh replaces them.
+    def __init__(self, max_size: int = Config.REPORT_CACHE_SIZE, ttl: float = Config.REPORT_CACHE_TTL_SECONDS):
+        self.ttl = ttl
+        self._entries = LRUCache(max_size)
+        self._refreshing = set()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable) -> Optional[CachedReport]:
+        entry = self._entries.get(key)
+        if entry is not None and not entry.stale and time.monotonic() - entry.loaded_at > self.ttl:
+            entry.stale = True
+        return entry
+    
+    def put(self, key: Hashable, value: Any, start: Optional[datetime] = None, end: Optional[datetime] = None):
+        self._entries.set(key, CachedReport(
+            value,
+            _as_utc(start) if start is not None else None,
+            _as_utc(end) if end is not None else None,
+            time.monotonic()
+        ))
+    
+    def invalidate_orders(self, created_at: Iterable[Union[str, datetime]]):
+        # Called once orders reach the server; only windows containing one of them go stale
+        moments = [_as_utc(moment) for moment in created_at]
+        for entry in self._entries.values():
+            if any(entry.covers(moment) for moment in moments):
+                entry.stale = True
+    
+    def begin_refresh(self, key: Hashable) -> bool:
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+    
+    def end_refresh(self, key: Hashable):
+        with self._lock:
+            self._refreshing.discard(key)
+    
+    def clear(self):
+        self._entries.clear()
+    
+    def stats(self) -> Dict[str, int]:
+        return self._entries.stats()
+
+class ReportingService(NonBlockingMixin):
+    cache = ReportCache()  # shared by every ReportingService; the journal sync worker invalidates it
+    
     def __init__(self):
         self.db = DatabaseService()
+        self.rollups = RollupService()
+    
+    def _cached(self, key: Hashable, start: Optional[datetime], end: Optional[datetime],
+                compute: Callable[[], Any]) -> Any:
+        # compute() raises on failure so errors are never cached
+        entry = self.cache.get(key)
+        if entry is None:
+            value = compute()
+            self.cache.put(key, value, start, end)
+            return value
+        if entry.stale and self.cache.begin_refresh(key):
+            ServiceExecutor().submit(self._refresh, key, start, end, compute)
+        return entry.value
+    
+    def _refresh(self, key: Hashable, start: Optional[datetime], end: Optional[datetime], compute: Callable[[], Any]):
+        try:
+            self.cache.put(key, compute(), start, end)
+        except Exception as e:
+            logger.warning(f"Report refresh failed, keeping the cached result: {e}")
+        finally:
+            self.cache.end_refresh(key)
+    
+    def iter_sales(self, start_date: datetime, end_date: datetime, page_size: int = Config.REPORT_PAGE_SIZE,
+                   columns: str = SALES_COLUMNS) -> Iterator[List[Dict[str, Any]]]:
+        # One page of orders at a time; only the current and the prefetched page are held in memory
+        return self.db.iter_orders(start_date.isoformat(), end_date.isoformat(), columns, page_size)
     
     def get_sales_report(self, start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
+        def compute():
+            return [order for page in self.iter_sales(start_date, end_date, columns='*, order_items(*, products(*))') for order in page]
         try:
-            response = self.db.client.table('orders').select('*, order_items(*, products(*))').gte('created_at', start_date.isoformat()).lte('created_at', end_date.isoformat()).execute()
-            return response.data
+            return self._cached(('sales_report', start_date, end_date), start_date, end_date, compute)
         except Exception as e:
             logger.error(f"Error generating sales report: {e}")
             return []
     
+    def get_sales_summary(self, start_date: datetime, end_date: datetime) -> SalesSummary:
+        # Daily/hourly/category/product rollups, folded in page by page so memory stays flat
+        def compute():
+            aggregator = SalesAggregator()
+            for page in self.iter_sales(start_date, end_date):
+                aggregator.add_orders(page)
+            return aggregator.summary(start_date, end_date)
+        try:
+            return self._cached(('sales_summary', start_date, end_date), start_date, end_date, compute)
+        except Exception as e:
+            logger.error(f"Error generating sales summary: {e}")
+            return SalesAggregator().summary(start_date, end_date)
+    
+    def get_rollup_summary(self, start_date: datetime, end_date: datetime) -> SalesSummary:
+        try:
+            return self._cached(('rollup_summary', start_date, end_date), start_date, end_date,
+                                lambda: self._rollup_summary(start_date, end_date))
+        except Exception as e:
+            logger.error(f"Error generating rollup summary: {e}")
+            return SalesAggregator(self.rollups.timezone).summary(start_date, end_date)
+    
+    def _rollup_summary(self, start_date: datetime, end_date: datetime) -> SalesSummary:
+        # Reads sales_hourly/product_sales_daily, so the cost tracks the period length, not order volume
+        aggregator = SalesAggregator(self.rollups.timezone)
+        products = self.rollups.get_product_daily(start_date, end_date, raise_errors=True)
+        product_ids = list({row['product_id'] for row in products})
+        product_info = self.db.get_products_by_ids(product_ids, raise_errors=True) if product_ids else {}
+        aggregator.add_rollups(
+            self.rollups.get_hourly(start_date, end_date, raise_errors=True),
+            products,
+            {product_id: product for product_id, product in product_info.items() if product}
+        )
+        return aggregator.summary(start_date, end_date)
+    
+    def get_period_summary(self, days: int = 7) -> SalesSummary:
+        # The 1d/7d/30d report periods; keyed by period so the rolling window stays one entry
+        def compute():
+            end_date = datetime.now(timezone.utc)
+            return self._rollup_summary(end_date - timedelta(days=days), end_date)
+        start_date = datetime.now(timezone.utc) - timedelta(days=days)
+        try:
+            return self._cached(('period_summary', days), start_date, None, compute)
+        except Exception as e:
+            logger.error(f"Error generating {days}-day summary: {e}")
+            return SalesAggregator(self.rollups.timezone).summary(start_date, start_date + timedelta(days=days))
+    
+    def get_hourly_sales(self, days: int = 7) -> List[Dict[str, Any]]:
+        hourly = self.get_period_summary(days).hourly
+        return [{'hour': int(hour), 'orders': int(row['orders']), 'total_sales': float(row['revenue'])}
+                for hour, row in hourly.iterrows()]
+    
     def get_daily_sales(self, days: int = 7) -> List[Dict[str, Any]]:
-        end_date = datetime.now()
+        end_date = datetime.now(timezone.utc)
         start_date = end_date - timedelta(days=days)
         return self.get_sales_report(start_date, end_date)
     
     def get_top_products(self, limit: int = 5) -> List[Dict[str, Any]]:
         try:
-            response = self.db.client.rpc('get_top_products', {'limit': limit}).execute()
-            return response.data
+            return self._cached(('top_products', limit), None, None,
+                                lambda: self.db.client.rpc('get_top_products', {'limit': limit}).execute().data)
         except Exception as e:
             logger.error(f"Error fetching top products: {e}")
-            return []
\ No newline at end of file
+            return []
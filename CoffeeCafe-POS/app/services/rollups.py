@@ -0,0 +1,162 @@
+# Sales Rollups (app/services/rollups.py)
+
+import argparse
+import logging
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+import pandas as pd
+from app.config import Config
+from app.services.aggregation import SALES_COLUMNS, store_time
+from app.services.background import NonBlockingMixin
+from app.services.database import DatabaseService
+
+logger = logging.getLogger(__name__)
+
+# sales_hourly:        bucket (UTC hour) -> order_count, revenue
+# product_sales_daily: day (store date), product_id -> quantity, revenue
+# Report queries read at most hours x days / days x products rows, however many orders there are.
+
+def hour_bucket(moment: datetime) -> datetime:
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)  # naive times are stored as UTC
+    return moment.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+def build_rollups(orders: List[Dict[str, Any]], tz: str = Config.STORE_TIMEZONE) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    # Orders in SALES_COLUMNS shape -> (sales_hourly rows, product_sales_daily rows)
+    if not orders:
+        return [], []
+    created = pd.to_datetime(pd.Series([order['created_at'] for order in orders]), utc=True, format='ISO8601')
+    frame = pd.DataFrame({
+        'bucket': created.dt.floor('h'),
+        'day': created.dt.tz_convert(tz).dt.date,
+        'revenue': [float(order.get('total_amount') or 0.0) for order in orders]
+    })
+    hours = frame.groupby('bucket').agg(order_count=('revenue', 'size'), revenue=('revenue', 'sum')).reset_index()
+    hour_rows = [{
+        'bucket': row.bucket.isoformat(),
+        'order_count': int(row.order_count),
+        'revenue': round(float(row.revenue), 2)
+    } for row in hours.itertuples(index=False)]
+
+    items = [
+        (day, item['product_id'], item['quantity'], item['quantity'] * item['unit_price'])
+        for day, order in zip(frame['day'], orders) for item in order.get('order_items') or ()
+    ]
+    if not items:
+        return hour_rows, []
+    products = pd.DataFrame.from_records(items, columns=['day', 'product_id', 'quantity', 'revenue'])
+    products = products.groupby(['day', 'product_id'])[['quantity', 'revenue']].sum().reset_index()
+    product_rows = [{
+        'day': row.day.isoformat(),
+        'product_id': row.product_id,
+        'quantity': int(row.quantity),
+        'revenue': round(float(row.revenue), 2)
+    } for row in products.itertuples(index=False)]
+    return hour_rows, product_rows
+
+class RollupService(NonBlockingMixin):
+    def __init__(self, timezone: str = Config.STORE_TIMEZONE):
+        self.db = DatabaseService()
+        self.timezone = timezone
+
+    def record_orders(self, orders: List[Dict[str, Any]]) -> bool:
+        # Incremental path, called once the orders are committed. The server skips order ids
+        # it has already counted, so replaying a batch after a failure cannot double count.
+        payload = []
+        for order in orders:
+            if not order.get('created_at'):
+                continue  # journaled before orders were stamped; left to a rebuild
+            hours, products = build_rollups([order], self.timezone)
+            if not hours:
+                continue
+            payload.append({
+                'order_id': order['id'],
+                'bucket': hours[0]['bucket'],
+                'revenue': hours[0]['revenue'],
+                'products': products
+            })
+        if not payload:
+            return True
+        try:
+            self.db.client.rpc('record_sales_rollups', {'orders': payload}).execute()
+            return True
+        except Exception as e:
+            logger.error(f"Error recording sales rollups: {e}")
+            return False
+
+    def rebuild(self, start: datetime, end: datetime) -> bool:
+        # Backfill/repair: recount whole store days from raw orders and swap them in one call.
+        # Widening to day boundaries keeps product_sales_daily rows complete.
+        first_day, last_day = self._local_day(start), self._local_day(end)
+        range_start = self._day_start(first_day)
+        range_end = self._day_start(last_day + timedelta(days=1))
+        try:
+            last_moment = (range_end - timedelta(microseconds=1)).isoformat()
+            orders = [order for page in self.db.iter_orders(range_start.isoformat(), last_moment, SALES_COLUMNS)
+                      for order in page]
+            hours, products = build_rollups(orders, self.timezone)
+            self.db.client.rpc('replace_sales_rollups', {
+                'start': range_start.isoformat(),
+                'end': range_end.isoformat(),
+                'first_day': first_day.isoformat(),
+                'last_day': last_day.isoformat(),
+                'hours': hours,
+                'products': products,
+                'order_ids': [order['id'] for order in orders]
+            }).execute()
+            logger.info(f"Rebuilt sales rollups for {first_day} - {last_day} from {len(orders)} orders")
+            return True
+        except Exception as e:
+            logger.error(f"Error rebuilding sales rollups: {e}")
+            return False
+
+    # raise_errors: for callers that cache the result, so a failed query is not taken for a day without sales
+    def get_hourly(self, start: datetime, end: datetime, raise_errors: bool = False) -> List[Dict[str, Any]]:
+        try:
+            response = self.db.client.table('sales_hourly').select('bucket, order_count, revenue').gte('bucket', hour_bucket(start).isoformat()).lte('bucket', hour_bucket(end).isoformat()).execute()
+            return response.data
+        except Exception as e:
+            if raise_errors:
+                raise
+            logger.error(f"Error fetching hourly rollups: {e}")
+            return []
+
+    def get_product_daily(self, start: datetime, end: datetime, raise_errors: bool = False) -> List[Dict[str, Any]]:
+        # Day granularity: the first day of the range is counted whole
+        try:
+            response = self.db.client.table('product_sales_daily').select('day, product_id, quantity, revenue').gte('day', self._local_date(start)).lte('day', self._local_date(end)).execute()
+            return response.data
+        except Exception as e:
+            if raise_errors:
+                raise
+            logger.error(f"Error fetching product rollups: {e}")
+            return []
+
+    def _local_day(self, moment: datetime) -> date:
+        return store_time(moment, self.timezone).date()
+
+    def _local_date(self, moment: datetime) -> str:
+        return self._local_day(moment).isoformat()
+
+    def _day_start(self, day: date) -> datetime:
+        return pd.Timestamp(day).tz_localize(self.timezone).tz_convert('UTC').to_pydatetime()
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Maintain the sales rollup tables")
+    commands = parser.add_subparsers(dest='command', required=True)
+    rebuild = commands.add_parser('rebuild', help="recount rollups from raw orders")
+    rebuild.add_argument('--days', type=int, default=30, help="how many store days back to rebuild, today included (default 30)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    rollups = RollupService()
+    today = rollups._local_day(datetime.now(timezone.utc))
+    ok = True
+    # One request per day keeps each recount (and its transaction) small
+    for offset in range(args.days - 1, -1, -1):
+        day = rollups._day_start(today - timedelta(days=offset))
+        ok = rollups.rebuild(day, day) and ok
+    raise SystemExit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# Product Search Index (app/services/search.py)
+
+import heapq
+import re
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+WORD = re.compile(r"\w+")
+
+def words(text: Optional[str]) -> List[str]:
+    return WORD.findall((text or '').lower())
+
+class _TrieNode:
+    __slots__ = ('children', 'ids')
+
+    def __init__(self):
+        self.children: Dict[str, '_TrieNode'] = {}
+        self.ids: Set[str] = set()  # every product with a name word starting here
+
+class ProductIndex:
+    # In-memory lookups over the catalog: a prefix trie on the words of product names for the
+    # search box, and exact hash indexes on PLU and barcode for scanner input. Products are
+    # added and removed one at a time, so a catalog refresh only touches the rows it changed.
+    def __init__(self):
+        self._root = _TrieNode()
+        self._words: Dict[str, List[str]] = {}  # product id -> indexed words
+        self._order: Dict[str, Tuple[str, str]] = {}  # product id -> sort key for results
+        self._codes: Dict[str, str] = {}  # PLU or barcode -> product id
+        self._product_codes: Dict[str, List[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    def add(self, product: Dict[str, Any]) -> None:
+        product_id = product['id']
+        self.remove(product_id)
+        if not product.get('is_active', True):
+            return
+        name_words = sorted(set(words(product.get('name'))))
+        for word in name_words:
+            node = self._root
+            for char in word:
+                node = node.children.setdefault(char, _TrieNode())
+                node.ids.add(product_id)
+        self._words[product_id] = name_words
+        self._order[product_id] = ((product.get('name') or '').lower(), product_id)
+
+        codes = [str(product[key]).strip() for key in ('plu', 'barcode') if product.get(key)]
+        for code in codes:
+            self._codes[code] = product_id
+        self._product_codes[product_id] = codes
+
+    def remove(self, product_id: str) -> None:
+        for word in self._words.pop(product_id, ()):
+            node, path = self._root, []
+            for char in word:
+                child = node.children.get(char)
+                if child is None:  # pruned with an earlier word sharing this prefix
+                    break
+                path.append((node, char, child))
+                node = child
+            for parent, char, node in reversed(path):
+                node.ids.discard(product_id)
+                if not node.ids:
+                    del parent.children[char]
+        self._order.pop(product_id, None)
+        for code in self._product_codes.pop(product_id, ()):
+            if self._codes.get(code) == product_id:
+                del self._codes[code]
+
+    def clear(self) -> None:
+        self.__init__()
+
+    def lookup_code(self, code: str) -> Optional[str]:
+        return self._codes.get(code.strip())
+
+    def search(self, query: str, limit: int = 20) -> List[str]:
+        # Every query word must prefix some word of the name ("ice lat" finds "Iced Latte");
+        # matches come back in name order
+        terms = words(query)
+        if not terms:
+            return []
+        matches: Optional[Set[str]] = None
+        for term in sorted(terms, key=len, reverse=True):  # longest term first: smallest set
+            node = self._root
+            for char in term:
+                node = node.children.get(char)
+                if node is None:
+                    return []
+            matches = node.ids if matches is None else matches & node.ids
+            if not matches:
+                return []
+        return heapq.nsmallest(limit, matches, key=self._order.__getitem__)
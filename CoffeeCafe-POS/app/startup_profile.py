@@ -0,0 +1,119 @@
+# Startup Profiler (app/startup_profile.py)
+#
+# Enabled with COFFEECAFE_PROFILE_STARTUP=1 or `python -m app.main --profile-startup`.
+# Times every module import from the start of app.main and prints the slowest ones,
+# with time-to-login-screen, once the login screen is up. Stdlib only, and read
+# straight from the environment: it has to be installed before app.config and the
+# rest of the app are imported.
+
+import os
+import sys
+import threading
+import time
+from importlib.abc import MetaPathFinder
+from typing import Dict, List, Optional, TextIO, Tuple
+
+PROCESS_START = time.perf_counter()
+
+def enabled() -> bool:
+    return os.getenv('COFFEECAFE_PROFILE_STARTUP', '').lower() in ('1', 'true', 'yes') or '--profile-startup' in sys.argv
+
+class ImportProfiler(MetaPathFinder):
+    # Sits first on sys.meta_path, lets the real finders resolve each module and wraps the
+    # loader just long enough to time exec_module. Cumulative time includes the module's
+    # own imports; self time is what is left after subtracting them.
+    def __init__(self):
+        self.timings: Dict[str, Tuple[float, float]] = {}  # module -> (cumulative, self)
+        self.total = 0.0
+        self._stack: List[List[float]] = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def install(self):
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+
+    def uninstall(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, fullname, path, target=None):
+        if getattr(self._local, 'resolving', False) or threading.current_thread() is not threading.main_thread():
+            return None
+        self._local.resolving = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, 'find_spec'):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._local.resolving = False
+        if spec.loader is None or not hasattr(spec.loader, 'exec_module'):
+            return spec
+        spec.loader = _TimedLoader(self, spec.loader)
+        return spec
+
+    def _exec(self, loader, module):
+        # The module sees its real loader; the wrapper only exists between find and exec
+        module.__spec__.loader = loader
+        module.__loader__ = loader
+        self._stack.append([0.0])
+        start = time.perf_counter()
+        try:
+            loader.exec_module(module)
+        finally:
+            cumulative = time.perf_counter() - start
+            children = self._stack.pop()[0]
+            if self._stack:
+                self._stack[-1][0] += cumulative
+            else:
+                self.total += cumulative  # outermost imports only, so nothing is counted twice
+            with self._lock:
+                self.timings[module.__name__] = (cumulative, cumulative - children)
+
+    def report(self, login_screen: Optional[float] = None, limit: int = 25, stream: TextIO = sys.stderr):
+        with self._lock:
+            timings = sorted(self.timings.items(), key=lambda item: item[1][1], reverse=True)
+        stream.write(f"Startup profile: {len(timings)} modules imported in {self.total:.3f}s\n")
+        stream.write(f"{'self ms':>10}{'cumul ms':>10}  module\n")
+        for name, (cumulative, own) in timings[:limit]:
+            stream.write(f"{own * 1e3:>10.1f}{cumulative * 1e3:>10.1f}  {name}\n")
+        if login_screen is not None:
+            stream.write(f"Time to login screen: {login_screen:.3f}s\n")
+        stream.flush()
+
+class _TimedLoader:
+    def __init__(self, profiler: ImportProfiler, loader):
+        self._profiler = profiler
+        self._loader = loader
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._profiler._exec(self._loader, module)
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+_profiler: Optional[ImportProfiler] = None
+
+def start() -> Optional[ImportProfiler]:
+    # Call before the app's own imports; a no-op unless profiling is enabled
+    global _profiler
+    if _profiler is None and enabled():
+        _profiler = ImportProfiler()
+        _profiler.install()
+    return _profiler
+
+def finish(login_screen: Optional[float] = None, limit: int = 25):
+    global _profiler
+    if _profiler is None:
+        return
+    _profiler.uninstall()
+    _profiler.report(login_screen, limit)
+    _profiler = None
@@ -6,14 +6,22 @@ UI Package
 Main user interface components and windows.
 """
 
-from .main_window import MainWindow
-from .components import (
-    ProductGrid,
-    OrderPanel,
-    LoginFrame,
-    InventoryView,
-    ReportsView
-)
+from typing import TYPE_CHECKING
+from app._lazy import lazy_exports
+
+# Windows and components are imported on first access
+__getattr__, __dir__ = lazy_exports(globals(), {
+    'MainWindow': '.main_window',
+    'ProductGrid': '.components',
+    'OrderPanel': '.components',
+    'LoginFrame': '.components',
+    'InventoryView': '.components',
+    'ReportsView': '.components'
+})
+
+if TYPE_CHECKING:
+    from .main_window import MainWindow
+    from .components import ProductGrid, OrderPanel, LoginFrame, InventoryView, ReportsView
 
 __all__ = [
     'MainWindow',
@@ -6,11 +6,24 @@ UI Components Package
 Contains all reusable UI components for the CoffeeCafe-POS application.
 """
 
-from .product_grid import ProductGrid
-from .order_panel import OrderPanel
-from .login_frame import LoginFrame
-from .inventory_view import InventoryView
-from .reports_view import ReportsView
+from typing import TYPE_CHECKING
+from app._lazy import lazy_exports
+
+# Components are imported on first access, so the login screen does not wait for the reports view
+__getattr__, __dir__ = lazy_exports(globals(), {
+    'ProductGrid': '.product_grid',
+    'OrderPanel': '.order_panel',
+    'LoginFrame': '.login_frame',
+    'InventoryView': '.inventory_view',
+    'ReportsView': '.reports_view'
+})
+
+if TYPE_CHECKING:
+    from .product_grid import ProductGrid
+    from .order_panel import OrderPanel
+    from .login_frame import LoginFrame
+    from .inventory_view import InventoryView
+    from .reports_view import ReportsView
 
 __all__ = [
     'ProductGrid',
@@ -2,33 +2,121 @@
 
 import tkinter as tk
 from tkinter import ttk
+from typing import Optional
+from app.services.database import DatabaseService
 from app.services.inventory import InventoryService
 
+ALL_CATEGORIES = "All categories"
+LOW_STOCK_THRESHOLD = 5
+
 class InventoryView(ttk.Frame):
-    def __init__(self, parent):
+    # Only `visible_rows` Treeview rows ever exist; scrolling rewrites their values
+    # from the in-memory stock index instead of materializing every SKU.
+    visible_rows = 30
+    
+    def __init__(self, parent, db: DatabaseService, inventory: Optional[InventoryService] = None):
         super().__init__(parent)
-        self.inventory = InventoryService()
+        self.db = db
+        self.inventory = inventory or InventoryService()
+        self.rows = []
+        self.offset = 0
+        self.sort_by = 'name'
+        self.descending = False
         self._setup_ui()
+        if len(self.inventory.stock_index):
+            self._on_stock_loaded(None)  # prefetched while the register sat idle; refreshed below
         self._load_inventory()
     
     def _setup_ui(self):
-        self.tree = ttk.Treeview(self, columns=("name", "category", "stock"), show="headings")
-        self.tree.heading("name", text="Product")
-        self.tree.heading("category", text="Category")
-        self.tree.heading("stock", text="Stock")
-        self.tree.pack(fill="both", expand=True)
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(1, weight=1)
+        
+        # Filters
+        filters = ttk.Frame(self)
+        filters.grid(row=0, column=0, columnspan=2, sticky="ew", pady=5)
+        
+        self.category_var = tk.StringVar(value=ALL_CATEGORIES)
+        self.category_box = ttk.Combobox(filters, textvariable=self.category_var, state="readonly",
+                                         values=[ALL_CATEGORIES])
+        self.category_box.pack(side=tk.LEFT, padx=5)
+        self.category_box.bind("<<ComboboxSelected>>", lambda e: self._apply_filters())
+        
+        self.low_stock_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(filters, text=f"Low stock (< {LOW_STOCK_THRESHOLD})", variable=self.low_stock_var,
+                        command=self._apply_filters).pack(side=tk.LEFT, padx=5)
+        
+        self.count_var = tk.StringVar(value="")
+        ttk.Label(filters, textvariable=self.count_var).pack(side=tk.RIGHT, padx=5)
+        
+        # Virtualized table
+        self.tree = ttk.Treeview(self, columns=("name", "category", "quantity"), show="headings",
+                                 height=self.visible_rows)
+        for column, title in (("name", "Product"), ("category", "Category"), ("quantity", "Stock")):
+            self.tree.heading(column, text=title, command=lambda c=column: self._sort(c))
+        self.tree.grid(row=1, column=0, sticky="nsew")
+        self.tree.bind("<MouseWheel>", self._on_wheel)
+        self.tree.bind("<Button-4>", lambda e: self._scroll_to(self.offset - 3))
+        self.tree.bind("<Button-5>", lambda e: self._scroll_to(self.offset + 3))
+        
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self.scrollbar.grid(row=1, column=1, sticky="ns")
+        
+        self.row_ids = [self.tree.insert("", "end", values=("", "", "")) for _ in range(self.visible_rows)]
         
         self.refresh_btn = ttk.Button(self, text="Refresh", command=self._load_inventory)
-        self.refresh_btn.pack(pady=5)
+        self.refresh_btn.grid(row=2, column=0, columnspan=2, pady=5)
     
     def _load_inventory(self):
-        self.tree.delete(*self.tree.get_children())
-        products = self.inventory.db.get_products()
-        
-        for product in products:
-            stock = self.inventory.check_stock(product['id'])
-            self.tree.insert("", "end", values=(
-                product['name'],
-                product['category'],
-                stock
-            ))
\ No newline at end of file
+        self.refresh_btn.state(['disabled'])
+        self.inventory.nonblocking.get_all_stock(
+            on_done=self._on_stock_loaded,
+            on_error=lambda e: self.refresh_btn.state(['!disabled']),
+            key="inventory"
+        )
+    
+    def _on_stock_loaded(self, rows):
+        self.refresh_btn.state(['!disabled'])
+        self.category_box['values'] = [ALL_CATEGORIES] + self.inventory.stock_index.categories()
+        self._apply_filters()
+    
+    def _apply_filters(self):
+        category = self.category_var.get()
+        self.rows = self.inventory.stock_index.query(
+            category=None if category == ALL_CATEGORIES else category,
+            low_stock_threshold=LOW_STOCK_THRESHOLD if self.low_stock_var.get() else None,
+            sort_by=self.sort_by,
+            descending=self.descending
+        )
+        self.count_var.set(f"{len(self.rows)} of {len(self.inventory.stock_index)} products")
+        self._scroll_to(0)
+    
+    def _sort(self, column: str):
+        self.descending = not self.descending if self.sort_by == column else False
+        self.sort_by = column
+        self._apply_filters()
+    
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            self._scroll_to(int(float(value) * len(self.rows)))
+        elif action == "scroll":
+            step = self.visible_rows if unit == "pages" else 1
+            self._scroll_to(self.offset + int(value) * step)
+    
+    def _on_wheel(self, event):
+        self._scroll_to(self.offset - (3 if event.delta > 0 else -3))
+    
+    def _scroll_to(self, offset: int):
+        self.offset = max(0, min(offset, len(self.rows) - self.visible_rows))
+        window = self.rows[self.offset:self.offset + self.visible_rows]
+        for i, iid in enumerate(self.row_ids):
+            if i < len(window):
+                row = window[i]
+                self.tree.item(iid, values=(row['name'], row['category'], row['quantity']))
+            else:
+                self.tree.item(iid, values=("", "", ""))
+        
+        if self.rows:
+            first = self.offset / len(self.rows)
+            self.scrollbar.set(first, min(1.0, first + self.visible_rows / len(self.rows)))
+        else:
+            self.scrollbar.set(0, 1)
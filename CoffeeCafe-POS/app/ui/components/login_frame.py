@@ -2,6 +2,7 @@
 
 import tkinter as tk
 from tkinter import ttk, messagebox
+from typing import Optional
 from app.services.auth import AuthService
 
 class LoginFrame(ttk.Frame):
@@ -28,7 +29,58 @@ class LoginFrame(ttk.Frame):
         self.error_msg = ttk.Label(self, text="", foreground="red")
         self.error_msg.grid(row=5, column=0, pady=5)
         
-        ttk.Button(self, text="Login", command=self._login).grid(row=6, column=0, pady=10)
+        self.login_btn = ttk.Button(self, text="Login", command=self._login)
+        self.login_btn.grid(row=6, column=0, pady=10)
+        
+        # Cashiers who already signed in with a password on this register switch back by PIN
+        self.switch_frame = ttk.LabelFrame(self, text="Switch Cashier", padding=10)
+        self.switch_frame.grid_columnconfigure(1, weight=1)
+        self.cashier_var = tk.StringVar()
+        self.cashier_menu = ttk.Combobox(self.switch_frame, textvariable=self.cashier_var, state="readonly")
+        self.cashier_menu.grid(row=0, column=0, columnspan=2, sticky="ew", pady=(0, 5))
+        ttk.Label(self.switch_frame, text="PIN:").grid(row=1, column=0, sticky="w")
+        self.pin_entry = ttk.Entry(self.switch_frame, show="*", width=8)
+        self.pin_entry.grid(row=1, column=1, sticky="ew", padx=5)
+        self.pin_entry.bind("<Return>", lambda e: self._switch())
+        ttk.Button(self.switch_frame, text="Switch", command=self._switch).grid(row=1, column=2)
+        self._refresh_cashiers()
+    
+    def _refresh_cashiers(self):
+        # Keyed by id and shown by name; cashiers sharing a name are told apart by email
+        selected = self._selected_cashier()
+        employees = self.auth.sessions.employees()
+        names = [employee['name'] for employee in employees]
+        self._cashiers = {
+            employee['id']: employee['name'] if names.count(employee['name']) == 1
+            else f"{employee['name']} ({employee.get('email') or employee['id']})"
+            for employee in employees
+        }
+        if self._cashiers:
+            ids = list(self._cashiers)
+            self.cashier_menu['values'] = list(self._cashiers.values())
+            self.cashier_menu.current(ids.index(selected) if selected in self._cashiers else 0)
+            self.switch_frame.grid(row=7, column=0, padx=20, pady=10, sticky="ew")
+        else:
+            self.switch_frame.grid_remove()
+    
+    def _selected_cashier(self) -> Optional[str]:
+        index = self.cashier_menu.current()
+        ids = list(getattr(self, '_cashiers', {}))
+        return ids[index] if 0 <= index < len(ids) else None
+    
+    def _switch(self):
+        employee_id = self._selected_cashier()
+        pin = self.pin_entry.get()
+        if not employee_id or not pin:
+            return
+        self.pin_entry.delete(0, tk.END)
+        # An HMAC check against the cached session: fast enough for the Tk thread
+        result = self.auth.switch_employee(employee_id, pin)
+        if result:
+            self.on_success(result)
+            return
+        self.error_msg.config(text="Incorrect PIN")
+        self._refresh_cashiers()  # too many misses drop the cashier from the list
     
     def _login(self):
         email = self.email_entry.get()
@@ -38,7 +90,19 @@ class LoginFrame(ttk.Frame):
             self.error_msg.config(text="Email and password are required")
             return
             
-        result = self.auth.authenticate_employee(email, password)
+        self.login_btn.state(['disabled'])
+        self.error_msg.config(text="")
+        self.auth.nonblocking.authenticate_employee(
+            email, password,
+            on_done=self._on_login_result,
+            on_error=lambda e: self._on_login_result(None),
+            key="login"
+        )
+    
+    def _on_login_result(self, result):
+        if not self.winfo_exists():
+            return
+        self.login_btn.state(['!disabled'])
         if result:
             self.on_success(result)
         else:
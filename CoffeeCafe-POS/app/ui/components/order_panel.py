@@ -1,19 +1,55 @@
 # app/ui/components/order_panel.py
 
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, simpledialog
+from datetime import datetime, timezone
+from typing import Any, Dict, Hashable, Iterable, Tuple
 from app.models.order import Order
 from app.services.database import DatabaseService
-from app.services.loyalty import LoyaltyService
-from app.utils.receipt_printer import ReceiptPrinter
+from app.services.journal import JournalSyncWorker
+from app.utils.helpers import calculate_tax, normalize_phone
+from app.utils.metrics import SessionMetrics
+from app.utils.print_spooler import PrintSpooler
+
+class TreeRowSync:
+    # Keeps a Treeview in step with keyed rows, touching only the rows that changed
+    def __init__(self, tree):
+        self.tree = tree
+        self.rows: Dict[Hashable, Tuple[str, Tuple[Any, ...]]] = {}  # key -> (iid, values)
+    
+    def upsert(self, key: Hashable, values: Tuple[Any, ...]):
+        row = self.rows.get(key)
+        if row is None:
+            self.rows[key] = (self.tree.insert("", "end", values=values), values)
+        elif row[1] != values:
+            self.tree.item(row[0], values=values)
+            self.rows[key] = (row[0], values)
+    
+    def delete(self, key: Hashable):
+        row = self.rows.pop(key, None)
+        if row is not None:
+            self.tree.delete(row[0])
+    
+    def apply(self, changes: Dict[Hashable, Any], removed: Iterable[Hashable] = ()):
+        for key in removed:
+            self.delete(key)
+        for key, values in changes.items():
+            self.upsert(key, values)
+    
+    def clear(self):
+        if self.rows:
+            self.tree.delete(*(iid for iid, _ in self.rows.values()))
+        self.rows.clear()
 
 class OrderPanel(ttk.LabelFrame):
-    def __init__(self, parent, db: DatabaseService):
+    def __init__(self, parent, db: DatabaseService, sync_worker: JournalSyncWorker, spooler: PrintSpooler):
         super().__init__(parent, text="Current Order", padding=10)
         self.db = db
-        self.loyalty = LoyaltyService()
-        self.printer = ReceiptPrinter()
+        self.sync_worker = sync_worker
+        self.spooler = spooler
         self.order = Order()
+        self._dirty = set()  # keys of order lines changed since the last redraw
+        self._redraw_pending = False
         self._setup_ui()
     
     def _setup_ui(self):
@@ -41,6 +77,8 @@ class OrderPanel(ttk.LabelFrame):
         self.tree.column("price", width=80, anchor="e")
         self.tree.column("total", width=80, anchor="e")
         self.tree.grid(row=1, column=0, sticky="nsew", pady=5)
+        self.tree.bind("<Delete>", self._remove_selected)
+        self.rows = TreeRowSync(self.tree)
         
         # Totals
         self.subtotal_var = tk.StringVar(value="Subtotal: $0.00")
@@ -62,50 +100,105 @@ class OrderPanel(ttk.LabelFrame):
         ttk.Radiobutton(payment_frame, text="Mobile", variable=self.payment_method, value="mobile").pack(side=tk.LEFT)
         
         # Complete order
-        ttk.Button(self, text="Complete Order", command=self._complete_order).grid(row=6, column=0, sticky="ew")
+        actions = ttk.Frame(self)
+        actions.grid(row=6, column=0, sticky="ew")
+        actions.grid_columnconfigure(0, weight=1)
+        ttk.Button(actions, text="Complete Order", command=self._complete_order).grid(row=0, column=0, sticky="ew")
+        ttk.Button(actions, text="Reprint", command=lambda: self.spooler.reprint(1)).grid(row=0, column=1, padx=(5, 0))
+        
+        # Sync status
+        self.sync_var = tk.StringVar(value="")
+        ttk.Label(self, textvariable=self.sync_var, foreground="gray").grid(row=7, column=0, sticky="w")
+        self._refresh_sync_status()
+    
+    def _refresh_sync_status(self):
+        stats = self.sync_worker.journal.stats()
+        if stats['queue_depth']:
+            self.sync_var.set(f"{stats['queue_depth']} orders waiting to sync ({stats['sync_lag_seconds']:.0f}s behind)")
+        else:
+            self.sync_var.set("All orders synced")
+        self.after(5000, self._refresh_sync_status)
     
     def _find_customer(self):
-        phone = self.customer_phone.get()
+        phone = normalize_phone(self.customer_phone.get())
         if not phone:
+            if self.customer_phone.get().strip():
+                messagebox.showwarning("Invalid Phone", "Enter a phone number with area code")
             return
-            
-        customer = self.db.get_customer_by_phone(phone)
+        
+        self.customer_btn.state(['disabled'])
+        self.db.nonblocking.get_customer_by_phone(
+            phone,
+            on_done=lambda customer: self._on_customer_lookup(phone, customer),
+            on_error=lambda e: self._on_customer_lookup(phone, None),
+            key="customer_lookup"
+        )
+    
+    def _on_customer_lookup(self, phone: str, customer):
+        self.customer_btn.state(['!disabled'])
         if customer:
-            self.order.customer_id = customer['id']
-            messagebox.showinfo("Customer Found", f"Welcome back {customer['name']}!\nPoints: {customer['points']}")
+            self.order.set_customer(customer)
+            # Local lookups only: accruals from checkouts the server has not seen yet
+            points = (customer.get('points') or 0) + self.sync_worker.loyalty.pending_points(customer['id'])
+            messagebox.showinfo("Customer Found", f"Welcome back {customer['name']}!\nPoints: {points}")
         else:
             if messagebox.askyesno("New Customer", "Customer not found. Create new account?"):
                 name = simpledialog.askstring("New Customer", "Enter customer name:")
                 if name:
-                    try:
-                        new_customer = self.db.client.table('customers').insert({
-                            'name': name,
-                            'phone': phone
-                        }).execute().data[0]
-                        self.order.customer_id = new_customer['id']
-                        messagebox.showinfo("Success", "New customer created")
-                    except Exception as e:
-                        messagebox.showerror("Error", f"Could not create customer: {e}")
+                    self.db.nonblocking.create_customer(
+                        name, phone,
+                        on_done=self._on_customer_created,
+                        on_error=lambda e: self._on_customer_created(None)
+                    )
     
-    def add_item(self, product_id: str, quantity: int = 1, unit_price: float):
-        self.order.add_item(product_id, quantity, unit_price)
-        self._update_display()
+    def _on_customer_created(self, new_customer):
+        if not new_customer:
+            messagebox.showerror("Error", "Could not create customer")
+            return
+        self.order.set_customer(new_customer)
+        messagebox.showinfo("Success", "New customer created")
+    
+    def add_item(self, product_id: str, unit_price: float, quantity: int = 1):
+        item = self.order.add_item(product_id, quantity, unit_price)
+        self._schedule_redraw(item.key)
+    
+    def remove_item(self, key: Tuple[str, float]):
+        if self.order.remove_item(key):
+            self._schedule_redraw(key)
+    
+    def _remove_selected(self, event=None):
+        selected = set(self.tree.selection())
+        for key, (iid, _) in list(self.rows.rows.items()):
+            if iid in selected:
+                self.remove_item(key)
+    
+    def _schedule_redraw(self, key):
+        # Bursts of scans/taps collapse into one redraw once Tk is idle
+        self._dirty.add(key)
+        if not self._redraw_pending:
+            self._redraw_pending = True
+            self.after_idle(self._update_display)
     
     def _update_display(self):
-        self.tree.delete(*self.tree.get_children())
+        self._redraw_pending = False
+        dirty, self._dirty = self._dirty, set()
+        lines = {key: self.order.get_item(key) for key in dirty if self.order.get_item(key)}
+        products = self.db.get_products_by_ids([item.product_id for item in lines.values()])
         
-        for item in self.order.items:
-            product = self.db.get_product(item.product_id)
+        changes = {}
+        for key, item in lines.items():
+            product = products[item.product_id]
             total = item.quantity * item.unit_price
-            self.tree.insert("", "end", values=(
+            changes[key] = (
                 item.quantity,
-                product['name'],
+                product['name'] if product else item.product_id,
                 f"${item.unit_price:.2f}",
                 f"${total:.2f}"
-            ))
+            )
+        self.rows.apply(changes, removed=dirty - lines.keys())
         
         subtotal = self.order.total
-        tax = subtotal * 0.08  # Example 8% tax
+        tax = calculate_tax(subtotal)
         total = subtotal + tax
         
         self.subtotal_var.set(f"Subtotal: ${subtotal:.2f}")
@@ -119,67 +212,64 @@ class OrderPanel(ttk.LabelFrame):
             
         # Calculate totals
         subtotal = self.order.total
-        tax = subtotal * 0.08
+        tax = calculate_tax(subtotal)
         total = subtotal + tax
         
         # Set payment method
         self.order.payment_method = self.payment_method.get()
         self.order.status = "completed"
         
-        # Save order
+        # Save order to the local journal; the sync worker pushes it to Supabase
+        created_at = datetime.now(timezone.utc).isoformat()
         order_data = {
             'total_amount': total,
             'subtotal': subtotal,
             'tax': tax,
             'payment_method': self.order.payment_method,
             'status': self.order.status,
-            'customer_id': self.order.customer_id
+            'customer_id': self.order.customer_id,
+            'created_at': created_at
         }
-        
-        saved_order = self.db.create_order(order_data)
-        if not saved_order:
-            messagebox.showerror("Error", "Failed to save order")
-            return
-            
-        # Save order items
         items_data = [{
-            'order_id': saved_order['id'],
             'product_id': item.product_id,
             'quantity': item.quantity,
             'unit_price': item.unit_price
         } for item in self.order.items]
+        loyalty = None
+        if self.order.customer_id:
+            loyalty = {'customer_id': self.order.customer_id, 'amount_spent': subtotal}
         
-        if not self.db.add_order_items(saved_order['id'], items_data):
-            messagebox.showerror("Error", "Failed to save order items")
+        try:
+            order_id = self.sync_worker.journal.append(order_data, items_data, loyalty)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to save order: {e}")
             return
-        
-        # Update loyalty points if customer exists
-        if self.order.customer_id:
-            self.loyalty.add_points(self.order.customer_id, subtotal)
+        self.sync_worker.notify()
+        if SessionMetrics().mark('first_sale'):
+            SessionMetrics().record('login_to_first_sale', 'login', 'first_sale')
         
         # Print receipt
+        products = self.db.get_products_by_ids([item.product_id for item in self.order.items])
         receipt_data = {
-            'id': saved_order['id'],
-            'created_at': datetime.now().isoformat(),
+            'id': order_id[:8],
+            'created_at': created_at,
             'subtotal': subtotal,
             'tax': tax,
             'total': total,
             'items': [{
-                'product': {'name': self.db.get_product(item.product_id)['name']},
+                'product': {'name': products[item.product_id]['name']},
                 'quantity': item.quantity,
                 'unit_price': item.unit_price
             } for item in self.order.items]
         }
         
-        customer = None
-        if self.order.customer_id:
-            customer = self.db.get_customer_by_phone(self.customer_phone.get())
-        
-        self.printer.print_receipt(receipt_data, customer)
+        self.spooler.enqueue(receipt_data, self.order.customer)
         
         # Reset order
         self.order = Order()
+        self.rows.clear()
+        self._dirty.clear()
         self._update_display()
         self.customer_phone.delete(0, tk.END)
         
-        messagebox.showinfo("Success", f"Order #{saved_order['id']} completed")
\ No newline at end of file
+        messagebox.showinfo("Success", f"Order #{order_id[:8]} completed")
\ No newline at end of file
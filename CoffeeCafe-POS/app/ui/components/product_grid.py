@@ -3,77 +3,166 @@
 import tkinter as tk
 from tkinter import ttk
 from typing import List, Dict, Optional
+from app.config import Config
 from app.models.product import Product
 from app.services.database import DatabaseService
 
 class ProductGrid(ttk.Frame):
+    columns = 4
+    search_limit = 20
+    retry_ms = 10000  # an empty listing (offline at login) is tried again this soon
+    
     def __init__(self, parent, db: DatabaseService):
         super().__init__(parent)
         self.db = db
         self.selected_product: Optional[Product] = None
+        # Every category's products, reloaded from the catalog every CATALOG_REFRESH_SECONDS;
+        # switching categories only reads this
+        self._listing: Dict[str, List[Product]] = {}
+        self._raw_listing: Dict[str, List[dict]] = {}
+        self._reload_job: Optional[str] = None
+        # Buttons are created once and reconfigured in place for each category
+        self._buttons: List[ttk.Button] = []
         self._setup_ui()
         self._load_categories()
     
+    def destroy(self):
+        if self._reload_job is not None:
+            self.after_cancel(self._reload_job)
+            self._reload_job = None
+        super().destroy()
+    
     def _setup_ui(self):
         self.grid_columnconfigure(0, weight=1)
-        self.grid_rowconfigure(1, weight=1)
+        self.grid_rowconfigure(2, weight=1)
+        
+        # Search box; also takes scanner input (a barcode or PLU followed by Enter)
+        self.search_var = tk.StringVar()
+        self.search_entry = ttk.Entry(self, textvariable=self.search_var)
+        self.search_entry.grid(row=0, column=0, sticky="ew", pady=(5, 0))
+        self.search_var.trace_add("write", lambda *args: self._on_search())
+        self.search_entry.bind("<Return>", self._on_search_submit)
+        self.search_entry.bind("<Escape>", lambda e: self.search_var.set(""))
         
         # Category selector
         self.category_var = tk.StringVar()
         self.category_menu = ttk.OptionMenu(self, self.category_var, "")
-        self.category_menu.grid(row=0, column=0, sticky="ew", pady=5)
+        self.category_menu.grid(row=1, column=0, sticky="ew", pady=5)
         
         # Product buttons frame
         self.products_frame = ttk.Frame(self)
-        self.products_frame.grid(row=1, column=0, sticky="nsew")
+        self.products_frame.grid(row=2, column=0, sticky="nsew")
     
     def _load_categories(self):
-        categories = self._get_categories()
+        # Also loads the product catalog the first time, off the Tk thread; later runs pick up
+        # price edits, new items and deactivations
+        self._reload_job = None
+        self.db.nonblocking.get_category_listing(
+            bool(self._raw_listing),
+            on_done=self._on_listing,
+            on_error=lambda e: self._on_listing({}),
+            key="product_grid"
+        )
+    
+    def _schedule_reload(self, delay_ms: int):
+        if self._reload_job is None:
+            self._reload_job = self.after(delay_ms, self._load_categories)
+    
+    def _on_listing(self, listing: Dict[str, List[dict]]):
+        if not self.winfo_exists():
+            return
+        if not listing:
+            self._schedule_reload(self.retry_ms)  # keep what is shown; nothing came back
+            return
+        self._schedule_reload(int(Config.CATALOG_REFRESH_SECONDS * 1000))
+        if listing == self._raw_listing:
+            return
+        self._raw_listing = listing
+        self._listing = {
+            category: [Product.from_dict(p) for p in products]
+            for category, products in listing.items()
+        }
+        categories = list(self._listing)
         self.category_menu['menu'].delete(0, 'end')
         
         for cat in categories:
             self.category_menu['menu'].add_command(
                 label=cat,
-                command=lambda c=cat: self._load_products(c)
+                command=lambda c=cat: self._show_category(c)
             )
         
+        # Enough buttons for the largest category or a page of search results, so neither
+        # switching categories nor typing has to create widgets
+        self._ensure_buttons(max([self.search_limit, *(len(products) for products in self._listing.values())]))
+        
         if categories:
-            self.category_var.set(categories[0])
-            self._load_products(categories[0])
+            current = self.category_var.get()
+            self.category_var.set(current if current in self._listing else categories[0])
+        if self.search_var.get().strip():
+            self._on_search()
+        elif categories:
+            self._show_category(self.category_var.get())
     
-    def _get_categories(self) -> List[str]:
-        try:
-            response = self.db.client.table('products').select('category').execute()
-            categories = list(set(item['category'] for item in response.data))
-            return sorted(categories)
-        except Exception as e:
-            print(f"Error fetching categories: {e}")
-            return []
+    def _ensure_buttons(self, count: int):
+        while len(self._buttons) < count:
+            self._buttons.append(ttk.Button(self.products_frame, width=15))
     
-    def _load_products(self, category: str):
-        # Clear existing products
-        for widget in self.products_frame.winfo_children():
-            widget.destroy()
-        
-        # Load products from database
-        products_data = self.db.get_products_by_category(category)
-        products = [Product.from_dict(p) for p in products_data]
+    def _show_category(self, category: str):
+        self.category_var.set(category)
+        if self.search_var.get():
+            self.search_var.set("")  # the trace redraws the category
+        else:
+            self._show_products(self._listing.get(category, []))
+    
+    def _on_search(self):
+        query = self.search_var.get().strip()
+        if not query:
+            self._show_products(self._listing.get(self.category_var.get(), []))
+            return
+        self._show_products([Product.from_dict(p) for p in self.db.search_products(query, self.search_limit)])
+    
+    def _on_search_submit(self, event=None):
+        query = self.search_var.get().strip()
+        if not query:
+            return
+        self.db.nonblocking.find_product_by_code(
+            query,
+            on_done=lambda product: self._on_code_result(query, product),
+            key="product_code"
+        )
+    
+    def _on_code_result(self, query: str, product: Optional[dict]):
+        if not self.winfo_exists():
+            return
+        if product is None:
+            # Not a code: Enter picks the only search result, if there is exactly one
+            results = self.db.search_products(query, 2)
+            if len(results) != 1:
+                return
+            product = results[0]
+        if self.search_var.get().strip() == query:
+            self.search_var.set("")  # ready for the next scan
+        self._select_product(Product.from_dict(product))
+    
+    def _show_products(self, products: List[Product]):
+        self._ensure_buttons(len(products))
         
-        # Create product buttons
-        for i, product in enumerate(products):
-            btn = ttk.Button(
-                self.products_frame,
-                text=f"{product.name}\n${product.price:.2f}",
-                command=lambda p=product: self._select_product(p),
-                width=15
-            )
-            btn.grid(
-                row=i // 4,
-                column=i % 4,
-                padx=5,
-                pady=5,
-                sticky="nsew"
-            )
+        for i, button in enumerate(self._buttons):
+            if i < len(products):
+                product = products[i]
+                button.configure(
+                    text=f"{product.name}\n${product.price:.2f}",
+                    command=lambda p=product: self._select_product(p)
+                )
+                button.grid(
+                    row=i // self.columns,
+                    column=i % self.columns,
+                    padx=5,
+                    pady=5,
+                    sticky="nsew"
+                )
+            else:
+                button.grid_remove()
     
     def _select_product(self, product: Product):
         self.selected_product = product
@@ -1,18 +1,38 @@
 
 import tkinter as tk
 from tkinter import ttk
-from datetime import datetime, timedelta
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from datetime import datetime, timedelta, timezone
+from app.services.aggregation import store_time
+from app.services.background import ServiceExecutor
 from app.services.reporting import ReportingService
 from app.services.database import DatabaseService
 from app.utils.helpers import format_currency
+from typing import Callable, List, Optional, Tuple
+import pandas as pd
+import threading
+
+PERIOD_DAYS = {"1d": 1, "7d": 7, "30d": 30}
+LIVE_REFRESH_MS = 30000
+
+def daily_table_rows(daily: pd.DataFrame) -> List[Tuple[str, int, str]]:
+    # SalesSummary.daily is already grouped per day, so this is one pass over its columns
+    return list(zip(
+        daily.index.strftime('%Y-%m-%d'),
+        daily['orders'].tolist(),
+        map(format_currency, daily['revenue'].tolist())
+    ))
 
 class ReportsView(ttk.Frame):
     def __init__(self, parent, db: DatabaseService):
         super().__init__(parent)
         self.db = db
         self.reporting = ReportingService()
+        self.renderer = None  # ChartRenderer, built (and matplotlib imported) on the first chart
+        self._renderer_lock = threading.Lock()
+        self._chart_size = (800, 500)
+        self._current_report: Optional[Callable[[], None]] = None
+        self._resize_job = None
+        self._refresh_job = None
         self._setup_ui()
         self._setup_time_period()
         self._generate_default_report()
@@ -39,14 +59,17 @@ class ReportsView(ttk.Frame):
                       command=self._on_period_change).pack(side=tk.LEFT)
 
         # Report Display Area
-        report_frame = ttk.Frame(self)
+        report_frame = ttk.Frame(self, width=800, height=500)
+        report_frame.pack_propagate(False)  # the chart image follows the frame, not the other way round
         report_frame.grid(row=1, column=0, sticky="nsew")
         report_frame.grid_columnconfigure(0, weight=1)
         report_frame.grid_rowconfigure(0, weight=1)
 
-        self.figure = plt.Figure(figsize=(8, 5), dpi=100)
-        self.canvas = FigureCanvasTkAgg(self.figure, master=report_frame)
-        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        # Charts are rendered off-thread into an Agg buffer and shown as an image
+        self.chart_image = None
+        self.chart_label = ttk.Label(report_frame, anchor=tk.CENTER)
+        self.chart_label.pack(fill=tk.BOTH, expand=True)
+        report_frame.bind("<Configure>", self._on_chart_resize)
 
         # Data Table
         self.tree = ttk.Treeview(self, columns=("date", "orders", "revenue"), show="headings")
@@ -56,17 +79,13 @@ class ReportsView(ttk.Frame):
         self.tree.grid(row=2, column=0, sticky="ew", pady=5)
 
     def _setup_time_period(self):
-        self.end_date = datetime.now()
         self._update_dates_based_on_period()
 
     def _update_dates_based_on_period(self):
-        period = self.period_var.get()
-        if period == "1d":
-            self.start_date = self.end_date - timedelta(days=1)
-        elif period == "7d":
-            self.start_date = self.end_date - timedelta(days=7)
-        elif period == "30d":
-            self.start_date = self.end_date - timedelta(days=30)
+        # Periods roll with the clock; the cached summaries are keyed by period, not timestamp
+        self.days = PERIOD_DAYS[self.period_var.get()]
+        self.end_date = datetime.now(timezone.utc)
+        self.start_date = self.end_date - timedelta(days=self.days)
 
     def _on_period_change(self, *args):
         self._update_dates_based_on_period()
@@ -75,97 +94,95 @@ class ReportsView(ttk.Frame):
     def _generate_default_report(self):
         self._generate_sales_report()
 
+    # Reports share one key so switching period or report type drops the stale request.
+    # Each one fetches (usually from the report cache) and renders the chart on a worker
+    # thread; the Tk thread only swaps in the finished image and fills the table.
+    def _run_report(self, report: Callable[[], None], load: Callable[..., Tuple[list, bytes]], *args):
+        self._current_report = report
+        ServiceExecutor().submit(
+            load, *args, self._chart_size,
+            on_done=self._display_report, key="report"
+        )
+
     def _generate_sales_report(self):
-        report_data = self.reporting.get_sales_report(self.start_date, self.end_date)
-        self._display_sales_data(report_data)
+        self._run_report(self._generate_sales_report, self._load_sales_report,
+                         self.days, f"Sales Report: {store_time(self.start_date).date()} to {store_time(self.end_date).date()}")
 
     def _generate_top_products(self):
-        top_products = self.reporting.get_top_products(limit=5)
-        self._display_top_products(top_products)
+        self._run_report(self._generate_top_products, self._load_top_products, 5)
 
     def _generate_hourly_trends(self):
-        hourly_data = self.reporting.get_hourly_sales()
-        self._display_hourly_trends(hourly_data)
-
-    def _display_sales_data(self, data):
-        self.figure.clear()
-        ax = self.figure.add_subplot(111)
-        
-        # Process data for visualization
-        dates = [datetime.strptime(d['created_at'], '%Y-%m-%dT%H:%M:%S').date() 
-                for d in data]
-        revenues = [d['total_amount'] for d in data]
-        
-        # Group by date
-        daily_data = {}
-        for date, revenue in zip(dates, revenues):
-            if date in daily_data:
-                daily_data[date] += revenue
-            else:
-                daily_data[date] = revenue
-                
-        sorted_dates = sorted(daily_data.keys())
-        sorted_revenues = [daily_data[d] for d in sorted_dates]
-        
-        # Plotting
-        ax.bar(sorted_dates, sorted_revenues)
-        ax.set_title(f"Sales Report: {self.start_date.date()} to {self.end_date.date()}")
-        ax.set_ylabel("Revenue ($)")
-        ax.set_xlabel("Date")
-        self.figure.autofmt_xdate()
-        
-        self.canvas.draw()
-        
-        # Update data table
-        self._update_data_table(sorted_dates, sorted_revenues)
-
-    def _display_top_products(self, products):
-        self.figure.clear()
-        ax = self.figure.add_subplot(111)
-        
-        names = [p['name'] for p in products]
-        quantities = [p['total_quantity'] for p in products]
-        
-        ax.barh(names, quantities)
-        ax.set_title("Top Selling Products")
-        ax.set_xlabel("Quantity Sold")
-        
-        self.canvas.draw()
-        self._clear_data_table()
-
-    def _display_hourly_trends(self, hourly_data):
-        self.figure.clear()
-        ax = self.figure.add_subplot(111)
-        
-        hours = [d['hour'] for d in hourly_data]
-        sales = [d['total_sales'] for d in hourly_data]
-        
-        ax.plot(hours, sales, marker='o')
-        ax.set_title("Hourly Sales Trends")
-        ax.set_xlabel("Hour of Day")
-        ax.set_ylabel("Sales ($)")
-        ax.set_xticks(range(24))
-        
-        self.canvas.draw()
-        self._clear_data_table()
-
-    def _update_data_table(self, dates, revenues):
+        self._run_report(self._generate_hourly_trends, self._load_hourly_trends, self.days)
+
+    def _load_sales_report(self, days: int, title: str, size: Tuple[int, int]):
+        # Days arrive grouped and zero-filled; no per-order parsing or grouping here
+        daily = self.reporting.get_period_summary(days).daily
+        image = self._renderer(size).daily_revenue(
+            daily.index.strftime('%m-%d').tolist(), daily['revenue'].tolist(), title)
+        return daily_table_rows(daily), image
+
+    def _load_top_products(self, limit: int, size: Tuple[int, int]):
+        products = self.reporting.get_top_products(limit=limit)
+        image = self._renderer(size).top_products(
+            [p['name'] for p in products], [p['total_quantity'] for p in products])
+        return [], image
+
+    def _load_hourly_trends(self, days: int, size: Tuple[int, int]):
+        hourly_data = self.reporting.get_hourly_sales(days=days)
+        image = self._renderer(size).hourly_sales(
+            [d['hour'] for d in hourly_data], [d['total_sales'] for d in hourly_data])
+        return [], image
+
+    def _renderer(self, size: Tuple[int, int]):
+        with self._renderer_lock:
+            if self.renderer is None:
+                from app.utils.charts import ChartRenderer
+                self.renderer = ChartRenderer(*size)
+                self._rendered_size = size
+            elif size != self._rendered_size:
+                self.renderer.resize(*size)
+                self._rendered_size = size
+            return self.renderer
+
+    def _display_report(self, result):
+        rows, image = result
+        self.chart_image = tk.PhotoImage(data=image, format="PPM")
+        self.chart_label.configure(image=self.chart_image)
+        self._update_data_table(rows)
+        self._schedule_live_refresh()
+
+    def _schedule_live_refresh(self):
+        # New orders invalidate the cached report; same-shaped data only re-blits the bars
+        if self._refresh_job:
+            self.after_cancel(self._refresh_job)
+        self._refresh_job = self.after(LIVE_REFRESH_MS, self._refresh_current_report)
+
+    def _refresh_current_report(self):
+        self._refresh_job = None
+        if self._current_report and self.winfo_ismapped():
+            self._update_dates_based_on_period()
+            self._current_report()
+        else:
+            self._schedule_live_refresh()
+
+    def _on_chart_resize(self, event):
+        size = (max(event.width, 200), max(event.height, 150))
+        if size == self._chart_size:
+            return
+        self._chart_size = size
+        if self._resize_job:
+            self.after_cancel(self._resize_job)
+        self._resize_job = self.after(150, self._redraw_after_resize)
+
+    def _redraw_after_resize(self):
+        self._resize_job = None
+        if self._current_report:
+            self._current_report()
+
+    def _update_data_table(self, rows):
         self.tree.delete(*self.tree.get_children())
-        
-        # Group by date and count orders
-        date_counts = {}
-        for date in dates:
-            if date in date_counts:
-                date_counts[date] += 1
-            else:
-                date_counts[date] = 1
-                
-        for date in sorted(date_counts.keys()):
-            self.tree.insert("", "end", values=(
-                date.strftime('%Y-%m-%d'),
-                date_counts[date],
-                format_currency(revenues[dates.index(date)])
-            ))
+        for row in rows:
+            self.tree.insert("", "end", values=row)
 
     def _clear_data_table(self):
-        self.tree.delete(*self.tree.get_children())
\ No newline at end of file
+        self.tree.delete(*self.tree.get_children())
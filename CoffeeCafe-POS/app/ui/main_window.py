@@ -2,39 +2,114 @@
 
 import tkinter as tk
 from tkinter import ttk
+from typing import Callable, Dict, Optional
+from app.config import Config
 from app.services.database import DatabaseService
+from app.services.inventory import InventoryService
+from app.services.journal import JournalSyncWorker
+from app.services.reporting import ReportingService
+from app.utils.metrics import SessionMetrics
+from app.utils.print_spooler import PrintSpooler
 from app.ui.components import ProductGrid, OrderPanel, InventoryView, ReportsView
 
 class MainWindow(ttk.Frame):
-    def __init__(self, parent, db: DatabaseService, employee: dict):
+    def __init__(self, parent, db: DatabaseService, employee: dict,
+                 sync_worker: JournalSyncWorker, spooler: PrintSpooler,
+                 on_switch_cashier: Optional[Callable[[], None]] = None):
         super().__init__(parent)
+        self.on_switch_cashier = on_switch_cashier
         self.db = db
+        self.sync_worker = sync_worker
+        self.spooler = spooler
         self.employee = employee
+        self.inventory = InventoryService()  # shared with InventoryView so a prefetch carries over
+        # Manager tabs are built on first selection; frames still unbuilt are listed here
+        self._tab_builders: Dict[str, Callable[[], None]] = {}
+        # Product lookups made while handling one Tk event go out as a single query
+        self.db.product_loader.set_scheduler(self.after_idle)
         self._setup_ui()
     
     def _setup_ui(self):
         self.grid_columnconfigure(0, weight=1)
-        self.grid_rowconfigure(0, weight=1)
+        self.grid_rowconfigure(1, weight=1)
+        
+        # Current cashier
+        header = ttk.Frame(self)
+        header.grid(row=0, column=0, sticky="ew", padx=5, pady=(5, 0))
+        self.cashier_label = ttk.Label(header, text=f"Cashier: {self.employee['name']}")
+        self.cashier_label.pack(side=tk.LEFT)
+        if self.on_switch_cashier:
+            ttk.Button(header, text="Switch Cashier", command=self.on_switch_cashier).pack(side=tk.RIGHT)
         
         # Notebook for multiple tabs
         self.notebook = ttk.Notebook(self)
-        self.notebook.grid(row=0, column=0, sticky="nsew")
+        self.notebook.grid(row=1, column=0, sticky="nsew")
         
         # POS Tab
         self.pos_tab = ttk.Frame(self.notebook)
         self._setup_pos_tab()
         self.notebook.add(self.pos_tab, text="Point of Sale")
         
-        # Inventory Tab (only for managers/admins)
-        if self.employee['role'] in ['admin', 'manager']:
+        # Inventory and Reports Tabs (only for managers/admins)
+        self.inventory_tab = None
+        self.reports_tab = None
+        self._show_manager_tabs(self._is_manager(self.employee))
+        
+        self.notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
+        self.after_idle(self._on_pos_ready)
+    
+    @staticmethod
+    def _is_manager(employee: dict) -> bool:
+        return employee['role'] in ['admin', 'manager']
+    
+    def _show_manager_tabs(self, show: bool):
+        if not show:
+            if self.inventory_tab is not None:
+                self.notebook.select(self.pos_tab)
+                self.notebook.hide(self.inventory_tab)
+                self.notebook.hide(self.reports_tab)
+            return
+        if self.inventory_tab is None:
             self.inventory_tab = ttk.Frame(self.notebook)
-            self._setup_inventory_tab()
-            self.notebook.add(self.inventory_tab, text="Inventory")
-            
-            # Reports Tab
+            self._add_lazy_tab(self.inventory_tab, "Inventory", self._setup_inventory_tab)
             self.reports_tab = ttk.Frame(self.notebook)
-            self._setup_reports_tab()
-            self.notebook.add(self.reports_tab, text="Reports")
+            self._add_lazy_tab(self.reports_tab, "Reports", self._setup_reports_tab)
+        else:
+            # Hidden tabs come back in place, built or not
+            self.notebook.add(self.inventory_tab)
+            self.notebook.add(self.reports_tab)
+    
+    def set_employee(self, employee: dict):
+        # Cashier switch: the screen, the order in progress and the loaded catalog stay as they are
+        self.employee = employee
+        self.cashier_label.config(text=f"Cashier: {employee['name']}")
+        self._show_manager_tabs(self._is_manager(employee))
+    
+    def _add_lazy_tab(self, tab: ttk.Frame, text: str, builder: Callable[[], None]):
+        self._tab_builders[str(tab)] = builder
+        self.notebook.add(tab, text=text)
+    
+    def _on_tab_changed(self, event):
+        builder = self._tab_builders.pop(self.notebook.select(), None)
+        if builder:
+            builder()
+    
+    def _on_pos_ready(self):
+        # First idle after the POS tab is drawn: the register can ring up a sale
+        metrics = SessionMetrics()
+        metrics.mark('pos_ready')
+        metrics.record('login_to_pos_ready', 'login', 'pos_ready')
+        if Config.PREFETCH_TABS and self._tab_builders:
+            self.after(Config.PREFETCH_DELAY_MS, self._prefetch_tabs)
+    
+    def _prefetch_tabs(self):
+        # Warm the data behind the manager tabs off the Tk thread; widgets still wait for a click
+        if not self._is_manager(self.employee):
+            return
+        if str(self.inventory_tab) in self._tab_builders:
+            self.inventory.nonblocking.get_all_stock(key="inventory_prefetch")
+        if str(self.reports_tab) in self._tab_builders:
+            ReportingService().nonblocking.get_period_summary(7, key="report_prefetch")
     
     def _setup_pos_tab(self):
         self.pos_tab.grid_columnconfigure(0, weight=3)
@@ -44,14 +119,22 @@ class MainWindow(ttk.Frame):
         self.product_grid = ProductGrid(self.pos_tab, self.db)
         self.product_grid.grid(row=0, column=0, sticky="nsew", padx=5, pady=5)
         
-        self.order_panel = OrderPanel(self.pos_tab, self.db)
+        self.order_panel = OrderPanel(self.pos_tab, self.db, self.sync_worker, self.spooler)
         self.order_panel.grid(row=0, column=1, sticky="nsew", padx=5, pady=5)
+        
+        # Taps, search picks and scans all land on the current order
+        self.product_grid.bind("<<ProductSelected>>", self._on_product_selected)
+    
+    def _on_product_selected(self, event=None):
+        product = self.product_grid.selected_product
+        if product is not None:
+            self.order_panel.add_item(product.id, product.price)
     
     def _setup_inventory_tab(self):
         self.inventory_tab.grid_columnconfigure(0, weight=1)
         self.inventory_tab.grid_rowconfigure(0, weight=1)
         
-        self.inventory_view = InventoryView(self.inventory_tab, self.db)
+        self.inventory_view = InventoryView(self.inventory_tab, self.db, self.inventory)
         self.inventory_view.grid(row=0, column=0, sticky="nsew", padx=5, pady=5)
     
     def _setup_reports_tab(self):
@@ -6,15 +6,35 @@ Utilities Package
 Contains helper functions and utility classes.
 """
 
-from .receipt_printer import ReceiptPrinter
-from .helpers import (
-    format_currency,
-    calculate_tax,
-    validate_phone_number
-)
+from typing import TYPE_CHECKING
+from app._lazy import lazy_exports
+
+# Utilities are imported on first access
+__getattr__, __dir__ = lazy_exports(globals(), {
+    'ReceiptPrinter': '.receipt_printer',
+    'PrintSpooler': '.print_spooler',
+    'LRUCache': '.cache',
+    'ChartRenderer': '.charts',
+    'SessionMetrics': '.metrics',
+    'format_currency': '.helpers',
+    'calculate_tax': '.helpers',
+    'validate_phone_number': '.helpers'
+})
+
+if TYPE_CHECKING:
+    from .receipt_printer import ReceiptPrinter
+    from .print_spooler import PrintSpooler
+    from .cache import LRUCache
+    from .charts import ChartRenderer
+    from .metrics import SessionMetrics
+    from .helpers import format_currency, calculate_tax, validate_phone_number
 
 __all__ = [
     'ReceiptPrinter',
+    'PrintSpooler',
+    'LRUCache',
+    'ChartRenderer',
+    'SessionMetrics',
     'format_currency',
     'calculate_tax',
     'validate_phone_number'
@@ -0,0 +1,115 @@
+# Report Chart Rendering (app/utils/charts.py)
+
+import threading
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+class ChartRenderer:
+    # Renders report charts into an off-screen Agg buffer, so it can run on a worker thread
+    # and hand the Tk thread finished image bytes. Each chart kind keeps its own Axes and
+    # artists; a new dataset of the same shape only moves the artists and blits them over
+    # that chart's cached background instead of redrawing the whole figure.
+    def __init__(self, width: int = 800, height: int = 500, dpi: int = 100):
+        # matplotlib is only imported once the first chart is rendered
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        self.dpi = dpi
+        self.figure = Figure(figsize=(width / dpi, height / dpi), dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.figure)
+        self.figure.subplots_adjust(bottom=0.2)  # shared by every chart so the snapshots line up
+        self._lock = threading.Lock()
+        self._charts: Dict[str, Dict[str, Any]] = {}
+        self.full_draws = 0
+        self.blits = 0
+
+    def resize(self, width: int, height: int):
+        with self._lock:
+            self.figure.set_size_inches(width / self.dpi, height / self.dpi)
+            for chart in self._charts.values():
+                chart['background'] = None
+
+    def daily_revenue(self, days: Sequence[str], revenues: Sequence[float], title: str) -> bytes:
+        return self._bars('daily', days, revenues, title, "Revenue ($)", "Date", horizontal=False)
+
+    def top_products(self, names: Sequence[str], quantities: Sequence[float]) -> bytes:
+        return self._bars('top', names, quantities, "Top Selling Products", "Quantity Sold", None, horizontal=True)
+
+    def hourly_sales(self, hours: Sequence[int], sales: Sequence[float]) -> bytes:
+        with self._lock:
+            chart = self._charts.get('hourly')
+            shape = ('hourly', tuple(hours))
+            if chart is None:
+                ax = self._new_axes('hourly', "Hourly Sales Trends", "Hour of Day", "Sales ($)")
+                ax.set_xticks(range(24))
+                line, = ax.plot(hours, sales, marker='o', animated=True)
+                chart = self._charts['hourly'] = {'ax': ax, 'artists': [line], 'shape': None, 'background': None}
+            chart['artists'][0].set_data(hours, sales)
+            return self._render('hourly', shape, sales, 'y')
+
+    def _bars(self, kind: str, labels: Sequence[str], values: Sequence[float], title: str,
+              value_label: str, category_label: Optional[str], horizontal: bool) -> bytes:
+        with self._lock:
+            chart = self._charts.get(kind)
+            if chart is None:
+                ax = self._new_axes(kind, title, *((value_label, category_label) if horizontal else (category_label, value_label)))
+                chart = self._charts[kind] = {'ax': ax, 'artists': [], 'shape': None, 'background': None}
+            ax = chart['ax']
+            ax.set_title(title)
+            shape = (kind, tuple(labels))
+            if shape != chart['shape']:
+                # Different bars (count or labels): replace the container, keep the Axes
+                for artist in chart['artists']:
+                    artist.remove()
+                positions = range(len(labels))
+                bars = (ax.barh if horizontal else ax.bar)(positions, values, animated=True)
+                chart['artists'] = list(bars)
+                if horizontal:
+                    ax.set_yticks(positions, labels)
+                else:
+                    ax.set_xticks(positions, labels, rotation=30, ha='right')
+            else:
+                for bar, value in zip(chart['artists'], values):
+                    if horizontal:
+                        bar.set_width(value)
+                    else:
+                        bar.set_height(value)
+            return self._render(kind, shape, values, 'x' if horizontal else 'y')
+
+    def _new_axes(self, kind: str, title: str, xlabel: Optional[str], ylabel: Optional[str]):
+        ax = self.figure.add_subplot(111, label=kind)
+        ax.set_title(title)
+        if xlabel:
+            ax.set_xlabel(xlabel)
+        if ylabel:
+            ax.set_ylabel(ylabel)
+        return ax
+
+    def _render(self, kind: str, shape: Tuple, values: Sequence[float], value_axis: str) -> bytes:
+        chart = self._charts[kind]
+        ax = chart['ax']
+        top = max(values, default=0) or 1.0
+        low, high = ax.get_xlim() if value_axis == 'x' else ax.get_ylim()
+        # Every chart keeps a snapshot of its own background (axes, ticks, labels without the
+        # data). Switching back to a chart, or new data that still fits its scale, only restores
+        # that snapshot and redraws the data artists.
+        if chart['background'] is not None and shape == chart['shape'] and high * 0.5 <= top <= high:
+            self.canvas.restore_region(chart['background'])
+            self.blits += 1
+        else:
+            for name, other in self._charts.items():
+                other['ax'].set_visible(name == kind)
+            (ax.set_xlim if value_axis == 'x' else ax.set_ylim)(0, top * 1.1)
+            self.canvas.draw()  # animated artists are left out of the background
+            chart['background'] = self.canvas.copy_from_bbox(self.figure.bbox)
+            chart['shape'] = shape
+            self.full_draws += 1
+        for artist in chart['artists']:
+            ax.draw_artist(artist)
+        return self._ppm()
+
+    def _ppm(self) -> bytes:
+        # Binary PPM is the cheapest format tk.PhotoImage reads natively: header + RGB bytes
+        import numpy as np
+        rgba = np.asarray(self.canvas.buffer_rgba())
+        height, width = rgba.shape[:2]
+        return b"P6 %d %d 255\n" % (width, height) + np.ascontiguousarray(rgba[:, :, :3]).tobytes()
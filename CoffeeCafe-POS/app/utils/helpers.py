@@ -0,0 +1,33 @@
+# Helper Functions (app/utils/helpers.py)
+
+import re
+from typing import Optional
+from app.config import Config
+
+TAX_RATE = 0.08  # 8% sales tax
+
+def format_currency(amount: float) -> str:
+    return f"${amount:,.2f}"
+
+def calculate_tax(amount: float, rate: float = TAX_RATE) -> float:
+    return amount * rate
+
+def validate_phone_number(phone: str) -> bool:
+    digits = re.sub(r"\D", "", phone or "")
+    return 10 <= len(digits) <= 15
+
+
+def normalize_phone(phone: str, country_code: str = Config.PHONE_COUNTRY_CODE) -> Optional[str]:
+    # E.164 ("+15551234567"), the form phones are stored and looked up in; None if it can't be one.
+    # Numbers typed without a country code get the store's, dropping a national trunk "0".
+    text = (phone or "").strip()
+    digits = re.sub(r"\D", "", text)
+    if text.startswith("+"):
+        pass
+    elif digits.startswith("00"):
+        digits = digits[2:]
+    elif not (len(digits) > 10 and digits.startswith(country_code)):
+        digits = country_code + (digits[1:] if digits.startswith("0") else digits)
+    if not 10 <= len(digits) <= 15 or digits.startswith("0"):
+        return None
+    return "+" + digits
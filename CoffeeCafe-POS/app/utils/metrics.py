@@ -0,0 +1,65 @@
+# Session Timing Metrics (app/utils/metrics.py)
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+class SessionMetrics:
+    # Named milestones on the monotonic clock (login, pos_ready, first_sale, ...). Recorded
+    # intervals are logged and appended to METRICS_PATH as JSON lines so they can be tracked
+    # across shifts and releases.
+    _instance: Optional['SessionMetrics'] = None
+    _instance_lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    instance = super().__new__(cls)
+                    instance._initialize()
+                    cls._instance = instance
+        return cls._instance
+
+    def _initialize(self):
+        self.path = Config.METRICS_PATH
+        self._marks: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def start_session(self, name: str = 'login'):
+        # Milestones are per login; anything from the previous session is dropped
+        with self._lock:
+            self._marks = {name: time.perf_counter()}
+
+    def mark(self, name: str, at: Optional[float] = None) -> bool:
+        # First occurrence wins; returns False if the milestone was already reached
+        with self._lock:
+            if name in self._marks:
+                return False
+            self._marks[name] = time.perf_counter() if at is None else at
+            return True
+
+    def elapsed(self, start: str, end: str) -> Optional[float]:
+        with self._lock:
+            if start not in self._marks or end not in self._marks:
+                return None
+            return self._marks[end] - self._marks[start]
+
+    def record(self, metric: str, start: str, end: str) -> Optional[float]:
+        seconds = self.elapsed(start, end)
+        if seconds is None:
+            return None
+        logger.info(f"{metric}: {seconds:.3f}s")
+        if self.path:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                with open(self.path, 'a') as f:
+                    f.write(json.dumps({'metric': metric, 'seconds': round(seconds, 4), 'at': time.time()}) + "\n")
+            except OSError as e:
+                logger.warning(f"Could not write metrics: {e}")
+        return seconds
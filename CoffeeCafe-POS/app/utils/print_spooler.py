@@ -0,0 +1,175 @@
+# Receipt Print Spooler (app/utils/print_spooler.py)
+
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from app.config import Config
+from app.utils.receipt_printer import ReceiptPrinter
+
+logger = logging.getLogger(__name__)
+
+class PrintSpooler(threading.Thread):
+    def __init__(self, printer: Optional[ReceiptPrinter] = None,
+                 path: str = Config.PRINT_SPOOL_PATH,
+                 max_queue: int = Config.PRINT_QUEUE_SIZE,
+                 max_attempts: int = Config.PRINT_MAX_ATTEMPTS,
+                 retry_seconds: float = Config.PRINT_RETRY_SECONDS):
+        super().__init__(name="print-spooler", daemon=True)
+        self.printer = printer
+        self.max_attempts = max_attempts
+        self.retry_seconds = retry_seconds
+        self._queue: "queue.Queue[int]" = queue.Queue(maxsize=max_queue)
+        self._queued = set()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS print_jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                printed_at REAL
+            )
+        """)
+
+    # Called from the checkout path: persist and hand off, never touch the USB device
+    def enqueue(self, order: Dict[str, Any], customer: Optional[Dict[str, Any]] = None) -> int:
+        payload = json.dumps({'order': order, 'customer': customer}, default=str)
+        with self._lock:
+            job_id = self._conn.execute(
+                "INSERT INTO print_jobs (payload, created_at) VALUES (?, ?)",
+                (payload, time.time())
+            ).lastrowid
+        self._offer(job_id)
+        return job_id
+
+    def reprint(self, count: int = 1) -> List[int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT payload FROM print_jobs WHERE status = 'printed' ORDER BY id DESC LIMIT ?",
+                (count,)
+            ).fetchall()
+        return [self.enqueue(**json.loads(payload)) for (payload,) in reversed(rows)]
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM print_jobs WHERE status = 'pending'"
+            ).fetchone()[0]
+
+    def _offer(self, job_id: int) -> bool:
+        with self._lock:
+            if job_id in self._queued:
+                return True
+            try:
+                self._queue.put_nowait(job_id)
+            except queue.Full:
+                # Still persisted; picked up again once the queue drains
+                logger.warning(f"Print queue full, receipt job {job_id} deferred")
+                return False
+            self._queued.add(job_id)
+            return True
+
+    def _requeue_pending(self):
+        with self._lock:
+            job_ids = [row[0] for row in self._conn.execute(
+                "SELECT id FROM print_jobs WHERE status = 'pending' ORDER BY id"
+            ).fetchall()]
+        for job_id in job_ids:
+            if not self._offer(job_id):
+                break
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
+        if self.is_alive():
+            # Still inside a print; closing under it would fail the job. Queued jobs stay on disk.
+            logger.warning("Print spooler did not stop in time, abandoning it with its printer open")
+            return
+        if self.printer:
+            self.printer.close()
+        with self._lock:
+            self._conn.close()
+
+    def run(self):
+        # One printer handle lives for the life of the spooler
+        if self.printer is None:
+            self.printer = ReceiptPrinter()
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM print_jobs WHERE status != 'pending' AND created_at < ?",
+                (time.time() - 7 * 24 * 3600,)
+            )
+        self._requeue_pending()  # jobs left over from the last run
+        while not self._stop_event.is_set():
+            try:
+                job_id = self._queue.get(timeout=self.retry_seconds)
+            except queue.Empty:
+                self._requeue_pending()
+                continue
+            with self._lock:
+                self._queued.discard(job_id)
+            try:
+                self.print_job(job_id)
+            except Exception as e:
+                # A bad payload or a spool error must not take the spooler down with it
+                logger.error(f"Receipt job {job_id} could not be printed: {e}")
+                self._mark_failed(job_id)
+
+    def _mark_failed(self, job_id: int):
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "UPDATE print_jobs SET status = 'failed', attempts = attempts + 1 WHERE id = ?",
+                    (job_id,)
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Could not mark receipt job {job_id} failed: {e}")
+
+    def print_job(self, job_id: int) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, attempts FROM print_jobs WHERE id = ? AND status = 'pending'",
+                (job_id,)
+            ).fetchone()
+        if row is None:
+            return False
+        payload, attempts = json.loads(row[0]), row[1]
+
+        if not self.printer.printer:
+            self.printer.connect()
+        printed = self.printer.print_receipt(payload['order'], payload['customer'])
+        if not printed:
+            # Usually an unplugged or power-cycled printer; a fresh handle recovers it
+            self.printer.reconnect()
+
+        with self._lock:
+            if printed:
+                self._conn.execute(
+                    "UPDATE print_jobs SET status = 'printed', attempts = ?, printed_at = ? WHERE id = ?",
+                    (attempts + 1, time.time(), job_id)
+                )
+            else:
+                status = 'failed' if attempts + 1 >= self.max_attempts else 'pending'
+                self._conn.execute(
+                    "UPDATE print_jobs SET status = ?, attempts = ? WHERE id = ?",
+                    (status, attempts + 1, job_id)
+                )
+        if not printed:
+            logger.warning(f"Receipt job {job_id} failed (attempt {attempts + 1}/{self.max_attempts})")
+            self._stop_event.wait(self.retry_seconds)
+            if attempts + 1 < self.max_attempts:
+                self._offer(job_id)
+        return printed
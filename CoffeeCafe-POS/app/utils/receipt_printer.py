@@ -6,16 +6,81 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+ESC = b'\x1b'
+GS = b'\x1d'
+
+class ReceiptTemplate:
+    # Static header/footer bytes are encoded once; render() only formats the order lines
+    INIT = ESC + b'@'
+    ALIGN_LEFT = ESC + b'a\x00'
+    ALIGN_CENTER = ESC + b'a\x01'
+    FEED_AND_CUT = ESC + b'd\x06' + GS + b'V\x00'
+    
+    def __init__(self, store_name: str = "CoffeeCafe",
+                 address_lines: tuple = ("123 Java Street", "Brewville, CA 90210"),
+                 footer: str = "Thank you for visiting!",
+                 encoding: str = "cp437"):
+        self.encoding = encoding  # the printer's power-on code page
+        header_text = f"\n{store_name}\n" + "".join(f"{line}\n" for line in address_lines) + "\n"
+        self.header = self.INIT + self.ALIGN_CENTER + self._encode(header_text) + self.ALIGN_LEFT
+        self.rule = self._encode("------------------------------\n")
+        self.footer = self._encode(f"\n{footer}\n") + self.FEED_AND_CUT
+    
+    def _encode(self, text: str) -> bytes:
+        return text.encode(self.encoding, errors='replace')
+    
+    def render(self, order: dict, customer: dict = None) -> bytes:
+        lines = [f"Order #: {order['id']}\n", f"Date: {order['created_at']}\n"]
+        body = [f"{item['quantity']}x {item['product']['name']}\n"
+                f"  ${item['unit_price']:.2f} each = ${item['quantity'] * item['unit_price']:.2f}\n"
+                for item in order['items']]
+        totals = [
+            f"Subtotal: ${order['subtotal']:.2f}\n",
+            f"Tax: ${order['tax']:.2f}\n",
+            f"Total: ${order['total']:.2f}\n"
+        ]
+        if customer:
+            totals.append(f"\nCustomer: {customer['name']}\nPoints: {customer['points']}\n")
+        
+        return b"".join((
+            self.header,
+            self._encode("".join(lines)),
+            self.rule,
+            self._encode("".join(body)),
+            self.rule,
+            self._encode("".join(totals)),
+            self.footer
+        ))
+
 class ReceiptPrinter:
-    def __init__(self):
+    def __init__(self, template: ReceiptTemplate = None):
+        self.template = template or ReceiptTemplate()
+        self.printer = None
+        self.connect()
+    
+    def connect(self) -> bool:
         try:
             self.printer = Usb(
                 idVendor=Config.PRINTER_VENDOR_ID,
                 idProduct=Config.PRINTER_PRODUCT_ID
             )
+            return True
         except Exception as e:
             logger.error(f"Printer initialization failed: {e}")
             self.printer = None
+            return False
+    
+    def close(self):
+        if self.printer:
+            try:
+                self.printer.close()
+            except Exception as e:
+                logger.warning(f"Error closing printer: {e}")
+        self.printer = None
+    
+    def reconnect(self) -> bool:
+        self.close()
+        return self.connect()
     
     def print_receipt(self, order: dict, customer: dict = None):
         if not self.printer:
@@ -23,31 +88,8 @@ class ReceiptPrinter:
             return False
             
         try:
-            self.printer.set(align='center')
-            self.printer.text("\nCoffeeCafe\n")
-            self.printer.text("123 Java Street\n")
-            self.printer.text("Brewville, CA 90210\n\n")
-            
-            self.printer.set(align='left')
-            self.printer.text(f"Order #: {order['id']}\n")
-            self.printer.text(f"Date: {order['created_at']}\n")
-            self.printer.text("------------------------------\n")
-            
-            for item in order['items']:
-                self.printer.text(f"{item['quantity']}x {item['product']['name']}\n")
-                self.printer.text(f"  ${item['unit_price']:.2f} each = ${item['quantity'] * item['unit_price']:.2f}\n")
-            
-            self.printer.text("------------------------------\n")
-            self.printer.text(f"Subtotal: ${order['subtotal']:.2f}\n")
-            self.printer.text(f"Tax: ${order['tax']:.2f}\n")
-            self.printer.text(f"Total: ${order['total']:.2f}\n")
-            
-            if customer:
-                self.printer.text(f"\nCustomer: {customer['name']}\n")
-                self.printer.text(f"Points: {customer['points']}\n")
-            
-            self.printer.text("\nThank you for visiting!\n")
-            self.printer.cut()
+            # The whole receipt goes out as a single bulk transfer
+            self.printer._raw(self.template.render(order, customer))
             return True
         except Exception as e:
             logger.error(f"Printing failed: {e}")
@@ -0,0 +1,3 @@
+# Version (app/version.py)
+
+__version__ = "0.1.0"
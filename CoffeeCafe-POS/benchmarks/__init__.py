@@ -0,0 +1,7 @@
+# Benchmarks Package (benchmarks/__init__.py)
+
+"""
+Benchmarks Package
+
+Standalone performance benchmarks, run with `python -m benchmarks.<name>`.
+"""
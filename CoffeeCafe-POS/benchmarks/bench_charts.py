@@ -0,0 +1,88 @@
+# Report Chart Switch Benchmark (benchmarks/bench_charts.py)
+#
+# Cycles Sales -> Top Products -> Hourly Trends the way a manager flips
+# between report buttons, and times each switch: the old ReportsView path
+# (figure.clear(), new Axes, full draw) vs ChartRenderer (kept Axes and
+# artists, per-chart background snapshots, blitted data). Both render to an
+# Agg canvas of the same size; the old FigureCanvasTkAgg.draw() did the same
+# Agg render on the Tk thread before copying it to the widget. The renderer
+# time includes encoding the PPM image handed to Tk.
+#
+#   python -m benchmarks.bench_charts
+
+import random
+import statistics
+import time
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from app.utils.charts import ChartRenderer
+
+ROUNDS = 20
+DAYS = [f"01-{day:02d}" for day in range(1, 8)]
+PRODUCTS = ["Latte", "Espresso", "Muffin", "Cold Brew", "Croissant"]
+
+def datasets():
+    return {
+        'sales': [random.uniform(400, 500) for _ in DAYS],
+        'top': [random.randint(40, 50) for _ in PRODUCTS],
+        'hourly': [random.uniform(40, 50) for _ in range(24)]
+    }
+
+class Legacy:
+    def __init__(self):
+        self.figure = Figure(figsize=(8, 5), dpi=100)
+        self.canvas = FigureCanvasAgg(self.figure)
+
+    def show(self, kind, data):
+        self.figure.clear()
+        ax = self.figure.add_subplot(111)
+        if kind == 'sales':
+            ax.bar(DAYS, data)
+            ax.set_title("Sales Report")
+            ax.set_ylabel("Revenue ($)")
+            ax.set_xlabel("Date")
+            self.figure.autofmt_xdate()
+        elif kind == 'top':
+            ax.barh(PRODUCTS, data)
+            ax.set_title("Top Selling Products")
+            ax.set_xlabel("Quantity Sold")
+        else:
+            ax.plot(range(24), data, marker='o')
+            ax.set_title("Hourly Sales Trends")
+            ax.set_xlabel("Hour of Day")
+            ax.set_ylabel("Sales ($)")
+            ax.set_xticks(range(24))
+        self.canvas.draw()
+
+class Current:
+    def __init__(self):
+        self.renderer = ChartRenderer(800, 500)
+
+    def show(self, kind, data):
+        if kind == 'sales':
+            self.renderer.daily_revenue(DAYS, data, "Sales Report")
+        elif kind == 'top':
+            self.renderer.top_products(PRODUCTS, data)
+        else:
+            self.renderer.hourly_sales(list(range(24)), data)
+
+def measure(label, view):
+    for kind, data in datasets().items():  # first draw of each chart is not a switch
+        view.show(kind, data)
+    timings = []
+    for _ in range(ROUNDS):
+        for kind, data in datasets().items():
+            start = time.perf_counter()
+            view.show(kind, data)
+            timings.append((time.perf_counter() - start) * 1e3)
+    timings.sort()
+    print(f"{label:<10}{statistics.median(timings):>12.1f}{timings[int(len(timings) * 0.95)]:>12.1f}{timings[-1]:>12.1f}")
+
+def main():
+    random.seed(7)
+    print(f"{'':<10}{'median ms':>12}{'p95 ms':>12}{'max ms':>12}")
+    measure("legacy", Legacy())
+    measure("renderer", Current())
+
+if __name__ == "__main__":
+    main()
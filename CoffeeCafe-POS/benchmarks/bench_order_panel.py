@@ -0,0 +1,134 @@
+# Order Panel Redraw Benchmark (benchmarks/bench_order_panel.py)
+#
+# Builds a 200-line catering order and measures what each redraw costs as the
+# order grows: the old full rebuild (delete every row, re-insert the order) vs
+# OrderPanel's own redraw path. The latter goes through add_item, the after_idle
+# coalescing and _update_display (dirty rows, product names and totals), one
+# scan per redraw and in bursts of scans that share one redraw. Runs against a
+# real ttk.Treeview when a display is available, otherwise against an
+# in-memory stand-in with the same insert/item/delete interface. Idle
+# callbacks are drained by hand, as Tk would once the burst is handled.
+#
+#   python -m benchmarks.bench_order_panel
+
+import os
+import time
+from itertools import count
+from app.models.order import Order
+from app.ui.components.order_panel import OrderPanel, TreeRowSync
+from app.utils.helpers import calculate_tax
+
+LINES = 200
+CHECKPOINTS = (10, 50, 100, 150, 200)
+BURST = 10
+
+class FakeTree:
+    def __init__(self):
+        self._rows = {}
+        self._ids = count()
+
+    def insert(self, parent, index, values=()):
+        iid = f"I{next(self._ids)}"
+        self._rows[iid] = tuple(str(v) for v in values)
+        return iid
+
+    def item(self, iid, values=()):
+        self._rows[iid] = tuple(str(v) for v in values)
+
+    def delete(self, *iids):
+        for iid in iids:
+            del self._rows[iid]
+
+    def get_children(self):
+        return tuple(self._rows)
+
+class FakeVar:
+    def set(self, value):
+        self.value = value
+
+class WarmCatalog:
+    # DatabaseService.get_products_by_ids once the catalog is loaded: no query on the redraw path
+    def get_products_by_ids(self, product_ids):
+        return {product_id: {'id': product_id, 'name': f"Tray item {product_id}"} for product_id in product_ids}
+
+def make_tree():
+    if os.environ.get("DISPLAY"):
+        import tkinter as tk
+        from tkinter import ttk
+        root = tk.Tk()
+        root.withdraw()
+        return ttk.Treeview(root, columns=("qty", "name", "price", "total"), show="headings")
+    return FakeTree()
+
+def make_panel(tree):
+    # Just the state OrderPanel's redraw path touches, without building the widget
+    panel = OrderPanel.__new__(OrderPanel)
+    panel.db = WarmCatalog()
+    panel.order = Order()
+    panel.tree = tree
+    panel.rows = TreeRowSync(tree)
+    panel.subtotal_var, panel.tax_var, panel.total_var = FakeVar(), FakeVar(), FakeVar()
+    panel._dirty = set()
+    panel._redraw_pending = False
+    idle = []
+    panel.after_idle = idle.append
+    return panel, idle
+
+def row_values(item):
+    return (item.quantity, f"Tray item {item.product_id}", f"${item.unit_price:.2f}",
+            f"${item.quantity * item.unit_price:.2f}")
+
+def full_rebuild(tree, order):
+    tree.delete(*tree.get_children())
+    for item in order.items:
+        tree.insert("", "end", values=row_values(item))
+
+def report(label, timings):
+    print(f"{label:<14}" + "".join(f"{timings[n] * 1e6:>10.1f}" for n in CHECKPOINTS))
+
+def run_full_rebuild():
+    tree = make_tree()
+    order = Order()
+    timings = {}
+    for i in range(1, LINES + 1):
+        order.add_item(f"sku_{i}", 1, 2.50 + i % 7)
+        start = time.perf_counter()
+        full_rebuild(tree, order)
+        elapsed = time.perf_counter() - start
+        if i in CHECKPOINTS:
+            timings[i] = elapsed
+    report("full rebuild", timings)
+
+def run_panel(label, burst):
+    # Each step scans `burst` items (a new line plus repeats of earlier ones) and then lets
+    # Tk go idle; the time covers the scans and every redraw they caused
+    panel, idle = make_panel(make_tree())
+    timings, redraws = {}, 0
+    for i in range(1, LINES + 1):
+        start = time.perf_counter()
+        panel.add_item(f"sku_{i}", 2.50 + i % 7)
+        for repeat in range(1, burst):
+            j = max(1, i - repeat)
+            panel.add_item(f"sku_{j}", 2.50 + j % 7)
+        while idle:
+            idle.pop(0)()
+            redraws += 1
+        elapsed = time.perf_counter() - start
+        if i in CHECKPOINTS:
+            timings[i] = elapsed
+    # One redraw per burst, and the totals it drew match the order
+    assert redraws == LINES, f"{redraws} redraws for {LINES} bursts"
+    subtotal = sum(item.quantity * item.unit_price for item in panel.order.items)
+    assert panel.total_var.value == f"Total: ${subtotal + calculate_tax(subtotal):.2f}"
+    assert len(panel.rows.rows) == LINES
+    report(label, timings)
+
+def main():
+    print(f"Cost per redraw, scans included, in microseconds at N order lines ({'Tk' if os.environ.get('DISPLAY') else 'fake tree'})")
+    print(f"{'':<14}" + "".join(f"{'N=' + str(n):>10}" for n in CHECKPOINTS))
+    run_full_rebuild()
+    run_panel("1 scan", 1)
+    run_panel(f"{BURST} scans", BURST)
+
+if __name__ == "__main__":
+    main()
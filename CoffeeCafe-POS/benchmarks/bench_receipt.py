@@ -0,0 +1,98 @@
+# Receipt Render/Transfer Benchmark (benchmarks/bench_receipt.py)
+#
+# Compares the old receipt path (one escpos set/text call per line, each its
+# own USB transfer) with the compiled ReceiptTemplate (one pre-rendered bytes
+# buffer, one bulk write). A fake USB device stands in for the printer and
+# charges a fixed per-transfer latency plus a per-byte cost, roughly what a
+# full-speed USB thermal printer costs per bulk OUT transfer.
+#
+#   python -m benchmarks.bench_receipt
+
+import time
+from escpos.printer import Dummy
+from app.utils.receipt_printer import ReceiptTemplate
+
+TRANSFER_LATENCY = 0.001   # seconds per bulk transfer
+BYTE_COST = 1 / 1_000_000  # seconds per byte (~1 MB/s)
+RUNS = 50
+
+class FakeUsb(Dummy):
+    def __init__(self):
+        super().__init__()
+        self.transfers = 0
+
+    def _raw(self, msg):
+        self.transfers += 1
+        time.sleep(TRANSFER_LATENCY + len(msg) * BYTE_COST)
+        super()._raw(msg)
+
+def sample_order(lines):
+    items = [{'product': {'name': f"Latte {i}"}, 'quantity': 1 + i % 3, 'unit_price': 4.25} for i in range(lines)]
+    subtotal = sum(item['quantity'] * item['unit_price'] for item in items)
+    return {
+        'id': 'a1b2c3d4',
+        'created_at': '2024-01-01T08:00:00',
+        'subtotal': subtotal,
+        'tax': subtotal * 0.08,
+        'total': subtotal * 1.08,
+        'items': items
+    }
+
+def legacy_print(printer, order, customer):
+    # The per-call sequence ReceiptPrinter.print_receipt used before templating
+    printer.set(align='center')
+    printer.text("\nCoffeeCafe\n")
+    printer.text("123 Java Street\n")
+    printer.text("Brewville, CA 90210\n\n")
+    printer.set(align='left')
+    printer.text(f"Order #: {order['id']}\n")
+    printer.text(f"Date: {order['created_at']}\n")
+    printer.text("------------------------------\n")
+    for item in order['items']:
+        printer.text(f"{item['quantity']}x {item['product']['name']}\n")
+        printer.text(f"  ${item['unit_price']:.2f} each = ${item['quantity'] * item['unit_price']:.2f}\n")
+    printer.text("------------------------------\n")
+    printer.text(f"Subtotal: ${order['subtotal']:.2f}\n")
+    printer.text(f"Tax: ${order['tax']:.2f}\n")
+    printer.text(f"Total: ${order['total']:.2f}\n")
+    if customer:
+        printer.text(f"\nCustomer: {customer['name']}\n")
+        printer.text(f"Points: {customer['points']}\n")
+    printer.text("\nThank you for visiting!\n")
+    printer.cut()
+
+TEMPLATE = ReceiptTemplate()  # compiled once, as ReceiptPrinter does at startup
+
+def measure(label, send, lines):
+    order = sample_order(lines)
+    customer = {'name': 'Ana', 'points': 120}
+    device = FakeUsb()
+    render_time = None
+    start = time.perf_counter()
+    for _ in range(RUNS):
+        render = send(device, order, customer)
+        if render is not None:
+            render_time = (render_time or 0.0) + render
+    total = (time.perf_counter() - start) / RUNS
+    render_ms = f"{render_time / RUNS * 1e3:.3f}" if render_time is not None else "-"
+    print(f"{label:<10}{lines:>6}{render_ms:>12}{total * 1e3:>12.2f}{device.transfers / RUNS:>12.0f}")
+
+def run_legacy(device, order, customer):
+    legacy_print(device, order, customer)
+    return None  # rendering is interleaved with the transfers
+
+def run_template(device, order, customer):
+    start = time.perf_counter()
+    buffer = TEMPLATE.render(order, customer)
+    render = time.perf_counter() - start
+    device._raw(buffer)
+    return render
+
+def main():
+    print(f"{'':<10}{'lines':>6}{'render ms':>12}{'total ms':>12}{'transfers':>12}")
+    for lines in (3, 6, 20):
+        measure("legacy", run_legacy, lines)
+        measure("template", run_template, lines)
+
+if __name__ == "__main__":
+    main()
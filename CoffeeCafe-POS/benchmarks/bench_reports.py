@@ -0,0 +1,82 @@
+# Sales Report Pipeline Benchmark (benchmarks/bench_reports.py)
+#
+# Runs N synthetic orders spread over 90 days through the sales report
+# pipeline and times it: the old ReportsView processing (strptime per order,
+# dict grouping, `revenues[dates.index(date)]` per table row) vs the current
+# one (SalesAggregator fed in 1000-order pages, then daily_table_rows).
+# The per-order cost of the current pipeline should stay flat as N grows.
+#
+#   python -m benchmarks.bench_reports
+
+import time
+from datetime import datetime, timedelta
+from app.services.aggregation import SalesAggregator
+from app.ui.components.reports_view import daily_table_rows
+from app.utils.helpers import format_currency
+
+SIZES = (25_000, 50_000, 100_000)
+DAYS = 90
+PAGE_SIZE = 1000
+START = datetime(2024, 1, 1)
+
+def make_orders(total):
+    step = DAYS * 24 * 3600 / total
+    return [{
+        'id': f"{i:08d}",
+        'created_at': (START + timedelta(seconds=int(i * step))).strftime('%Y-%m-%dT%H:%M:%S'),
+        'total_amount': 4.25 + i % 7,
+        'order_items': [
+            {'product_id': f"p{i % 40}", 'quantity': 1 + i % 3, 'unit_price': 4.25,
+             'products': {'name': f"Product {i % 40}", 'category': f"Category {i % 5}"}}
+        ]
+    } for i in range(total)]
+
+def legacy_pipeline(orders):
+    # ReportsView._display_sales_data and _update_data_table before vectorizing
+    dates = [datetime.strptime(d['created_at'], '%Y-%m-%dT%H:%M:%S').date() for d in orders]
+    revenues = [d['total_amount'] for d in orders]
+    daily_data = {}
+    for date, revenue in zip(dates, revenues):
+        if date in daily_data:
+            daily_data[date] += revenue
+        else:
+            daily_data[date] = revenue
+    sorted_dates = sorted(daily_data.keys())
+    sorted_revenues = [daily_data[d] for d in sorted_dates]
+
+    date_counts = {}
+    for date in sorted_dates:
+        if date in date_counts:
+            date_counts[date] += 1
+        else:
+            date_counts[date] = 1
+    return [(date.strftime('%Y-%m-%d'), date_counts[date], format_currency(sorted_revenues[sorted_dates.index(date)]))
+            for date in sorted(date_counts.keys())]
+
+def current_pipeline(orders):
+    aggregator = SalesAggregator('UTC')
+    for offset in range(0, len(orders), PAGE_SIZE):
+        aggregator.add_orders(orders[offset:offset + PAGE_SIZE])
+    summary = aggregator.summary(START, START + timedelta(days=DAYS - 1))
+    return daily_table_rows(summary.daily)
+
+def measure(label, pipeline, orders):
+    start = time.perf_counter()
+    rows = pipeline(orders)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<10}{len(orders):>10}{len(rows):>8}{elapsed * 1e3:>12.1f}{elapsed / len(orders) * 1e6:>14.2f}")
+    return rows
+
+def main():
+    current_pipeline(make_orders(PAGE_SIZE))  # pandas' first calls pay one-off setup costs
+    print(f"{'':<10}{'orders':>10}{'days':>8}{'total ms':>12}{'us / order':>14}")
+    for total in SIZES:
+        orders = make_orders(total)
+        legacy = measure("legacy", legacy_pipeline, orders)
+        current = measure("current", current_pipeline, orders)
+        # The old table reported one order per day, whatever the real count
+        assert sum(row[1] for row in legacy) == len(legacy)
+        assert sum(row[1] for row in current) == total
+
+if __name__ == "__main__":
+    main()
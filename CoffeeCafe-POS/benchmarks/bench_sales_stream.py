@@ -0,0 +1,121 @@
+# Sales Report Streaming Benchmark (benchmarks/bench_sales_stream.py)
+#
+# Aggregates N synthetic orders two ways: the old single response holding the
+# whole range, and ReportingService.iter_sales feeding the aggregator one
+# keyset page at a time. A fake PostgREST client generates the rows on demand,
+# so tracemalloc's peak is what the register itself holds on to. Wall time
+# here includes generating the rows, which the prefetch thread does under the
+# same GIL; against a real server that page is network wait instead.
+#
+#   python -m benchmarks.bench_sales_stream
+
+import os
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_KEY", "benchmark")
+
+from app.services.aggregation import SalesAggregator
+from app.services.database import DatabaseService
+from app.services.reporting import ReportingService
+
+BASE = datetime(2024, 1, 1, tzinfo=timezone.utc)
+SIZES = (10_000, 50_000, 100_000)
+PAGE_SIZE = 1000
+
+def make_order(i):
+    return {
+        'id': f"{i:08d}",
+        'created_at': (BASE + timedelta(seconds=30 * i)).isoformat(),
+        'total_amount': 4.25 + i % 7,
+        'order_items': [
+            {'product_id': f"p{i % 40}", 'quantity': 1 + i % 3, 'unit_price': 4.25,
+             'products': {'name': f"Product {i % 40}", 'category': f"Category {i % 5}"}},
+            {'product_id': f"p{(i * 7) % 40}", 'quantity': 1, 'unit_price': 2.50,
+             'products': {'name': f"Product {(i * 7) % 40}", 'category': f"Category {(i * 7) % 5}"}}
+        ]
+    }
+
+def index_of(timestamp):
+    return int((datetime.fromisoformat(timestamp) - BASE).total_seconds() // 30)
+
+class FakeClient:
+    def __init__(self, total):
+        self.total = total
+
+    def table(self, name):
+        return FakeQuery(self.total)
+
+class FakeQuery:
+    # Created_at values are unique here, so only the 'from'/'after' cursors are exercised
+    def __init__(self, total):
+        self.lo, self.hi, self.size = 0, total, None
+
+    def select(self, columns):
+        return self
+
+    def gte(self, column, value):
+        self.lo = max(self.lo, index_of(value))
+        return self
+
+    def gt(self, column, value):
+        self.lo = max(self.lo, index_of(value) + 1)
+        return self
+
+    def lte(self, column, value):
+        self.hi = min(self.hi, index_of(value) + 1)
+        return self
+
+    def order(self, columns):
+        return self
+
+    def limit(self, size):
+        self.size = size
+        return self
+
+    def execute(self):
+        hi = self.hi if self.size is None else min(self.hi, self.lo + self.size)
+
+        class Response:
+            data = [make_order(i) for i in range(self.lo, hi)]
+        return Response
+
+def fetch_all(reporting, start, end):
+    # The old path: one response with every order in the range
+    aggregator = SalesAggregator()
+    response = reporting.db.client.table('orders').select('*').gte('created_at', start.isoformat()).lte('created_at', end.isoformat()).execute()
+    aggregator.add_orders(response.data)
+    return aggregator.summary(start, end)
+
+def streamed(reporting, start, end):
+    aggregator = SalesAggregator()
+    for page in reporting.iter_sales(start, end, page_size=PAGE_SIZE):
+        aggregator.add_orders(page)
+    return aggregator.summary(start, end)
+
+def measure(label, run, reporting, total):
+    start, end = BASE, BASE + timedelta(seconds=30 * total)
+    tracemalloc.start()
+    began = time.perf_counter()
+    summary = run(reporting, start, end)
+    elapsed = time.perf_counter() - began
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert summary.total_orders == total
+    print(f"{label:<10}{total:>10}{elapsed:>10.2f}{peak / 2**20:>12.1f}")
+
+def main():
+    with patch('app.services.database.create_client'):
+        db = DatabaseService()
+    reporting = ReportingService()
+    print(f"{'':<10}{'orders':>10}{'sec':>10}{'peak MiB':>12}")
+    for total in SIZES:
+        db.client = FakeClient(total)
+        measure("fetch-all", fetch_all, reporting, total)
+        measure("streamed", streamed, reporting, total)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# Product Search Benchmark (benchmarks/bench_search.py)
+#
+# Builds the catalog's search index over N synthetic products and times what
+# the search box does on each keystroke (typing a name one character at a
+# time) and what a scan does (PLU/barcode lookup), plus an incremental update
+# of one product. Every keystroke should stay under 5 ms at 10k products.
+#
+#   python -m benchmarks.bench_search
+
+import random
+import statistics
+import time
+from app.services.catalog import ProductCatalog
+
+SIZES = (1_000, 10_000)
+WORDS = ["Iced", "Hot", "Oat", "Vanilla", "Caramel", "Latte", "Mocha", "Espresso", "Cold", "Brew",
+         "Chai", "Tea", "Matcha", "Muffin", "Croissant", "Scone", "Bagel", "Almond", "Honey", "Double"]
+QUERIES = ["latte", "iced van", "caramel mocha", "m", "choc"]
+
+def make_products(total):
+    return [{
+        'id': f"p{i:05d}",
+        'name': " ".join(random.sample(WORDS, 3)) + f" {i}",
+        'category': f"Category {i % 8}",
+        'price': 4.25,
+        'plu': str(1000 + i),
+        'barcode': f"{i:013d}"
+    } for i in range(total)]
+
+def keystrokes(catalog, query):
+    timings = []
+    for end in range(1, len(query) + 1):
+        start = time.perf_counter()
+        catalog.search(query[:end])
+        timings.append((time.perf_counter() - start) * 1e3)
+    return timings
+
+def main():
+    random.seed(7)
+    print(f"{'products':>10}{'build ms':>12}{'key med ms':>12}{'key max ms':>12}{'scan us':>10}{'update us':>12}")
+    for total in SIZES:
+        products = make_products(total)
+        catalog = ProductCatalog(max_size=total)
+        start = time.perf_counter()
+        catalog.load(products)
+        build = (time.perf_counter() - start) * 1e3
+
+        timings = [t for query in QUERIES for t in keystrokes(catalog, query)]
+
+        start = time.perf_counter()
+        for product in products[:1000]:
+            assert catalog.lookup_code(product['barcode']) is product
+        scan = (time.perf_counter() - start) / 1000 * 1e6
+
+        start = time.perf_counter()
+        for product in products[:1000]:
+            catalog.put(dict(product, name=product['name'] + " Decaf"))
+        update = (time.perf_counter() - start) / 1000 * 1e6
+
+        print(f"{total:>10}{build:>12.1f}{statistics.median(timings):>12.3f}{max(timings):>12.3f}{scan:>10.1f}{update:>12.1f}")
+
+if __name__ == "__main__":
+    main()
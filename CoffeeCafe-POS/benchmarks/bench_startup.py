@@ -0,0 +1,41 @@
+# Startup Import Benchmark (benchmarks/bench_startup.py)
+#
+# Times cold imports of the app's entry points, each in a fresh interpreter so
+# nothing is already in sys.modules. `app.models` should stay a few ms (it was
+# ~1.2s while app/__init__ imported app.main); `app.main` is what a register
+# pays before the login screen, with the POS screen and pandas left for later.
+#
+#   python -m benchmarks.bench_startup
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+MODULES = ("app.models", "app.services", "app.main")
+RUNS = 7
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = (
+    "import json, sys, time\n"
+    "start = time.perf_counter()\n"
+    "import {module}\n"
+    "print(json.dumps({{'seconds': time.perf_counter() - start, 'modules': len(sys.modules)}}))\n"
+)
+
+def cold_import(module):
+    result = subprocess.run([sys.executable, "-c", SCRIPT.format(module=module)], cwd=APP_ROOT,
+                            capture_output=True, text=True, check=True,
+                            env=dict(os.environ, SUPABASE_URL=os.getenv("SUPABASE_URL", "http://localhost"),
+                                     SUPABASE_KEY=os.getenv("SUPABASE_KEY", "bench")))
+    return json.loads(result.stdout)
+
+def main():
+    print(f"{'module':<16}{'med ms':>10}{'max ms':>10}{'modules':>10}")
+    for module in MODULES:
+        reports = [cold_import(module) for _ in range(RUNS)]
+        timings = [report['seconds'] * 1e3 for report in reports]
+        print(f"{module:<16}{statistics.median(timings):>10.1f}{max(timings):>10.1f}{reports[-1]['modules']:>10}")
+
+if __name__ == "__main__":
+    main()
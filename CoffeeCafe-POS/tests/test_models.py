@@ -0,0 +1,63 @@
+# Tests for the CoffeeCafe-POS data models
+
+import json
+import os
+import subprocess
+import sys
+import pytest
+from app.models import Order
+
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class TestOrder:
+    def test_repeat_scans_share_a_line(self):
+        order = Order()
+        first = order.add_item("prod_123", 1, 3.50)
+        second = order.add_item("prod_123", 2, 3.50)
+        
+        assert first is second
+        assert len(order.items) == 1
+        assert order.items[0].quantity == 3
+        assert order.total == pytest.approx(10.50)
+
+    def test_remove_item(self):
+        order = Order()
+        order.add_item("prod_123", 2, 3.50)
+        item = order.add_item("prod_456", 1, 4.25)
+        
+        assert order.remove_item(item.key) is item
+        assert order.get_item(item.key) is None
+        assert [i.product_id for i in order.items] == ["prod_123"]
+        assert order.total == pytest.approx(7.00)
+
+    def test_customer_travels_with_the_order(self):
+        order = Order()
+        order.set_customer({'id': 'cust_123', 'name': 'Ana', 'points': 12})
+        assert order.customer_id == 'cust_123'
+        assert order.to_dict()['customer_id'] == 'cust_123'
+        
+        order.set_customer(None)
+        assert order.customer is None and order.customer_id is None
+
+class TestImportTime:
+    def _cold_import(self, module):
+        # A fresh interpreter, so modules this test session already loaded do not count
+        script = ("import json, sys, time\nstart = time.perf_counter()\nimport " + module +
+                  "\nprint(json.dumps({'seconds': time.perf_counter() - start, 'modules': sorted(sys.modules)}))\n")
+        result = subprocess.run([sys.executable, "-c", script], cwd=APP_ROOT,
+                                capture_output=True, text=True, check=True)
+        report = json.loads(result.stdout)
+        return report['seconds'], {name.split('.')[0] for name in report['modules']}
+
+    def test_models_import_without_the_app_stack(self):
+        # A few ms in practice; the bound only catches app.models dragging the app back in
+        # (benchmarks/bench_startup.py tracks the actual numbers)
+        seconds, modules = self._cold_import("app.models")
+        heavy = {'tkinter', 'supabase', 'pandas', 'matplotlib', 'jwt', 'passlib'}
+        assert heavy.isdisjoint(modules)
+        assert seconds < 1.0
+
+    def test_login_screen_does_not_load_reporting(self):
+        # pandas and matplotlib wait for the reports tab or the first synced batch
+        _, modules = self._cold_import("app.main")
+        assert {'pandas', 'matplotlib'}.isdisjoint(modules)
@@ -1,9 +1,23 @@
 # A comprehensive test_services.py file for testing your CoffeeCafe-POS services with pytest
 
+import jwt
 import pytest
+import threading
+import time
 from unittest.mock import MagicMock, patch
-from datetime import datetime, timedelta
+from postgrest import SyncPostgrestClient
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
 from app.services import DatabaseService, AuthService, InventoryService, ReportingService, LoyaltyService
+from app.services.auth import PinSessionCache, TokenCache
+from app.services.background import ServiceExecutor
+from app.services.database import tune_postgrest_session
+from app.services.aggregation import SalesAggregator
+from app.services.catalog import ProductCatalog
+from app.services.journal import OrderJournal, JournalSyncWorker
+from app.services.rollups import RollupService, build_rollups
+from app.services.search import ProductIndex
+from app.config import Config
 from app.models import Product, Order, Employee, Customer
 
 @pytest.fixture
@@ -11,6 +25,11 @@ def mock_db():
     with patch('app.services.database.create_client') as mock_client:
         mock_db = DatabaseService()
         mock_db.client = MagicMock()
+        mock_db.catalog.clear()
+        mock_db.customers.clear()
+        ReportingService.cache.clear()
+        AuthService.sessions.clear()
+        AuthService.tokens.clear()
         yield mock_db
 
 @pytest.fixture
@@ -38,10 +57,52 @@ def sample_employee():
         role="manager"
     )
 
+class FakeOrdersClient:
+    # Just enough of the PostgREST query builder to exercise keyset pagination
+    def __init__(self, rows):
+        self.rows = rows
+
+    def table(self, name):
+        return FakeOrdersQuery(self.rows)
+
+class FakeOrdersQuery:
+    def __init__(self, rows):
+        self.rows = sorted(rows, key=lambda row: (row['created_at'], row['id']))
+        self.size = None
+
+    def _where(self, column, test):
+        self.rows = [row for row in self.rows if test(row[column])]
+        return self
+
+    def select(self, columns):
+        return self
+
+    def eq(self, column, value):
+        return self._where(column, lambda v: v == value)
+
+    def gt(self, column, value):
+        return self._where(column, lambda v: v > value)
+
+    def gte(self, column, value):
+        return self._where(column, lambda v: v >= value)
+
+    def lte(self, column, value):
+        return self._where(column, lambda v: v <= value)
+
+    def order(self, columns):
+        return self
+
+    def limit(self, size):
+        self.size = size
+        return self
+
+    def execute(self):
+        return MagicMock(data=self.rows[:self.size])
+
 class TestDatabaseService:
     def test_get_product(self, mock_db, sample_product):
         # Mock the Supabase response
-        mock_db.client.table().select().eq().execute.return_value.data = [{
+        mock_db.client.table().select().in_().execute.return_value.data = [{
             'id': sample_product.id,
             'name': sample_product.name,
             'category': sample_product.category,
@@ -52,7 +113,7 @@ class TestDatabaseService:
         result = mock_db.get_product(sample_product.id)
         assert result['id'] == sample_product.id
         assert result['name'] == sample_product.name
-        mock_db.client.table().select().eq().execute.assert_called_once()
+        mock_db.client.table().select().in_().execute.assert_called_once()
 
     def test_create_order(self, mock_db, sample_order):
         mock_db.client.table().insert().execute.return_value.data = [{
@@ -66,6 +127,203 @@ class TestDatabaseService:
         assert result['id'] == 'order_123'
         mock_db.client.table().insert().execute.assert_called_once()
 
+    def test_catalog_serves_line_items_from_memory(self, mock_db, sample_product):
+        mock_db.client.table().select().execute.return_value.data = [{
+            'id': sample_product.id,
+            'name': sample_product.name,
+            'category': sample_product.category,
+            'price': sample_product.price,
+            'cost': sample_product.cost,
+            'updated_at': '2024-01-01T08:00:00'
+        }]
+        assert mock_db.load_catalog() is True
+        
+        hits_before = mock_db.catalog.stats()['hits']
+        mock_db.client.table().select().eq().execute.reset_mock()
+        for _ in range(6):
+            assert mock_db.get_product(sample_product.id)['name'] == sample_product.name
+        
+        mock_db.client.table().select().eq().execute.assert_not_called()
+        assert mock_db.catalog.stats()['hits'] - hits_before == 6
+        assert mock_db.catalog.version == '2024-01-01T08:00:00'
+        assert [p['id'] for p in mock_db.get_products_by_category('Coffee')] == [sample_product.id]
+
+    def test_catalog_refresh_merges_newer_rows(self, mock_db, sample_product):
+        mock_db.catalog.load([{'id': sample_product.id, 'name': 'Espresso', 'updated_at': '2024-01-01T08:00:00'}])
+        mock_db.client.table().select().gt().execute.return_value.data = [
+            {'id': sample_product.id, 'name': 'Double Espresso', 'updated_at': '2024-01-02T08:00:00'}
+        ]
+        
+        assert mock_db.refresh_catalog() is True
+        mock_db.client.table().select().gt.assert_called_with('updated_at', '2024-01-01T08:00:00')
+        assert mock_db.get_product(sample_product.id)['name'] == 'Double Espresso'
+        assert mock_db.catalog.version == '2024-01-02T08:00:00'
+
+    def test_category_listing_loads_catalog_once(self, mock_db):
+        mock_db.client.table().select().execute.return_value.data = [
+            {'id': 'b', 'name': 'Muffin', 'category': 'Bakery'},
+            {'id': 'c', 'name': 'Latte', 'category': 'Coffee'},
+            {'id': 'a', 'name': 'Espresso', 'category': 'Coffee'},
+            {'id': 'd', 'name': 'Mocha', 'category': 'Coffee', 'is_active': False}
+        ]
+        mock_db.client.table().select().execute.reset_mock()
+        
+        listing = mock_db.get_category_listing()
+        assert list(listing) == ['Bakery', 'Coffee']
+        assert [p['name'] for p in listing['Coffee']] == ['Espresso', 'Latte']
+        
+        assert mock_db.get_category_listing() == listing
+        mock_db.client.table().select().execute.assert_called_once()
+        
+        # The grid's periodic reload pulls in price edits and deactivations
+        mock_db.catalog.version = '2024-01-01T00:00:00+00:00'
+        mock_db.client.table().select().gt().execute.return_value.data = [
+            {'id': 'c', 'name': 'Latte', 'category': 'Coffee', 'price': 4.75, 'updated_at': '2024-01-02T00:00:00+00:00'},
+            {'id': 'a', 'name': 'Espresso', 'category': 'Coffee', 'is_active': False, 'updated_at': '2024-01-02T00:00:00+00:00'}
+        ]
+        listing = mock_db.get_category_listing(refresh=True)
+        assert [(p['name'], p.get('price')) for p in listing['Coffee']] == [('Latte', 4.75)]
+
+    def test_category_listing_without_full_catalog_queries_active_products(self, mock_db):
+        mock_db.catalog.load([{'id': 'a', 'category': 'Tea'}])
+        mock_db.catalog.complete = False
+        mock_db.client.table().select().eq().execute.return_value.data = [
+            {'id': 'a', 'name': 'Chai', 'category': 'Tea'}
+        ]
+        
+        assert list(mock_db.get_category_listing()) == ['Tea']
+        mock_db.client.table().select().eq.assert_called_with('is_active', True)
+
+    def test_customer_lookup_uses_e164_and_caches(self, mock_db):
+        customer = {'id': 'cust_123', 'name': 'Ana', 'phone': '+15551234567', 'points': 12}
+        mock_db.client.table().select().eq().execute.return_value.data = [customer]
+        mock_db.client.table().select().eq.reset_mock()
+        
+        assert mock_db.get_customer_by_phone("(555) 123-4567") == customer
+        mock_db.client.table().select().eq.assert_called_once_with('phone', '+15551234567')
+        assert mock_db.get_customer_by_phone("555.123.4567") == customer
+        assert mock_db.get_customer('cust_123') == customer
+        mock_db.client.table().select().eq.assert_called_once()
+        
+        mock_db.forget_customers(['cust_123'])
+        assert len(mock_db.customers) == 0
+        assert mock_db.get_customer_by_phone("123") is None
+
+    def test_cached_customers_expire(self, mock_db):
+        customer = {'id': 'cust_123', 'name': 'Ana', 'phone': '+15551234567', 'points': 12}
+        mock_db.client.table().select().eq().execute.return_value.data = [customer]
+        mock_db.get_customer('cust_123')
+        assert ('id', 'cust_123') in mock_db.customers
+        
+        with patch('app.utils.cache.time.monotonic', return_value=time.monotonic() + Config.CUSTOMER_CACHE_SECONDS + 1):
+            assert ('id', 'cust_123') not in mock_db.customers
+            assert ('phone', '+15551234567') not in mock_db.customers
+
+    def test_postgrest_session_uses_tuned_pool(self):
+        postgrest = SyncPostgrestClient("http://localhost:54321/rest/v1", headers={'apiKey': 'key'})
+        assert tune_postgrest_session(postgrest) is True
+        
+        session = postgrest.session
+        assert session.timeout.read == Config.HTTP_READ_TIMEOUT
+        assert session.timeout.pool == Config.HTTP_POOL_TIMEOUT
+        assert session.headers['apikey'] == 'key'
+        assert postgrest.from_('products').session is session
+        assert tune_postgrest_session(MagicMock()) is False
+
+    def test_warm_up_failure_is_not_fatal(self, mock_db):
+        assert mock_db.warm_up() is True
+        mock_db.client.table().select().limit().execute.side_effect = Exception("offline")
+        assert mock_db.warm_up() is False
+
+    def test_catalog_eviction_disables_category_listing(self):
+        catalog = ProductCatalog(max_size=2)
+        catalog.load([{'id': 'a', 'category': 'Tea'}, {'id': 'b', 'category': 'Tea'}])
+        assert len(catalog.by_category('Tea')) == 2
+        
+        catalog.put({'id': 'c', 'category': 'Tea'})
+        assert catalog.get('a') is None
+        assert catalog.by_category('Tea') is None
+        assert catalog.stats()['evictions'] == 1
+
+    def test_loader_coalesces_lookups_in_one_tick(self, mock_db):
+        scheduled = []
+        mock_db.product_loader.set_scheduler(scheduled.append)
+        mock_db.client.table().select().in_().execute.return_value.data = [
+            {'id': 'prod_1', 'name': 'Latte'},
+            {'id': 'prod_2', 'name': 'Mocha'}
+        ]
+        mock_db.client.table().select().in_.reset_mock()
+        
+        try:
+            futures = [mock_db.product_loader.load(pid) for pid in ('prod_1', 'prod_2', 'prod_1', 'prod_3')]
+            assert len(scheduled) == 1
+            scheduled[0]()
+        finally:
+            mock_db.product_loader.set_scheduler(None)
+        
+        mock_db.client.table().select().in_.assert_called_once_with('id', ['prod_1', 'prod_2', 'prod_3'])
+        assert [f.result() and f.result()['name'] for f in futures] == ['Latte', 'Mocha', 'Latte', None]
+        
+        # Cold lookups are now cached
+        assert mock_db.get_products_by_ids(['prod_1', 'prod_2'])['prod_2']['name'] == 'Mocha'
+        mock_db.client.table().select().in_.assert_called_once()
+
+    def test_commit_order_is_one_idempotent_request(self, mock_db, sample_order):
+        mock_db.client.rpc().execute.return_value.data = [{'idempotency_key': 'key_1', 'order_id': 'order_123'}]
+        mock_db.client.rpc.reset_mock()
+        
+        items = sample_order.to_dict()['items']
+        result = mock_db.commit_order({'total_amount': sample_order.total}, items,
+                                      loyalty_points=7, idempotency_key='key_1')
+        
+        assert result['order_id'] == 'order_123'
+        mock_db.client.rpc.assert_called_once_with('commit_orders', {'commits': [{
+            'idempotency_key': 'key_1',
+            'order': {'total_amount': sample_order.total},
+            'items': items,
+            'loyalty_points': 7
+        }]})
+
+class TestProductIndex:
+    def test_every_word_matches_a_name_prefix(self):
+        index = ProductIndex()
+        for product_id, name in [('a', 'Iced Latte'), ('b', 'Latte'), ('c', 'Iced Tea'), ('d', 'Lavender Latte')]:
+            index.add({'id': product_id, 'name': name})
+        
+        assert index.search('lat') == ['a', 'b', 'd']
+        assert index.search('ice LAT') == ['a']
+        assert index.search('lat', limit=1) == ['a']
+        assert index.search('mocha') == []
+        assert index.search('  ') == []
+
+    def test_catalog_changes_update_the_index(self, mock_db):
+        mock_db.catalog.load([
+            {'id': 'a', 'name': 'Latte', 'plu': '101', 'barcode': '0123456789012'},
+            {'id': 'b', 'name': 'Mocha', 'plu': '102'}
+        ])
+        assert mock_db.find_product_by_code('0123456789012')['id'] == 'a'
+        assert mock_db.find_product_by_code(' 102 ')['id'] == 'b'
+        
+        mock_db.catalog.merge([
+            {'id': 'a', 'name': 'Oat Latte', 'plu': '103'},
+            {'id': 'b', 'name': 'Mocha', 'plu': '102', 'is_active': False}
+        ])
+        assert [p['name'] for p in mock_db.search_products('oat')] == ['Oat Latte']
+        assert mock_db.search_products('mo') == []
+        assert mock_db.find_product_by_code('101') is None
+        assert mock_db.find_product_by_code('103')['id'] == 'a'
+        mock_db.client.table().select().eq.assert_not_called()
+
+    def test_removing_words_with_shared_prefixes(self):
+        index = ProductIndex()
+        index.add({'id': 'a', 'name': 'Lat Latte'})
+        index.add({'id': 'b', 'name': 'Lattice'})
+        index.remove('a')
+        
+        assert index.search('lat') == ['b']
+        index.remove('b')
+        assert index.search('l') == [] and len(index) == 0
+
 class TestAuthService:
     def test_authenticate_employee_success(self, mock_db, sample_employee):
         auth = AuthService()
@@ -96,6 +354,74 @@ class TestAuthService:
         result = auth.authenticate_employee("wrong@email.com", "wrongpass")
         assert result is None
 
+    def test_switch_by_pin_after_password_login(self, mock_db, sample_employee):
+        auth = AuthService()
+        auth.db = mock_db
+        mock_db.client.table().select().eq().execute.return_value.data = [{
+            'id': sample_employee.id,
+            'name': sample_employee.name,
+            'role': sample_employee.role,
+            'password_hash': 'hashed_password',
+            'pin_code': '4321'
+        }]
+        assert auth.switch_employee(sample_employee.id, '4321') is None  # no password login yet
+        
+        with patch('passlib.hash.pbkdf2_sha256.verify', return_value=True):
+            assert auth.authenticate_employee(sample_employee.email, "password")
+        mock_db.client.table.reset_mock()
+        
+        with patch('passlib.hash.pbkdf2_sha256.verify') as verify:
+            result = auth.switch_employee(sample_employee.id, '4321')
+        verify.assert_not_called()
+        mock_db.client.table.assert_not_called()
+        assert result['employee']['name'] == sample_employee.name
+        assert 'pin_code' not in result['employee'] and 'password_hash' not in result['employee']
+        assert auth.verify_token(result['token'])['sub'] == sample_employee.id
+
+    def test_repeated_wrong_pins_require_the_password(self):
+        sessions = PinSessionCache(ttl=60, max_attempts=3, attempt_window=60)
+        sessions.remember({'id': 'emp_1', 'name': 'Ana', 'pin_code': '1111'})
+        
+        assert sessions.verify('emp_1', '0000') is None
+        assert sessions.verify('emp_1', '1111')['name'] == 'Ana'  # a success resets the count
+        for _ in range(3):
+            assert sessions.verify('emp_1', '0000') is None
+        assert sessions.verify('emp_1', '1111') is None
+        assert sessions.employees() == []
+
+    def test_verified_tokens_are_cached_until_revoked(self, mock_db, sample_employee):
+        auth = AuthService()
+        token = auth._issue_token({'id': sample_employee.id, 'name': sample_employee.name, 'role': 'manager'})
+        
+        with patch('jwt.decode', wraps=jwt.decode) as decode:
+            for _ in range(5):
+                assert auth.verify_token(token)['role'] == 'manager'
+        assert decode.call_count == 1
+        stats = AuthService.tokens.stats()
+        assert (stats['decodes'], stats['hits']) == (1, 4)
+        assert stats['saved_seconds'] > 0
+        
+        # Each caller gets its own copy of the cached payload
+        auth.verify_token(token)['role'] = 'admin'
+        assert auth.verify_token(token)['role'] == 'manager'
+        
+        assert auth.revoke_token(token) is True
+        assert auth.verify_token(token) is None
+        assert AuthService.tokens.stats()['denied'] == 1
+        assert auth.verify_token("not-a-token") is None
+
+    def test_token_cache_respects_exp(self):
+        tokens = TokenCache()
+        tokens.put(b'old', {'sub': 'emp_1', 'exp': time.time() - 1})
+        tokens.put(b'new', {'sub': 'emp_1', 'exp': time.time() + 60})
+        assert tokens.get(b'old') is None
+        assert tokens.get(b'new')['sub'] == 'emp_1'
+
+    def test_pin_sessions_expire(self):
+        sessions = PinSessionCache(ttl=0)
+        sessions.remember({'id': 'emp_1', 'name': 'Ana', 'pin_code': '1111'})
+        assert sessions.verify('emp_1', '1111') is None
+
 class TestInventoryService:
     def test_get_stock_level(self, mock_db):
         inventory = InventoryService()
@@ -122,6 +448,58 @@ class TestInventoryService:
         assert inventory.update_stock("prod_123", -2) is True
         assert inventory.update_stock("prod_123", -15) is False  # Would go negative
 
+    def test_get_all_stock_is_one_query(self, mock_db):
+        inventory = InventoryService()
+        inventory.db = mock_db
+        
+        mock_db.client.table().select().execute.return_value.data = [
+            {'id': 'prod_1', 'name': 'Vanilla Syrup', 'category': 'Syrups', 'inventory': [{'quantity': 3}]},
+            {'id': 'prod_2', 'name': 'House Beans', 'category': 'Beans', 'inventory': {'quantity': 40}},
+            {'id': 'prod_3', 'name': 'Caramel Syrup', 'category': 'Syrups', 'inventory': []}
+        ]
+        
+        rows = inventory.get_all_stock()
+        assert [r['quantity'] for r in rows] == [3, 40, 0]
+        mock_db.client.table().select().execute.assert_called_once()
+        
+        index = inventory.stock_index
+        assert index.categories() == ['Beans', 'Syrups']
+        assert [r['name'] for r in index.query(category='Syrups')] == ['Caramel Syrup', 'Vanilla Syrup']
+        assert [r['product_id'] for r in index.query(low_stock_threshold=5, sort_by='quantity')] == ['prod_3', 'prod_1']
+        assert index.query(sort_by='quantity', descending=True)[0]['product_id'] == 'prod_2'
+
+    def test_apply_order_is_one_atomic_call(self, mock_db):
+        inventory = InventoryService()
+        inventory.db = mock_db
+        inventory.stock_index.load([{'product_id': 'prod_123', 'name': 'Espresso', 'category': 'Coffee', 'quantity': 10}])
+        
+        mock_db.client.rpc().execute.return_value.data = [{'order_id': 'order_1', 'items': [
+            {'product_id': 'prod_123', 'applied': True, 'quantity': 8},
+            {'product_id': 'prod_456', 'applied': False, 'quantity': 0}
+        ]}]
+        
+        results = inventory.apply_order([
+            {'product_id': 'prod_123', 'quantity': 2, 'unit_price': 3.50},
+            {'product_id': 'prod_456', 'quantity': 1, 'unit_price': 4.00}
+        ], order_id='order_1')
+        
+        mock_db.client.rpc.assert_called_with('apply_stock_orders', {'orders': [{'order_id': 'order_1', 'items': [
+            {'product_id': 'prod_123', 'quantity': 2},
+            {'product_id': 'prod_456', 'quantity': 1}
+        ]}]})
+        assert [r['applied'] for r in results] == [True, False]
+        assert inventory.stock_index.get('prod_123')['quantity'] == 8
+
+    def test_apply_orders_malformed_response_is_a_failure(self, mock_db):
+        inventory = InventoryService()
+        inventory.db = mock_db
+        orders = [{'order_id': 'order_1', 'items': [{'product_id': 'prod_123', 'quantity': 1}]}]
+        
+        mock_db.client.rpc().execute.return_value.data = None
+        assert inventory.apply_orders(orders) is None
+        mock_db.client.rpc().execute.return_value.data = [{'order_id': 'order_1'}]
+        assert inventory.apply_orders(orders) is None
+
 class TestReportingService:
     def test_get_sales_report(self, mock_db):
         reporting = ReportingService()
@@ -138,7 +516,7 @@ class TestReportingService:
             }]
         }]
         
-        mock_db.client.table().select().gte().lte().execute.return_value.data = test_data
+        mock_db.client.table().select().gte().lte().order().limit().execute.return_value.data = test_data
         
         start_date = datetime.now() - timedelta(days=7)
         end_date = datetime.now()
@@ -147,42 +525,377 @@ class TestReportingService:
         assert len(result) == 1
         assert result[0]['total_amount'] == 10.50
 
+    def test_iter_sales_pages_by_keyset(self, mock_db):
+        reporting = ReportingService()
+        reporting.db = mock_db
+        orders = [{'id': f"o{i}", 'created_at': f"2024-01-01T08:0{i // 4}:00+00:00", 'total_amount': 1.0}
+                  for i in range(9)]
+        mock_db.client = FakeOrdersClient(orders)
+        
+        pages = list(reporting.iter_sales(datetime(2024, 1, 1), datetime(2024, 1, 2), page_size=3))
+        assert [order['id'] for page in pages for order in page] == [order['id'] for order in orders]
+        assert max(len(page) for page in pages) <= 3
+        
+        # More orders share one timestamp than fit in a page
+        pages = list(reporting.iter_sales(datetime(2024, 1, 1), datetime(2024, 1, 2), page_size=2))
+        assert [order['id'] for page in pages for order in page] == [order['id'] for order in orders]
+
+    def test_get_sales_summary(self, mock_db):
+        reporting = ReportingService()
+        reporting.db = mock_db
+        
+        mock_db.client.table().select().gte().lte().order().limit().execute.return_value.data = [
+            {'id': 'o1', 'created_at': '2024-01-01T08:15:00+00:00', 'total_amount': 10.0, 'order_items': [
+                {'product_id': 'p1', 'quantity': 2, 'unit_price': 3.5, 'products': {'name': 'Espresso', 'category': 'Coffee'}},
+                {'product_id': 'p2', 'quantity': 1, 'unit_price': 3.0, 'products': {'name': 'Muffin', 'category': 'Bakery'}}
+            ]},
+            {'id': 'o2', 'created_at': '2024-01-01T08:45:00.5+00:00', 'total_amount': 4.0, 'order_items': [
+                {'product_id': 'p1', 'quantity': 1, 'unit_price': 3.5, 'products': {'name': 'Espresso', 'category': 'Coffee'}}
+            ]},
+            {'id': 'o3', 'created_at': '2024-01-03T14:00:00+00:00', 'total_amount': 6.0, 'order_items': []}
+        ]
+        
+        summary = reporting.get_sales_summary(datetime(2024, 1, 1), datetime(2024, 1, 3))
+        mock_db.client.table().select.assert_called_with(
+            'id, created_at, total_amount, order_items(product_id, quantity, unit_price, products(name, category))')
+        
+        assert summary.daily['orders'].tolist() == [2, 0, 1]
+        assert summary.daily['revenue'].tolist() == [14.0, 0.0, 6.0]
+        assert summary.hourly.loc[8, 'orders'] == 2
+        assert summary.hourly.loc[14, 'revenue'] == 6.0
+        assert summary.by_category.loc['Coffee', 'revenue'] == pytest.approx(10.5)
+        assert summary.top_products(1) == [{'product_id': 'p1', 'name': 'Espresso', 'total_quantity': 3, 'total_revenue': 10.5}]
+
+    def test_aggregator_result_does_not_depend_on_paging(self):
+        orders = [{'id': f"o{i}", 'created_at': f"2024-01-0{1 + i % 3}T{i % 24:02d}:00:00", 'total_amount': 1.0 + i,
+                   'order_items': [{'product_id': f"p{i % 4}", 'quantity': 1, 'unit_price': 1.0 + i}]}
+                  for i in range(50)]
+        whole = SalesAggregator('UTC')
+        whole.add_orders(orders)
+        paged = SalesAggregator('UTC', fold_size=7)
+        for offset in range(0, len(orders), 3):
+            paged.add_orders(orders[offset:offset + 3])
+        
+        expected, actual = whole.summary(), paged.summary()
+        assert actual.daily.equals(expected.daily)
+        assert actual.hourly.equals(expected.hourly)
+        assert actual.by_product.sort_index().equals(expected.by_product.sort_index())
+        assert actual.daily['orders'].tolist() == [17, 17, 16]
+
+    def test_aggregator_buckets_in_store_time(self):
+        # Checkout stamps UTC; 21:30 and 23:45 in New York fall on the next UTC day
+        store = ZoneInfo('America/New_York')
+        orders = [{'id': f"o{i}", 'created_at': datetime(2024, 1, 1, hour, minute, tzinfo=store).astimezone(timezone.utc).isoformat(),
+                   'total_amount': 5.0, 'order_items': []}
+                  for i, (hour, minute) in enumerate([(9, 0), (21, 30), (23, 45)])]
+        aggregator = SalesAggregator('America/New_York')
+        aggregator.add_orders(orders)
+        
+        summary = aggregator.summary(datetime(2024, 1, 1, tzinfo=store), datetime(2024, 1, 1, 23, 59, tzinfo=store))
+        assert summary.daily.index.strftime('%Y-%m-%d').tolist() == ['2024-01-01']
+        assert summary.daily['orders'].tolist() == [3]
+        assert summary.hourly.loc[[9, 21, 23], 'orders'].tolist() == [1, 1, 1]
+        assert summary.hourly.loc[[2, 4], 'orders'].tolist() == [0, 0]
+
+    def test_report_cache_serves_stale_while_refreshing(self, mock_db):
+        reporting = ReportingService()
+        reporting.db = mock_db
+        mock_db.client.rpc().execute.return_value.data = [{'name': 'Latte', 'total_quantity': 3}]
+        
+        assert reporting.get_top_products(5) == [{'name': 'Latte', 'total_quantity': 3}]
+        assert reporting.get_top_products(5) == [{'name': 'Latte', 'total_quantity': 3}]
+        assert len([c for c in mock_db.client.rpc.call_args_list if c.args]) == 1
+        
+        mock_db.client.rpc().execute.return_value.data = [{'name': 'Latte', 'total_quantity': 4}]
+        ReportingService.cache.invalidate_orders(['2024-01-02T09:00:00+00:00'])
+        assert reporting.get_top_products(5)[0]['total_quantity'] == 3  # stale, refresh started
+        for _ in range(50):
+            if not ReportingService.cache.get(('top_products', 5)).stale:
+                break
+            threading.Event().wait(0.01)
+        assert reporting.get_top_products(5)[0]['total_quantity'] == 4
+
+    def test_report_cache_invalidates_only_matching_windows(self, mock_db):
+        reporting = ReportingService()
+        reporting.db = mock_db
+        mock_db.client.table().select().gte().lte().order().limit().execute.return_value.data = []
+        start, end = datetime(2024, 1, 1), datetime(2024, 1, 3)
+        reporting.get_sales_report(start, end)
+        
+        ReportingService.cache.invalidate_orders(['2024-01-05T09:00:00+00:00'])
+        assert not ReportingService.cache.get(('sales_report', start, end)).stale
+        ReportingService.cache.invalidate_orders(['2024-01-02T09:00:00'])
+        assert ReportingService.cache.get(('sales_report', start, end)).stale
+
+class TestRollupService:
+    def test_build_rollups_buckets_by_hour_and_day(self):
+        hours, products = build_rollups([
+            {'id': 'o1', 'created_at': '2024-01-01T08:15:00+00:00', 'total_amount': 10.0, 'order_items': [
+                {'product_id': 'p1', 'quantity': 2, 'unit_price': 3.5}]},
+            {'id': 'o2', 'created_at': '2024-01-01T08:59:59', 'total_amount': 4.0, 'order_items': [
+                {'product_id': 'p1', 'quantity': 1, 'unit_price': 3.5}]},
+            {'id': 'o3', 'created_at': '2024-01-01T23:30:00+00:00', 'total_amount': 6.0, 'order_items': []}
+        ], 'America/New_York')
+        
+        assert hours == [
+            {'bucket': '2024-01-01T08:00:00+00:00', 'order_count': 2, 'revenue': 14.0},
+            {'bucket': '2024-01-01T23:00:00+00:00', 'order_count': 1, 'revenue': 6.0}
+        ]
+        assert products == [{'day': '2024-01-01', 'product_id': 'p1', 'quantity': 3, 'revenue': 10.5}]
+
+    def test_record_orders_is_one_call_keyed_by_order(self, mock_db):
+        rollups = RollupService()
+        rollups.db = mock_db
+        
+        assert rollups.record_orders([
+            {'id': 'o1', 'created_at': '2024-01-01T08:15:00+00:00', 'total_amount': 7.0,
+             'order_items': [{'product_id': 'p1', 'quantity': 2, 'unit_price': 3.5}]}
+        ]) is True
+        name, params = mock_db.client.rpc.call_args.args
+        assert name == 'record_sales_rollups'
+        assert params['orders'] == [{
+            'order_id': 'o1',
+            'bucket': '2024-01-01T08:00:00+00:00',
+            'revenue': 7.0,
+            'products': [{'day': '2024-01-01', 'product_id': 'p1', 'quantity': 2, 'revenue': 7.0}]
+        }]
+
+    def test_rebuild_replaces_whole_days(self, mock_db):
+        rollups = RollupService()
+        rollups.db = mock_db
+        mock_db.client.table().select().gte().lte().order().limit().execute.return_value.data = [
+            {'id': 'o1', 'created_at': '2024-01-02T09:00:00+00:00', 'total_amount': 5.0, 'order_items': []}
+        ]
+        
+        assert rollups.rebuild(datetime(2024, 1, 2, 13, 30), datetime(2024, 1, 2, 14, 0)) is True
+        mock_db.client.table().select().gte.assert_called_with('created_at', '2024-01-02T00:00:00+00:00')
+        mock_db.client.table().select().gte().lte.assert_called_with('created_at', '2024-01-02T23:59:59.999999+00:00')
+        name, params = mock_db.client.rpc.call_args.args
+        assert name == 'replace_sales_rollups'
+        assert params['first_day'] == params['last_day'] == '2024-01-02'
+        assert params['order_ids'] == ['o1']
+        assert params['hours'] == [{'bucket': '2024-01-02T09:00:00+00:00', 'order_count': 1, 'revenue': 5.0}]
+
+    def test_reports_read_rollups(self, mock_db):
+        reporting = ReportingService()
+        reporting.db = mock_db
+        reporting.rollups.db = mock_db
+        mock_db.client.table().select().gte().lte().execute.return_value.data = [
+            {'bucket': '2024-01-01T08:00:00+00:00', 'order_count': 2, 'revenue': 14.0,
+             'day': '2024-01-01', 'product_id': 'p1', 'quantity': 3},
+            {'bucket': '2024-01-02T08:00:00+00:00', 'order_count': 1, 'revenue': 6.0,
+             'day': '2024-01-02', 'product_id': 'p1', 'quantity': 1}
+        ]
+        mock_db.client.table().select().in_().execute.return_value.data = [
+            {'id': 'p1', 'name': 'Espresso', 'category': 'Coffee', 'price': 3.5}
+        ]
+        
+        summary = reporting.get_rollup_summary(datetime(2024, 1, 1), datetime(2024, 1, 2, 23))
+        assert summary.daily['orders'].tolist() == [2, 1]
+        assert summary.hourly.loc[8, 'revenue'] == 20.0
+        assert summary.top_products(1) == [{'product_id': 'p1', 'name': 'Espresso', 'total_quantity': 4, 'total_revenue': 20.0}]
+        
+        hourly = reporting.get_hourly_sales(days=7)
+        assert len(hourly) == 24
+        assert hourly[8] == {'hour': 8, 'orders': 3, 'total_sales': 20.0}
+
+    def test_failed_rollup_query_is_never_cached(self, mock_db):
+        reporting = ReportingService()
+        reporting.db = mock_db
+        reporting.rollups.db = mock_db
+        rows = [{'bucket': '2024-01-01T08:00:00+00:00', 'order_count': 2, 'revenue': 14.0,
+                 'day': '2024-01-01', 'product_id': 'p1', 'quantity': 3}]
+        mock_db.client.table().select().in_().execute.return_value.data = [{'id': 'p1', 'name': 'Espresso'}]
+        query = mock_db.client.table().select().gte().lte().execute
+        query.side_effect = Exception("offline")
+        
+        summary = reporting.get_period_summary(days=7)
+        assert summary.total_orders == 0
+        assert ReportingService.cache.get(('period_summary', 7)) is None
+        
+        query.side_effect, query.return_value.data = None, rows
+        assert reporting.get_period_summary(days=7).total_orders == 2
+        
+        # A failed background refresh keeps the good summary instead of replacing it with zeros
+        query.side_effect = Exception("offline")
+        ReportingService.cache.invalidate_orders([datetime.now(timezone.utc)])
+        assert reporting.get_period_summary(days=7).total_orders == 2
+        for _ in range(50):
+            if ('period_summary', 7) not in ReportingService.cache._refreshing:
+                break
+            threading.Event().wait(0.01)
+        assert ReportingService.cache.get(('period_summary', 7)).value.total_orders == 2
+
+    def test_reports_bucket_checkout_times_in_store_time(self, mock_db):
+        # Checkout stamps UTC; a 21:30 sale in New York is 02:30 UTC the next day
+        store = ZoneInfo('America/New_York')
+        created_at = datetime(2024, 1, 1, 21, 30, tzinfo=store).astimezone(timezone.utc).isoformat()
+        hours, products = build_rollups([{'id': 'o1', 'created_at': created_at, 'total_amount': 7.0,
+                                          'order_items': [{'product_id': 'p1', 'quantity': 2, 'unit_price': 3.5}]}],
+                                        'America/New_York')
+        assert hours[0]['bucket'] == '2024-01-02T02:00:00+00:00'
+        assert products[0]['day'] == '2024-01-01'
+        
+        reporting = ReportingService()
+        reporting.db = mock_db
+        reporting.rollups = RollupService('America/New_York')
+        reporting.rollups.db = mock_db
+        mock_db.client.table().select().gte().lte().execute.return_value.data = [dict(hours[0], **products[0])]
+        mock_db.client.table().select().in_().execute.return_value.data = []
+        
+        summary = reporting.get_rollup_summary(datetime(2024, 1, 1, tzinfo=store), datetime(2024, 1, 1, 23, 59, tzinfo=store))
+        assert summary.daily.index.strftime('%Y-%m-%d').tolist() == ['2024-01-01']
+        assert summary.hourly.loc[21, 'orders'] == 1
+        
+        # The rolling periods end at the store's today, not the UTC one
+        summary = reporting.get_period_summary(days=1)
+        assert summary.daily.index[-1].date() == datetime.now(store).date()
+
 class TestLoyaltyService:
-    def test_add_points(self, mock_db):
+    @pytest.fixture
+    def loyalty(self, mock_db):
         loyalty = LoyaltyService()
         loyalty.db = mock_db
-        
-        # Mock RPC call
-        mock_db.client.rpc().execute.return_value = True
+        return loyalty
+
+    def test_add_points(self, loyalty, mock_db):
+        mock_db.customers.set(('id', 'cust_123'), {'id': 'cust_123', 'points': 40})
         
         assert loyalty.add_points("cust_123", 10.50) is True
         mock_db.client.rpc.assert_called_with('increment_points', {
             'customer_id': 'cust_123',
             'points': 10  # 1 point per $1 spent
         })
+        assert ('id', 'cust_123') not in mock_db.customers
 
-    def test_redeem_points_success(self, mock_db):
-        loyalty = LoyaltyService()
-        loyalty.db = mock_db
-        
-        # Mock current points
-        mock_db.client.table().select().eq().execute.return_value.data = [{
-            'points': 100
-        }]
+    def test_points_include_checkouts_waiting_to_sync(self, loyalty, mock_db, tmp_path):
+        journal = OrderJournal(str(tmp_path / "journal.db"))
+        loyalty.journal = journal
+        journal.append({'total_amount': 12.96, 'customer_id': 'cust_123'}, [],
+                       {'customer_id': 'cust_123', 'amount_spent': 12.00})
+        journal.append({'total_amount': 5.40, 'customer_id': 'cust_456'}, [],
+                       {'customer_id': 'cust_456', 'amount_spent': 5.00})
+        mock_db.client.table().select().eq().execute.return_value.data = [{'points': 40}]
         
-        # Mock RPC call
-        mock_db.client.rpc().execute.return_value = True
+        assert loyalty.get_customer_points("cust_123") == 52
+        journal.mark_synced([entry['journal_id'] for entry in journal.due(10)])
+        assert loyalty.get_customer_points("cust_123") == 40  # now part of the server balance
+        journal.close()
+
+    def test_redeem_points_success(self, loyalty, mock_db):
+        # The server decrements atomically and returns the remaining balance
+        mock_db.client.rpc().execute.return_value.data = 80
         
+        mock_db.customers.set(('id', 'cust_123'), {'id': 'cust_123', 'points': 100})
         discount = loyalty.redeem_points("cust_123", 20)
         assert discount == 1.00  # 20 points * $0.05 per point
+        assert ('id', 'cust_123') not in mock_db.customers  # the next lookup sees the new balance
+        mock_db.client.rpc.assert_called_with('redeem_points', {'customer_id': 'cust_123', 'points': 20})
 
-    def test_redeem_points_failure(self, mock_db):
-        loyalty = LoyaltyService()
-        loyalty.db = mock_db
+    def test_redeem_points_failure(self, loyalty, mock_db):
+        # Insufficient points: the server refuses and returns null
+        mock_db.client.rpc().execute.return_value.data = None
         
-        # Mock insufficient points
-        mock_db.client.table().select().eq().execute.return_value.data = [{
-            'points': 10
-        }]
+        assert loyalty.redeem_points("cust_123", 20) is None
+
+class TestOrderJournal:
+    @pytest.fixture
+    def journal(self, tmp_path):
+        journal = OrderJournal(str(tmp_path / "journal.db"))
+        yield journal
+        journal.close()
+
+    def test_append_is_local_and_tracks_lag(self, journal):
+        order_id = journal.append({'total_amount': 7.56}, [{'product_id': 'prod_123', 'quantity': 2, 'unit_price': 3.50}])
+        
+        assert journal.queue_depth() == 1
+        assert journal.sync_lag() >= 0
+        entry = journal.due(10)[0]
+        assert entry['order']['id'] == order_id
+        assert entry['items'][0]['order_id'] == order_id
+        assert journal._conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+
+    def test_worker_drains_in_batches(self, journal, mock_db):
+        for _ in range(3):
+            journal.append({'total_amount': 5.0, 'customer_id': 'cust_123'},
+                           [{'product_id': 'prod_123', 'quantity': 1, 'unit_price': 5.0}],
+                           {'customer_id': 'cust_123', 'amount_spent': 5.0})
+        mock_db.client.rpc().execute.return_value.data = []
+        worker = JournalSyncWorker(journal, mock_db, batch_size=2)
+        
+        assert worker.sync_once() == 2
+        assert worker.sync_once() == 1
+        assert journal.queue_depth() == 0
+        assert journal.sync_lag() == 0
+        calls = [c.args for c in mock_db.client.rpc.call_args_list if c.args]
+        assert [name for name, _ in calls] == ['commit_orders', 'apply_stock_orders', 'record_sales_rollups'] * 2
+        commits = calls[-3][1]['commits']
+        assert commits[0]['loyalty_points'] == 5
+        assert commits[0]['idempotency_key'] == commits[0]['order']['id']
+
+    def test_worker_backs_off_on_failure(self, journal, mock_db):
+        journal.append({'total_amount': 5.0}, [])
+        mock_db.client.rpc().execute.side_effect = Exception("offline")
+        mock_db.client.table().select().limit().execute.side_effect = Exception("offline")
+        worker = JournalSyncWorker(journal, mock_db, interval=1)
+        
+        assert worker.sync_once() == 0
+        assert journal.queue_depth() == 1
+        assert journal.due(10) == []  # not retried before the backoff expires
+        assert journal.stats()['failing'] == 1
+        assert journal._conn.execute("SELECT rejections FROM order_journal").fetchone()[0] == 0  # offline, not rejected
+
+    def test_rejected_order_does_not_hold_back_its_batch(self, tmp_path, mock_db):
+        journal = OrderJournal(str(tmp_path / "journal.db"), max_rejections=2)
+        order_ids = [journal.append({'total_amount': 5.0}, []) for _ in range(5)]
+        bad = order_ids[1]
+        
+        def rpc(name, params):
+            call = MagicMock()
+            call.execute.return_value.data = []
+            if name == 'commit_orders' and any(c['idempotency_key'] == bad for c in params['commits']):
+                call.execute.side_effect = Exception("violates check constraint")
+            return call
+        mock_db.client.rpc.side_effect = rpc
+        worker = JournalSyncWorker(journal, mock_db, interval=0)
+        
+        assert worker.sync_once() == 4
+        assert journal.queue_depth() == 1
+        assert journal.stats()['failing'] == 1
+        
+        # Rejected again once its backoff is up: quarantined, out of the queue for good
+        assert worker.sync_once() == 0
+        assert journal.queue_depth() == 0
+        assert journal.stats()['quarantined'] == 1
+        assert journal.due(10) == []
+        
+        assert journal.requeue_quarantined() == 1
+        assert [entry['journal_id'] for entry in journal.due(10)] == [bad]
+        journal.close()
+
+
+class TestServiceExecutor:
+    def test_nonblocking_results_are_delivered_on_drain(self, mock_db):
+        mock_db.client.table().select().eq().execute.return_value.data = [{'id': 'cust_123', 'name': 'Ana'}]
+        received = []
+        
+        future = mock_db.nonblocking.get_customer_by_phone("5551234567", on_done=received.append)
+        future.result(timeout=5)
+        assert received == []  # callbacks wait for the Tk thread to drain
+        
+        ServiceExecutor().drain()
+        assert received == [{'id': 'cust_123', 'name': 'Ana'}]
+
+    def test_newer_request_supersedes_stale_one(self):
+        executor = ServiceExecutor()
+        release = threading.Event()
+        received = []
+        
+        stale = executor.submit(lambda: release.wait(5) and "7d", on_done=received.append, key="report")
+        fresh = executor.submit(lambda: "30d", on_done=received.append, key="report")
+        release.set()
+        fresh.result(timeout=5)
+        stale.result(timeout=5)
         
-        assert loyalty.redeem_points("cust_123", 20) is None
\ No newline at end of file
+        executor.drain()
+        assert received == ["30d"]
@@ -0,0 +1,174 @@
+# Tests for the CoffeeCafe-POS utilities
+
+import pytest
+import threading
+from unittest.mock import MagicMock
+from app.utils.charts import ChartRenderer
+from app.utils.helpers import normalize_phone
+from app.utils.metrics import SessionMetrics
+from app.utils.print_spooler import PrintSpooler
+from app.utils.receipt_printer import ReceiptPrinter, ReceiptTemplate
+
+@pytest.fixture
+def fake_printer():
+    printer = MagicMock()
+    printer.print_receipt.return_value = True
+    return printer
+
+@pytest.fixture
+def receipt():
+    return {
+        'id': 'abc12345',
+        'created_at': '2024-01-01T08:00:00',
+        'subtotal': 7.00,
+        'tax': 0.56,
+        'total': 7.56,
+        'items': [{'product': {'name': 'Espresso'}, 'quantity': 2, 'unit_price': 3.50}]
+    }
+
+class TestNormalizePhone:
+    @pytest.mark.parametrize("typed", ["(555) 123-4567", "555.123.4567", "1 555 123 4567", "+1 555-123-4567"])
+    def test_formats_share_one_e164_form(self, typed):
+        assert normalize_phone(typed) == "+15551234567"
+
+    def test_international_and_trunk_prefixes(self):
+        assert normalize_phone("0044 7911 123456") == "+447911123456"
+        assert normalize_phone("07911 123456", country_code="44") == "+447911123456"
+
+    @pytest.mark.parametrize("typed", ["", "123-4567", "+1 555 123 4567 8901 23"])
+    def test_rejects_what_cannot_be_a_number(self, typed):
+        assert normalize_phone(typed) is None
+
+class TestReceiptTemplate:
+    def test_render_is_one_buffer(self, receipt):
+        template = ReceiptTemplate()
+        buffer = template.render(receipt, {'name': 'Ana', 'points': 12})
+        
+        assert buffer.startswith(template.header)
+        assert buffer.endswith(template.footer)
+        assert b"2x Espresso\n  $3.50 each = $7.00\n" in buffer
+        assert b"Total: $7.56\n" in buffer
+        assert b"Customer: Ana\nPoints: 12\n" in buffer
+
+    def test_print_receipt_is_a_single_write(self, receipt):
+        printer = ReceiptPrinter.__new__(ReceiptPrinter)
+        printer.template = ReceiptTemplate()
+        printer.printer = MagicMock()
+        
+        assert printer.print_receipt(receipt) is True
+        printer.printer._raw.assert_called_once_with(printer.template.render(receipt))
+
+class TestPrintSpooler:
+    def test_jobs_survive_restart(self, tmp_path, fake_printer, receipt):
+        path = str(tmp_path / "spool.db")
+        spooler = PrintSpooler(printer=fake_printer, path=path)
+        job_id = spooler.enqueue(receipt, {'name': 'Ana', 'points': 12})
+        spooler.stop()
+        
+        restarted = PrintSpooler(printer=fake_printer, path=path)
+        assert restarted.pending_count() == 1
+        assert restarted.print_job(job_id) is True
+        fake_printer.print_receipt.assert_called_once_with(receipt, {'name': 'Ana', 'points': 12})
+        assert restarted.pending_count() == 0
+        restarted.stop()
+
+    def test_failed_job_reconnects_and_retries(self, tmp_path, fake_printer, receipt):
+        fake_printer.print_receipt.return_value = False
+        spooler = PrintSpooler(printer=fake_printer, path=str(tmp_path / "spool.db"),
+                               max_attempts=2, retry_seconds=0)
+        job_id = spooler.enqueue(receipt)
+        
+        assert spooler.print_job(job_id) is False
+        fake_printer.reconnect.assert_called_once()
+        assert spooler.pending_count() == 1
+        
+        assert spooler.print_job(job_id) is False
+        assert spooler.pending_count() == 0  # gave up after max_attempts
+        spooler.stop()
+
+    def test_bad_job_does_not_stop_the_spooler(self, tmp_path, fake_printer, receipt):
+        spooler = PrintSpooler(printer=fake_printer, path=str(tmp_path / "spool.db"), retry_seconds=0.05)
+        with spooler._lock:
+            bad_id = spooler._conn.execute(
+                "INSERT INTO print_jobs (payload, created_at) VALUES ('not json', 0)").lastrowid
+        spooler.start()
+        spooler._offer(bad_id)
+        spooler.enqueue(receipt)
+        for _ in range(100):
+            if fake_printer.print_receipt.called:
+                break
+            threading.Event().wait(0.01)
+        
+        assert spooler.is_alive()
+        fake_printer.print_receipt.assert_called_once_with(receipt, None)
+        status = spooler._conn.execute("SELECT status FROM print_jobs WHERE id = ?", (bad_id,)).fetchone()[0]
+        assert status == 'failed'
+        spooler.stop(timeout=5)
+
+    def test_stop_leaves_a_busy_spooler_open(self, tmp_path, fake_printer, receipt):
+        printing, release = threading.Event(), threading.Event()
+        fake_printer.print_receipt.side_effect = lambda *args: printing.set() or release.wait(5)
+        spooler = PrintSpooler(printer=fake_printer, path=str(tmp_path / "spool.db"))
+        spooler.start()
+        spooler.enqueue(receipt)
+        assert printing.wait(5)
+
+        spooler.stop(timeout=0.05)
+        assert spooler.is_alive()
+        fake_printer.close.assert_not_called()  # still in use by the print
+
+        release.set()
+        spooler.stop(timeout=5)
+        assert not spooler.is_alive()
+        fake_printer.close.assert_called_once()
+
+    def test_reprint_last_receipts(self, tmp_path, fake_printer, receipt):
+        spooler = PrintSpooler(printer=fake_printer, path=str(tmp_path / "spool.db"))
+        for order_id in ('first', 'second', 'third'):
+            spooler.print_job(spooler.enqueue(dict(receipt, id=order_id)))
+        
+        for job_id in spooler.reprint(2):
+            spooler.print_job(job_id)
+        printed = [call.args[0]['id'] for call in fake_printer.print_receipt.call_args_list]
+        assert printed == ['first', 'second', 'third', 'second', 'third']
+        spooler.stop()
+
+class TestChartRenderer:
+    def test_same_shape_updates_are_blitted(self):
+        renderer = ChartRenderer(400, 250)
+        days = ['01-01', '01-02', '01-03']
+        
+        image = renderer.daily_revenue(days, [10.0, 20.0, 30.0], "Sales")
+        assert image.startswith(b"P6 400 250 255\n")
+        assert len(image) == len(b"P6 400 250 255\n") + 400 * 250 * 3
+        
+        renderer.daily_revenue(days, [12.0, 20.0, 29.0], "Sales")
+        renderer.hourly_sales(list(range(24)), [1.0] * 24)
+        renderer.daily_revenue(days, [12.0, 21.0, 29.0], "Sales")  # switching back reuses its snapshot
+        assert (renderer.full_draws, renderer.blits) == (2, 2)
+        
+        renderer.daily_revenue(days, [12.0, 21.0, 90.0], "Sales")  # off the current scale
+        renderer.daily_revenue(days + ['01-04'], [1.0, 2.0, 3.0, 4.0], "Sales")
+        assert renderer.full_draws == 4
+
+class TestSessionMetrics:
+    @pytest.fixture
+    def metrics(self, tmp_path, monkeypatch):
+        # The process-wide singleton: point it at a temp file and leave no marks behind
+        metrics = SessionMetrics()
+        monkeypatch.setattr(metrics, 'path', str(tmp_path / "metrics.jsonl"))
+        monkeypatch.setattr(metrics, '_marks', {})
+        return metrics
+
+    def test_login_to_first_sale_is_recorded_once(self, metrics, tmp_path):
+        metrics.start_session('login')
+        
+        assert metrics.mark('first_sale') is True
+        assert metrics.mark('first_sale') is False  # later sales don't move the milestone
+        seconds = metrics.record('login_to_first_sale', 'login', 'first_sale')
+        assert seconds >= 0
+        assert metrics.record('login_to_pos_ready', 'login', 'pos_ready') is None
+        
+        lines = (tmp_path / "metrics.jsonl").read_text().splitlines()
+        assert len(lines) == 1
+        assert '"metric": "login_to_first_sale"' in lines[0]